@@ -0,0 +1,437 @@
+"""
+Benchmark del ETL de Calidad de Transmisión
+
+Genera libros Excel sintéticos con la hoja FORMATO y mide por separado cada
+etapa del ETL: listado de archivos, lectura de la hoja, limpieza (también con
+la versión original, celda por celda) y carga a una base SQLite local que
+reemplaza a Calidad_Transmision. Los resultados se guardan en JSON para
+comparar commits y detectar regresiones.
+
+También informa cuánto tarda importar el módulo del ETL y si carga módulos
+pesados (--presupuesto-importacion). Es solo un reporte: las pruebas que lo
+exigen están en tests/test_importacion.py.
+
+Uso:
+    python benchmark_etl_transmision.py --filas 1000 10000 100000
+    python benchmark_etl_transmision.py --filas 10000 --comparar benchmarks/anterior.json
+"""
+import sys
+import json
+import random
+import argparse
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import etl_calidad_transmision as etl
+
+# =============================================================================
+# GENERADOR DE LIBROS SINTÉTICOS
+# =============================================================================
+
+REGIONES = ['NORTE', 'CENTRO', 'SUR', 'OCCIDENTE', 'ORIENTE']
+SUBESTACIONES = [f'SE {nombre} {n}' for nombre in ('PROGRESO', 'SANTA FE', 'LA CEIBA', 'SAN PEDRO',
+                                                  'COMAYAGUA', 'CHOLUTECA', 'DANLI', 'JUTICALPA')
+                 for n in range(1, 6)]
+TIPOS_EQUIPO = ['LINEA', 'TRANSFORMADOR', 'BARRA', 'INTERRUPTOR', 'REACTOR', 'CAPACITOR']
+NIVELES_TENSION = ['34.5 kV', '69 kV', '138 kV', '230 kV']
+PROTECCIONES = ['87T', '21', '50/51', '67N', '87B', '59', None]
+ORIGENES = ['INTERNO', 'EXTERNO', 'TERCEROS', 'SISTEMA']
+CAUSAS = ['DESCARGA ATMOSFERICA', 'VEGETACION', 'FALLA DE EQUIPO', 'MANTENIMIENTO PROGRAMADO',
+          'MANIOBRA', 'SOBRECARGA', 'ANIMALES', 'VANDALISMO', 'CONTAMINACION', 'VIENTO',
+          'INCENDIO', 'ERROR HUMANO', 'DESBALANCE', 'OSCILACION', 'CAUSA NO DETERMINADA']
+TIPOS_INDISPONIBILIDAD = ['FORZADA', 'PROGRAMADA', 'EMERGENCIA']
+TIPOS_MANTENIMIENTO = ['CORRECTIVO', 'PREVENTIVO', 'PREDICTIVO', None]
+EXCEPCIONES = [None, None, None, 'FUERZA MAYOR', 'EVENTO EXTERNO']
+
+# Encabezados tal como vienen en los archivos del regulador (incluye
+# 'PROTECCION _OPERADA' y 'DURACIÓN_...') más columnas que el ETL ignora
+ENCABEZADOS = list(etl.COLUMN_MAPPING) + ['OBSERVACIONES_INTERNAS', 'USUARIO_REGISTRO']
+
+def _fila_sintetica(azar, inicio):
+    """Genera una fila de eventos con las irregularidades típicas de los archivos reales"""
+    apertura = inicio + timedelta(minutes=azar.randint(0, 60 * 24 * 30))
+    duracion = round(azar.expovariate(1 / 90), 2)
+    cierre = apertura + timedelta(minutes=duracion)
+    subestacion = azar.choice(SUBESTACIONES)
+    
+    valores = {
+        'FECHA_HORA_APERTURA': apertura,
+        'FECHA_HORA_CIERRE': cierre,
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': duracion,
+        'CARGA_MEGAS': round(azar.uniform(0, 120), 2),
+        'CODIGO_ELEMENTO_AFECTADO': f'L{azar.randint(100, 699)}',
+        'TIPO_EQUIPO': azar.choice(TIPOS_EQUIPO),
+        'CIRCUITOS_AFECTADOS': ', '.join(f'C{azar.randint(1, 400)}' for _ in range(azar.randint(1, 3))),
+        'SUBESTACION': subestacion,
+        'REGION': REGIONES[SUBESTACIONES.index(subestacion) % len(REGIONES)],
+        'CODIGO_INTERRUPTOR': azar.choice([azar.randint(1000, 9999), f'B-{azar.randint(100, 999)}']),
+        'NIVEL_DE_TENSION': azar.choice(NIVELES_TENSION),
+        'PROTECCION _OPERADA': azar.choice(PROTECCIONES),
+        'ORIGEN_INDISPONIBILIDAD': azar.choice(ORIGENES),
+        'CAUSA_EVENTO': azar.choice(CAUSAS),
+        'EXCEPCIONES': azar.choice(EXCEPCIONES),
+        'TIPO_INDISPONIBILIDAD': azar.choice(TIPOS_INDISPONIBILIDAD),
+        'TIPO_MANTENIMIENTO': azar.choice(TIPOS_MANTENIMIENTO),
+        'DESCRIPCION_EVENTO': f'Apertura de {subestacion} por {azar.choice(CAUSAS).lower()}',
+        'OBSERVACIONES_INTERNAS': azar.choice([None, 'REVISADO', 'PENDIENTE']),
+        'USUARIO_REGISTRO': f'usuario{azar.randint(1, 12)}',
+    }
+    
+    sorteo = azar.random()
+    if sorteo < 0.01:
+        valores['FECHA_HORA_APERTURA'] = azar.choice(['sin fecha', '31/02/2024', 'N/D'])
+    elif sorteo < 0.02:
+        valores['FECHA_HORA_APERTURA'] = None
+    elif sorteo < 0.03:
+        valores['DURACIÓN_INDISPONIBILIDAD_MINUTOS'] = azar.choice(['N/D', '', '  '])
+    elif sorteo < 0.06:
+        valores['SUBESTACION'] = f'  {subestacion} '
+        valores['CAUSA_EVENTO'] = f"{valores['CAUSA_EVENTO']}   "
+    
+    return [valores[encabezado] for encabezado in ENCABEZADOS]
+
+def generar_libro_formato(ruta, filas, semilla=0):
+    """
+    Genera un libro Excel sintético con la hoja FORMATO
+    
+    Incluye todos los encabezados de COLUMN_MAPPING, fechas inválidas,
+    espacios sobrantes, filas en blanco y cardinalidades similares a las reales.
+    Se escribe en modo write-only para soportar hasta millones de filas.
+    """
+    from openpyxl import Workbook
+    
+    azar = random.Random(semilla)
+    inicio = datetime(2024, 1, 1)
+    
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('FORMATO')
+    hoja.append(ENCABEZADOS)
+    
+    vacia = [None] * len(ENCABEZADOS)
+    for _ in range(filas):
+        if azar.random() < 0.005:
+            hoja.append(vacia)
+        else:
+            hoja.append(_fila_sintetica(azar, inicio))
+    
+    libro.create_sheet('INSTRUCCIONES').append(['Hoja ignorada por el ETL'])
+    libro.save(ruta)
+    return Path(ruta)
+
+# =============================================================================
+# LIMPIEZA ORIGINAL (REFERENCIA)
+# =============================================================================
+
+def limpiar_y_preparar_datos_original(df, nombre_archivo):
+    """
+    Versión original de etl.limpiar_y_preparar_datos (celda por celda)
+    
+    Se conserva sin cambios como referencia: el benchmark mide la versión
+    vectorizada contra ella y tests/test_limpieza.py verifica que ambas
+    producen los mismos datos.
+    """
+    logger = etl.logger
+    COLUMN_MAPPING = etl.COLUMN_MAPPING
+    DATE_COLUMNS = etl.DATE_COLUMNS
+    NUMERIC_COLUMNS = etl.NUMERIC_COLUMNS
+    import pandas as pd
+    
+    logger.info(f"\n{'='*60}")
+    logger.info("LIMPIEZA Y PREPARACIÓN DE DATOS")
+    logger.info(f"{'='*60}")
+    
+    filas_iniciales = len(df)
+    
+    # 1. Mapear columnas
+    logger.info("\n1. Mapeando columnas...")
+    columnas_a_renombrar = {}
+    
+    for col_excel in df.columns:
+        if col_excel in COLUMN_MAPPING:
+            columnas_a_renombrar[col_excel] = COLUMN_MAPPING[col_excel]
+    
+    if columnas_a_renombrar:
+        df = df.rename(columns=columnas_a_renombrar)
+    
+    columnas_validas = list(COLUMN_MAPPING.values())
+    columnas_a_mantener = [col for col in df.columns if col in columnas_validas]
+    df = df[columnas_a_mantener]
+    
+    # 2. Eliminar filas vacías
+    logger.info("\n2. Eliminando filas vacías...")
+    df = df.dropna(how='all')
+    
+    # 3. Filtrar filas sin fecha de apertura
+    logger.info("\n3. Validando fecha de apertura...")
+    if 'FECHA_HORA_APERTURA' in df.columns:
+        df = df.dropna(subset=['FECHA_HORA_APERTURA'])
+        logger.info(f"   ✓ Filas con fecha válida: {len(df)}")
+    
+    # 4. Convertir fechas
+    logger.info("\n4. Convirtiendo columnas de fecha...")
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    
+    # 5. Convertir numéricos
+    logger.info("\n5. Convirtiendo columnas numéricas...")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # 6. Limpiar strings
+    for col in df.select_dtypes(include=['object']):
+        df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
+    
+    # 7. Reemplazar valores vacíos
+    df = df.replace({pd.NA: None, pd.NaT: None, '': None})
+    
+    # 8. AGREGAR COLUMNA DE ARCHIVO ORIGEN
+    logger.info(f"\n6. Agregando columna ARCHIVO_ORIGEN...")
+    df['ARCHIVO_ORIGEN'] = nombre_archivo
+    logger.info(f"   ✓ Archivo origen: {nombre_archivo}")
+    
+    logger.info(f"\n{'='*60}")
+    logger.info(f"✓ Limpieza completada:")
+    logger.info(f"  - Total de filas: {len(df)} (de {filas_iniciales} iniciales)")
+    logger.info(f"  - Total de columnas: {len(df.columns)}")
+    logger.info(f"{'='*60}")
+    
+    return df
+
+# =============================================================================
+# MEDICIÓN
+# =============================================================================
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta una función varias veces y mide su tiempo
+    
+    Returns:
+        (resultado de la última ejecución, lista de segundos por ejecución)
+    """
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, tiempos
+
+def _registro(etapa, filas, tiempos, **extra):
+    """Arma el registro JSON de una etapa medida"""
+    mediana = statistics.median(tiempos)
+    return {
+        'etapa': etapa,
+        'filas': filas,
+        'repeticiones': len(tiempos),
+        'segundos_mediana': mediana,
+        'segundos_minimo': min(tiempos),
+        'filas_por_segundo': filas / mediana if mediana > 0 else 0.0,
+        **extra
+    }
+
+# Módulos que importar el ETL no debe cargar (se importan al usarse)
+MODULOS_PESADOS = ('pandas', 'numpy', 'sqlalchemy', 'pyodbc', 'openpyxl')
+
+_SCRIPT_IMPORTACION = """
+import json, sys, time
+inicio = time.perf_counter()
+import etl_calidad_transmision
+segundos = time.perf_counter() - inicio
+print(json.dumps({'segundos': segundos, 'cargados': [m for m in sys.argv[1:] if m in sys.modules]}))
+"""
+
+def benchmark_importacion(repeticiones):
+    """
+    Mide en un intérprete nuevo cuánto tarda 'import etl_calidad_transmision'
+    
+    Returns:
+        Registro de la etapa 'importacion' con los módulos pesados que se cargaron
+    """
+    tiempos = []
+    cargados = set()
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', _SCRIPT_IMPORTACION, *MODULOS_PESADOS],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout
+        medicion = json.loads(salida.strip().splitlines()[-1])
+        tiempos.append(medicion['segundos'])
+        cargados.update(medicion['cargados'])
+    return _registro('importacion', 0, tiempos, modulos_pesados=sorted(cargados))
+
+def benchmark_listado(carpeta_trabajo, num_archivos, repeticiones):
+    """Mide obtener_archivos_excel sobre una carpeta con num_archivos libros"""
+    carpeta = carpeta_trabajo / f'listado_{num_archivos}'
+    carpeta.mkdir(parents=True, exist_ok=True)
+    for i in range(num_archivos):
+        (carpeta / f'TRANSMISION_{i:04d}.xlsx').touch()
+    
+    archivos, tiempos = medir(lambda: etl.obtener_archivos_excel(carpeta), repeticiones)
+    return _registro('listado', len(archivos), tiempos)
+
+def benchmark_tamano(carpeta_trabajo, filas, metodos, repeticiones):
+    """Mide lectura, limpieza y carga a SQLite para un libro de `filas` filas"""
+    ruta = carpeta_trabajo / f'FORMATO_{filas}.xlsx'
+    if not ruta.exists():
+        logging.info(f"Generando libro sintético de {filas:,} filas...")
+        generar_libro_formato(ruta, filas)
+    
+    registros = []
+    
+    df_crudo, tiempos = medir(lambda: etl.leer_hoja_formato(ruta), repeticiones)
+    registros.append(_registro('lectura', len(df_crudo), tiempos, tamano_archivo=ruta.stat().st_size))
+    
+    df, tiempos = medir(lambda: etl.limpiar_y_preparar_datos(df_crudo.copy(), ruta.name), repeticiones)
+    registros.append(_registro('limpieza', len(df_crudo), tiempos, filas_resultantes=len(df)))
+    
+    # Misma limpieza con la versión original, para ver la ganancia en cada tamaño
+    df_original, tiempos = medir(lambda: limpiar_y_preparar_datos_original(df_crudo.copy(), ruta.name),
+                                 repeticiones)
+    registros.append(_registro('limpieza', len(df_crudo), tiempos, filas_resultantes=len(df_original),
+                               metodo='original'))
+    
+    for metodo in metodos:
+        ruta_bd = carpeta_trabajo / f'benchmark_{filas}_{metodo}.db'
+        tiempos = []
+        for _ in range(repeticiones):
+            ruta_bd.unlink(missing_ok=True)
+            engine = etl.crear_engine_sqlite(ruta_bd)
+            inicio = time.perf_counter()
+            etl.cargar_dataframe(df, engine, 'Calidad_Transmision', metodo=metodo)
+            tiempos.append(time.perf_counter() - inicio)
+            engine.dispose()
+        ruta_bd.unlink(missing_ok=True)
+        registros.append(_registro('carga', len(df), tiempos, metodo=metodo))
+    
+    return registros
+
+def _commit_actual():
+    """Hash corto del commit actual, si el benchmark corre dentro del repositorio git"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar_resultados(actuales, anteriores, tolerancia):
+    """
+    Compara dos corridas y lista las etapas que se volvieron más lentas
+    
+    Returns:
+        Lista de regresiones (etapa, filas, método, segundos antes y ahora)
+    """
+    def clave(registro):
+        return (registro['etapa'], registro['filas'], registro.get('metodo'))
+    
+    previos = {clave(r): r for r in anteriores['resultados']}
+    regresiones = []
+    
+    for registro in actuales['resultados']:
+        previo = previos.get(clave(registro))
+        if previo is None:
+            continue
+        antes = previo['segundos_mediana']
+        ahora = registro['segundos_mediana']
+        if antes > 0 and ahora > antes * (1 + tolerancia):
+            regresiones.append({
+                'etapa': registro['etapa'],
+                'filas': registro['filas'],
+                'metodo': registro.get('metodo'),
+                'segundos_antes': antes,
+                'segundos_ahora': ahora
+            })
+    
+    return regresiones
+
+# =============================================================================
+# EJECUTAR EL BENCHMARK
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del ETL de Calidad de Transmisión")
+    parser.add_argument('--filas', type=int, nargs='+', default=[1000, 10000],
+                        help="Tamaños de libro a medir (de 1,000 a 1,000,000 filas)")
+    parser.add_argument('--metodos', nargs='+', default=list(etl.METODOS_CARGA),
+                        choices=etl.METODOS_CARGA, help="Estrategias de carga a medir")
+    parser.add_argument('--archivos-listado', type=int, default=500,
+                        help="Archivos en la carpeta para medir obtener_archivos_excel")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--carpeta-trabajo', type=Path, default=Path('benchmarks') / 'trabajo',
+                        help="Carpeta para los libros sintéticos (se reutilizan entre corridas)")
+    parser.add_argument('--salida', type=Path, help="Archivo JSON de resultados")
+    parser.add_argument('--comparar', type=Path, help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.20,
+                        help="Aumento relativo de tiempo aceptado al comparar (0.20 = 20%%)")
+    parser.add_argument('--presupuesto-importacion', type=float, default=0.5,
+                        help="Segundos de importación del módulo del ETL a partir de los cuales se advierte")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+    etl.logger.setLevel(logging.WARNING)
+    args.carpeta_trabajo.mkdir(parents=True, exist_ok=True)
+    
+    import pandas as pd
+    
+    importacion = benchmark_importacion(args.repeticiones)
+    resultados = [importacion, benchmark_listado(args.carpeta_trabajo, args.archivos_listado, args.repeticiones)]
+    for filas in args.filas:
+        logging.info(f"Midiendo libro de {filas:,} filas...")
+        resultados.extend(benchmark_tamano(args.carpeta_trabajo, filas, args.metodos, args.repeticiones))
+    
+    corrida = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_actual(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'resultados': resultados
+    }
+    
+    salida = args.salida or Path('benchmarks') / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(corrida, archivo, ensure_ascii=False, indent=2)
+    
+    logging.info(f"\n{'Etapa':<10} {'Método':<18} {'Filas':>10} {'Segundos':>10} {'Filas/s':>12}")
+    logging.info("-" * 64)
+    for registro in resultados:
+        logging.info(f"{registro['etapa']:<10} {registro.get('metodo') or '':<18} {registro['filas']:>10,} "
+                     f"{registro['segundos_mediana']:>10.3f} {registro['filas_por_segundo']:>12,.0f}")
+    logging.info(f"\n📄 Resultados guardados en: {salida}")
+    
+    # Presupuesto de importación: solo informativo (lo verifica tests/test_importacion.py)
+    if importacion['modulos_pesados']:
+        logging.warning(f"⚠️  Importar el ETL carga módulos pesados: {', '.join(importacion['modulos_pesados'])}")
+    if importacion['segundos_mediana'] > args.presupuesto_importacion:
+        logging.warning(f"⚠️  Importar el ETL tarda {importacion['segundos_mediana']:.3f} s "
+                        f"(presupuesto {args.presupuesto_importacion:.3f} s)")
+    else:
+        logging.info(f"✓ Importación del ETL: {importacion['segundos_mediana']:.3f} s "
+                     f"(presupuesto {args.presupuesto_importacion:.3f} s)")
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            regresiones = comparar_resultados(corrida, json.load(archivo), args.tolerancia)
+        
+        if regresiones:
+            for r in regresiones:
+                logging.error(f"✗ Regresión en {r['etapa']} ({r['filas']:,} filas {r['metodo'] or ''}): "
+                              f"{r['segundos_antes']:.3f} s → {r['segundos_ahora']:.3f} s")
+            return 1
+        logging.info(f"✓ Sin regresiones contra {args.comparar} (tolerancia {args.tolerancia:.0%})")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
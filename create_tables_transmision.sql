@@ -38,9 +38,72 @@ BEGIN
     ELSE
         PRINT '    ✓ Índice IX_Archivo_Origen ya existe';
     
+    -- Agregar columnas de huella por fila (actualización incremental) si no existen
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.columns 
+        WHERE object_id = OBJECT_ID('dbo.Calidad_Transmision') 
+        AND name = 'CLAVE_EVENTO'
+    )
+    BEGIN
+        ALTER TABLE dbo.Calidad_Transmision
+        ADD CLAVE_EVENTO BIGINT NULL,
+            HASH_CONTENIDO BIGINT NULL;
+        PRINT '    ✓ Columnas CLAVE_EVENTO y HASH_CONTENIDO agregadas';
+    END
+    ELSE
+        PRINT '    ✓ Columnas CLAVE_EVENTO y HASH_CONTENIDO ya existen';
+    
+    -- Agregar claves de las dimensiones (esquema estrella) si no existen
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.columns 
+        WHERE object_id = OBJECT_ID('dbo.Calidad_Transmision') 
+        AND name = 'ID_SUBESTACION'
+    )
+    BEGIN
+        ALTER TABLE dbo.Calidad_Transmision
+        ADD ID_SUBESTACION INT NULL,
+            ID_REGION INT NULL,
+            ID_TIPO_EQUIPO INT NULL,
+            ID_NIVEL_DE_TENSION INT NULL,
+            ID_ORIGEN_INDISPONIBILIDAD INT NULL,
+            ID_CAUSA_EVENTO INT NULL,
+            ID_TIPO_INDISPONIBILIDAD INT NULL,
+            ID_TIPO_MANTENIMIENTO INT NULL;
+        PRINT '    ✓ Columnas ID_* de las dimensiones agregadas';
+    END
+    ELSE
+        PRINT '    ✓ Columnas ID_* de las dimensiones ya existen';
+    
     PRINT '';
 END
 GO
+
+-- Índice para el MERGE incremental (en su propio lote: las columnas pueden ser nuevas)
+IF OBJECT_ID('dbo.Calidad_Transmision', 'U') IS NOT NULL
+AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes 
+    WHERE object_id = OBJECT_ID('dbo.Calidad_Transmision') 
+    AND name = 'IX_Archivo_Clave_Evento'
+)
+BEGIN
+    CREATE INDEX IX_Archivo_Clave_Evento
+        ON dbo.Calidad_Transmision(ARCHIVO_ORIGEN, CLAVE_EVENTO)
+        INCLUDE (HASH_CONTENIDO);
+    PRINT '    ✓ Índice IX_Archivo_Clave_Evento creado';
+END
+GO
+
+IF OBJECT_ID('dbo.Calidad_Transmision', 'U') IS NOT NULL
+AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes 
+    WHERE object_id = OBJECT_ID('dbo.Calidad_Transmision') 
+    AND name = 'IX_Id_Subestacion'
+)
+BEGIN
+    CREATE INDEX IX_Id_Subestacion ON dbo.Calidad_Transmision(ID_SUBESTACION);
+    PRINT '    ✓ Índice IX_Id_Subestacion creado';
+END
+GO
 -- Crear la tabla si no existe
 IF OBJECT_ID('dbo.Calidad_Transmision', 'U') IS NULL
 BEGIN
@@ -85,12 +148,28 @@ BEGIN
         FECHA_INSERCION DATETIME DEFAULT GETDATE(),
         FECHA_ACTUALIZACION DATETIME NULL,
         
+        -- Huella por fila para la actualización incremental
+        CLAVE_EVENTO BIGINT NULL,
+        HASH_CONTENIDO BIGINT NULL,
+        
+        -- Claves de las dimensiones (ETL_ESQUEMA_ESTRELLA); el texto queda en NULL
+        ID_SUBESTACION INT NULL,
+        ID_REGION INT NULL,
+        ID_TIPO_EQUIPO INT NULL,
+        ID_NIVEL_DE_TENSION INT NULL,
+        ID_ORIGEN_INDISPONIBILIDAD INT NULL,
+        ID_CAUSA_EVENTO INT NULL,
+        ID_TIPO_INDISPONIBILIDAD INT NULL,
+        ID_TIPO_MANTENIMIENTO INT NULL,
+        
         -- Índices para mejorar rendimiento
         INDEX IX_Fecha_Apertura (FECHA_HORA_APERTURA),
         INDEX IX_Codigo_Elemento (CODIGO_ELEMENTO_AFECTADO),
         INDEX IX_Subestacion (SUBESTACION),
+        INDEX IX_Id_Subestacion (ID_SUBESTACION),
         INDEX IX_Archivo_Origen (ARCHIVO_ORIGEN),
-        INDEX IX_Fecha_Insercion (FECHA_INSERCION)
+        INDEX IX_Fecha_Insercion (FECHA_INSERCION),
+        INDEX IX_Archivo_Clave_Evento (ARCHIVO_ORIGEN, CLAVE_EVENTO) INCLUDE (HASH_CONTENIDO)
     );
     
     PRINT '✓ Tabla Calidad_Transmision creada exitosamente';
@@ -98,6 +177,74 @@ BEGIN
 END
 GO
 
+-- =============================================================================
+-- TABLAS DE DIMENSIÓN (esquema estrella, ETL_ESQUEMA_ESTRELLA=true)
+-- =============================================================================
+-- Una fila por valor distinto de cada columna de texto de baja cardinalidad.
+-- El ETL inserta los valores nuevos y guarda en Calidad_Transmision solo la
+-- clave ID_<columna>. La intercalación binaria hace que cada valor exacto
+-- (mayúsculas y tildes incluidas) sea un miembro, como en la caché del ETL.
+
+IF OBJECT_ID('dbo.Dim_Subestacion', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Subestacion (
+        ID_SUBESTACION INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(100) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Subestacion_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Region', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Region (
+        ID_REGION INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(100) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Region_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Tipo_Equipo', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Tipo_Equipo (
+        ID_TIPO_EQUIPO INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(100) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Tipo_Equipo_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Nivel_Tension', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Nivel_Tension (
+        ID_NIVEL_DE_TENSION INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(50) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Nivel_Tension_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Origen_Indisponibilidad', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Origen_Indisponibilidad (
+        ID_ORIGEN_INDISPONIBILIDAD INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(100) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Origen_Indisponibilidad_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Causa_Evento', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Causa_Evento (
+        ID_CAUSA_EVENTO INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(255) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Causa_Evento_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Tipo_Indisponibilidad', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Tipo_Indisponibilidad (
+        ID_TIPO_INDISPONIBILIDAD INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(100) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Tipo_Indisponibilidad_Valor UNIQUE (VALOR)
+    );
+
+IF OBJECT_ID('dbo.Dim_Tipo_Mantenimiento', 'U') IS NULL
+    CREATE TABLE dbo.Dim_Tipo_Mantenimiento (
+        ID_TIPO_MANTENIMIENTO INT IDENTITY(1,1) PRIMARY KEY,
+        VALOR NVARCHAR(100) COLLATE Latin1_General_100_BIN2 NOT NULL,
+        CONSTRAINT UQ_Dim_Tipo_Mantenimiento_Valor UNIQUE (VALOR)
+    );
+
+PRINT '✓ Tablas de dimensión Dim_* verificadas';
+PRINT '';
+GO
+
 -- =============================================================================
 -- VISTA: Resumen de Eventos con Cálculos
 -- =============================================================================
@@ -106,68 +253,392 @@ IF OBJECT_ID('dbo.v_Resumen_Calidad_Transmision', 'V') IS NOT NULL
     DROP VIEW dbo.v_Resumen_Calidad_Transmision;
 GO
 
+-- Los textos de las dimensiones salen de la fila (carga clásica) o de la
+-- tabla Dim_* (esquema estrella), así la vista sirve para ambos modos
 CREATE VIEW dbo.v_Resumen_Calidad_Transmision AS
 SELECT 
-    ID,
-    FECHA_HORA_APERTURA,
-    FECHA_HORA_CIERRE,
+    c.ID,
+    c.FECHA_HORA_APERTURA,
+    c.FECHA_HORA_CIERRE,
     
     -- Duraciones
-    DURACION_INDISPONIBILIDAD_MINUTOS,
-    CAST(DURACION_INDISPONIBILIDAD_MINUTOS / 60.0 AS DECIMAL(10,2)) AS DURACION_HORAS,
+    c.DURACION_INDISPONIBILIDAD_MINUTOS,
+    CAST(c.DURACION_INDISPONIBILIDAD_MINUTOS / 60.0 AS DECIMAL(10,2)) AS DURACION_HORAS,
     
     -- Carga
-    CARGA_MEGAS,
+    c.CARGA_MEGAS,
     
     -- Identificación
-    CODIGO_ELEMENTO_AFECTADO,
-    TIPO_EQUIPO,
-    CIRCUITOS_AFECTADOS,
+    c.CODIGO_ELEMENTO_AFECTADO,
+    COALESCE(c.TIPO_EQUIPO, d2.VALOR) AS TIPO_EQUIPO,
+    c.CIRCUITOS_AFECTADOS,
     
     -- Ubicación
-    SUBESTACION,
-    REGION,
+    COALESCE(c.SUBESTACION, d0.VALOR) AS SUBESTACION,
+    COALESCE(c.REGION, d1.VALOR) AS REGION,
     
     -- Técnico
-    CODIGO_INTERRUPTOR,
-    NIVEL_DE_TENSION,
-    PROTECCION_OPERADA,
+    c.CODIGO_INTERRUPTOR,
+    COALESCE(c.NIVEL_DE_TENSION, d3.VALOR) AS NIVEL_DE_TENSION,
+    c.PROTECCION_OPERADA,
     
     -- Clasificación
-    ORIGEN_INDISPONIBILIDAD,
-    CAUSA_EVENTO,
-    EXCEPCIONES,
-    TIPO_INDISPONIBILIDAD,
-    TIPO_MANTENIMIENTO,
+    COALESCE(c.ORIGEN_INDISPONIBILIDAD, d4.VALOR) AS ORIGEN_INDISPONIBILIDAD,
+    COALESCE(c.CAUSA_EVENTO, d5.VALOR) AS CAUSA_EVENTO,
+    c.EXCEPCIONES,
+    COALESCE(c.TIPO_INDISPONIBILIDAD, d6.VALOR) AS TIPO_INDISPONIBILIDAD,
+    COALESCE(c.TIPO_MANTENIMIENTO, d7.VALOR) AS TIPO_MANTENIMIENTO,
     
     -- Descripción
-    DESCRIPCION_EVENTO,
+    c.DESCRIPCION_EVENTO,
     
     -- Indicadores
     CASE 
-        WHEN DURACION_INDISPONIBILIDAD_MINUTOS > 240 THEN 'Sí' 
+        WHEN c.DURACION_INDISPONIBILIDAD_MINUTOS > 240 THEN 'Sí' 
         ELSE 'No' 
     END AS EVENTO_PROLONGADO,
     
     -- Fecha y hora
-    YEAR(FECHA_HORA_APERTURA) AS ANIO,
-    MONTH(FECHA_HORA_APERTURA) AS MES,
-    DATENAME(MONTH, FECHA_HORA_APERTURA) AS NOMBRE_MES,
-    DATEPART(WEEK, FECHA_HORA_APERTURA) AS SEMANA,
-    DATENAME(WEEKDAY, FECHA_HORA_APERTURA) AS DIA_SEMANA,
+    YEAR(c.FECHA_HORA_APERTURA) AS ANIO,
+    MONTH(c.FECHA_HORA_APERTURA) AS MES,
+    DATENAME(MONTH, c.FECHA_HORA_APERTURA) AS NOMBRE_MES,
+    DATEPART(WEEK, c.FECHA_HORA_APERTURA) AS SEMANA,
+    DATENAME(WEEKDAY, c.FECHA_HORA_APERTURA) AS DIA_SEMANA,
     
     -- Control de origen y auditoría
-    ARCHIVO_ORIGEN,
-    FECHA_INSERCION,
-    FECHA_ACTUALIZACION
-FROM dbo.Calidad_Transmision
-WHERE FECHA_HORA_APERTURA IS NOT NULL;
+    c.ARCHIVO_ORIGEN,
+    c.FECHA_INSERCION,
+    c.FECHA_ACTUALIZACION
+FROM dbo.Calidad_Transmision c
+LEFT JOIN dbo.Dim_Subestacion d0 ON d0.ID_SUBESTACION = c.ID_SUBESTACION
+LEFT JOIN dbo.Dim_Region d1 ON d1.ID_REGION = c.ID_REGION
+LEFT JOIN dbo.Dim_Tipo_Equipo d2 ON d2.ID_TIPO_EQUIPO = c.ID_TIPO_EQUIPO
+LEFT JOIN dbo.Dim_Nivel_Tension d3 ON d3.ID_NIVEL_DE_TENSION = c.ID_NIVEL_DE_TENSION
+LEFT JOIN dbo.Dim_Origen_Indisponibilidad d4 ON d4.ID_ORIGEN_INDISPONIBILIDAD = c.ID_ORIGEN_INDISPONIBILIDAD
+LEFT JOIN dbo.Dim_Causa_Evento d5 ON d5.ID_CAUSA_EVENTO = c.ID_CAUSA_EVENTO
+LEFT JOIN dbo.Dim_Tipo_Indisponibilidad d6 ON d6.ID_TIPO_INDISPONIBILIDAD = c.ID_TIPO_INDISPONIBILIDAD
+LEFT JOIN dbo.Dim_Tipo_Mantenimiento d7 ON d7.ID_TIPO_MANTENIMIENTO = c.ID_TIPO_MANTENIMIENTO
+WHERE c.FECHA_HORA_APERTURA IS NOT NULL;
 GO
 
 PRINT '✓ Vista v_Resumen_Calidad_Transmision creada exitosamente';
 PRINT '';
 GO
 
+-- =============================================================================
+-- TABLA: Control_Cargas_Transmision (espejo del manifiesto local del ETL)
+-- =============================================================================
+
+IF OBJECT_ID('dbo.Control_Cargas_Transmision', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Control_Cargas_Transmision (
+        -- Archivo cargado (uno por nombre)
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL PRIMARY KEY,
+        
+        -- Huella del archivo al momento de la carga
+        TAMANO_BYTES BIGINT NOT NULL,
+        FECHA_MODIFICACION DATETIME NOT NULL,
+        HASH_SHA256 CHAR(64) NOT NULL,
+        
+        -- Resultado de la carga
+        TOTAL_REGISTROS INT NULL,
+        FECHA_CARGA DATETIME NOT NULL DEFAULT GETDATE(),
+        
+        INDEX IX_Hash_SHA256 (HASH_SHA256)
+    );
+    
+    PRINT '✓ Tabla Control_Cargas_Transmision creada exitosamente';
+    PRINT '';
+END
+GO
+
+-- =============================================================================
+-- TABLAS: Resumen mensual (agregados mantenidos por el ETL)
+-- =============================================================================
+-- Resumen_Mensual_Archivos_Transmision: aporte de cada archivo, una fila por
+--   mes, subestación, región, causa, tipo de indisponibilidad y archivo.
+-- Elementos_Mensual_Transmision: eventos por mes, subestación, región,
+--   elemento y archivo (para contar elementos distintos).
+-- Resumen_Mensual_Transmision: suma de los aportes, una fila por mes,
+--   subestación, región, causa y tipo de indisponibilidad (sin archivo ni
+--   elemento: unos cientos de filas por mes).
+-- El ETL reemplaza el aporte de un archivo y recalcula el resumen de sus
+-- meses en la misma transacción en que carga sus eventos.
+
+-- Versión anterior del resumen (con archivo y elemento en la granularidad):
+-- se descarta y se vuelve a calcular más abajo
+IF COL_LENGTH('dbo.Resumen_Mensual_Transmision', 'ARCHIVO_ORIGEN') IS NOT NULL
+BEGIN
+    DROP TABLE dbo.Resumen_Mensual_Transmision;
+    PRINT '✓ Resumen_Mensual_Transmision anterior eliminado (se recalcula)';
+END
+GO
+
+IF OBJECT_ID('dbo.Resumen_Mensual_Archivos_Transmision', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Resumen_Mensual_Archivos_Transmision (
+        ID INT IDENTITY(1,1) PRIMARY KEY,
+        
+        -- Granularidad
+        ANIO INT NOT NULL,
+        MES INT NOT NULL,
+        PERIODO AS (ANIO * 100 + MES) PERSISTED,
+        SUBESTACION NVARCHAR(100) NULL,
+        REGION NVARCHAR(100) NULL,
+        CAUSA_EVENTO NVARCHAR(255) NULL,
+        TIPO_INDISPONIBILIDAD NVARCHAR(100) NULL,
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL,
+        
+        -- Conteos
+        TOTAL_EVENTOS INT NOT NULL,
+        EVENTOS_FORZADOS INT NOT NULL,
+        EVENTOS_PROGRAMADOS INT NOT NULL,
+        
+        -- Duraciones (EVENTOS_CON_DURACION permite calcular promedios)
+        TOTAL_MINUTOS DECIMAL(18,2) NULL,
+        EVENTOS_CON_DURACION INT NOT NULL,
+        MAX_MINUTOS DECIMAL(18,2) NULL,
+        
+        -- Carga
+        TOTAL_CARGA_MW DECIMAL(18,2) NULL,
+        EVENTOS_CON_CARGA INT NOT NULL,
+        MAX_CARGA_MW DECIMAL(18,2) NULL,
+        
+        FECHA_ACTUALIZACION DATETIME NOT NULL DEFAULT GETDATE(),
+        
+        INDEX IX_Resumen_Archivos_Archivo (ARCHIVO_ORIGEN),
+        INDEX IX_Resumen_Archivos_Periodo (PERIODO)
+    );
+    
+    PRINT '✓ Tabla Resumen_Mensual_Archivos_Transmision creada exitosamente';
+    PRINT '';
+END
+GO
+
+IF OBJECT_ID('dbo.Elementos_Mensual_Transmision', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Elementos_Mensual_Transmision (
+        ANIO INT NOT NULL,
+        MES INT NOT NULL,
+        PERIODO AS (ANIO * 100 + MES) PERSISTED,
+        SUBESTACION NVARCHAR(100) NULL,
+        REGION NVARCHAR(100) NULL,
+        CODIGO_ELEMENTO_AFECTADO NVARCHAR(50) NOT NULL,
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL,
+        TOTAL_EVENTOS INT NOT NULL,
+        
+        INDEX IX_Elementos_Archivo (ARCHIVO_ORIGEN),
+        INDEX IX_Elementos_Periodo (PERIODO) INCLUDE (SUBESTACION, REGION, CODIGO_ELEMENTO_AFECTADO)
+    );
+    
+    PRINT '✓ Tabla Elementos_Mensual_Transmision creada exitosamente';
+    PRINT '';
+END
+GO
+
+IF OBJECT_ID('dbo.Resumen_Mensual_Transmision', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Resumen_Mensual_Transmision (
+        ID INT IDENTITY(1,1) PRIMARY KEY,
+        
+        -- Granularidad
+        ANIO INT NOT NULL,
+        MES INT NOT NULL,
+        PERIODO AS (ANIO * 100 + MES) PERSISTED,
+        SUBESTACION NVARCHAR(100) NULL,
+        REGION NVARCHAR(100) NULL,
+        CAUSA_EVENTO NVARCHAR(255) NULL,
+        TIPO_INDISPONIBILIDAD NVARCHAR(100) NULL,
+        
+        -- Conteos
+        TOTAL_EVENTOS INT NOT NULL,
+        EVENTOS_FORZADOS INT NOT NULL,
+        EVENTOS_PROGRAMADOS INT NOT NULL,
+        
+        -- Duraciones (EVENTOS_CON_DURACION permite calcular promedios)
+        TOTAL_MINUTOS DECIMAL(18,2) NULL,
+        EVENTOS_CON_DURACION INT NOT NULL,
+        MAX_MINUTOS DECIMAL(18,2) NULL,
+        
+        -- Carga
+        TOTAL_CARGA_MW DECIMAL(18,2) NULL,
+        EVENTOS_CON_CARGA INT NOT NULL,
+        MAX_CARGA_MW DECIMAL(18,2) NULL,
+        
+        FECHA_ACTUALIZACION DATETIME NOT NULL DEFAULT GETDATE(),
+        
+        INDEX IX_Resumen_Periodo (PERIODO) INCLUDE (SUBESTACION, REGION, CAUSA_EVENTO)
+    );
+    
+    PRINT '✓ Tabla Resumen_Mensual_Transmision creada exitosamente';
+    PRINT '';
+END
+GO
+
+-- Carga inicial de los aportes por archivo con los eventos ya existentes
+IF NOT EXISTS (SELECT 1 FROM dbo.Resumen_Mensual_Archivos_Transmision)
+BEGIN
+    INSERT INTO dbo.Resumen_Mensual_Archivos_Transmision (
+        ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD, ARCHIVO_ORIGEN,
+        TOTAL_EVENTOS, EVENTOS_FORZADOS, EVENTOS_PROGRAMADOS,
+        TOTAL_MINUTOS, EVENTOS_CON_DURACION, MAX_MINUTOS,
+        TOTAL_CARGA_MW, EVENTOS_CON_CARGA, MAX_CARGA_MW
+    )
+    SELECT 
+        YEAR(FECHA_HORA_APERTURA),
+        MONTH(FECHA_HORA_APERTURA),
+        SUBESTACION,
+        REGION,
+        CAUSA_EVENTO,
+        TIPO_INDISPONIBILIDAD,
+        ARCHIVO_ORIGEN,
+        COUNT(*),
+        COUNT(CASE WHEN TIPO_INDISPONIBILIDAD = 'Forzada' THEN 1 END),
+        COUNT(CASE WHEN TIPO_INDISPONIBILIDAD = 'Programada' THEN 1 END),
+        SUM(DURACION_INDISPONIBILIDAD_MINUTOS),
+        COUNT(DURACION_INDISPONIBILIDAD_MINUTOS),
+        MAX(DURACION_INDISPONIBILIDAD_MINUTOS),
+        SUM(CARGA_MEGAS),
+        COUNT(CARGA_MEGAS),
+        MAX(CARGA_MEGAS)
+    FROM dbo.v_Resumen_Calidad_Transmision
+    WHERE FECHA_HORA_APERTURA IS NOT NULL
+        AND ARCHIVO_ORIGEN IS NOT NULL
+    GROUP BY 
+        YEAR(FECHA_HORA_APERTURA), MONTH(FECHA_HORA_APERTURA), SUBESTACION, REGION,
+        CAUSA_EVENTO, TIPO_INDISPONIBILIDAD, ARCHIVO_ORIGEN;
+    
+    PRINT '✓ Aportes por archivo inicializados: ' + CAST(@@ROWCOUNT AS VARCHAR(20)) + ' filas';
+    
+    INSERT INTO dbo.Elementos_Mensual_Transmision (
+        ANIO, MES, SUBESTACION, REGION, CODIGO_ELEMENTO_AFECTADO, ARCHIVO_ORIGEN, TOTAL_EVENTOS
+    )
+    SELECT 
+        YEAR(FECHA_HORA_APERTURA),
+        MONTH(FECHA_HORA_APERTURA),
+        SUBESTACION,
+        REGION,
+        CODIGO_ELEMENTO_AFECTADO,
+        ARCHIVO_ORIGEN,
+        COUNT(*)
+    FROM dbo.v_Resumen_Calidad_Transmision
+    WHERE FECHA_HORA_APERTURA IS NOT NULL
+        AND ARCHIVO_ORIGEN IS NOT NULL
+        AND CODIGO_ELEMENTO_AFECTADO IS NOT NULL
+    GROUP BY 
+        YEAR(FECHA_HORA_APERTURA), MONTH(FECHA_HORA_APERTURA), SUBESTACION, REGION,
+        CODIGO_ELEMENTO_AFECTADO, ARCHIVO_ORIGEN;
+    
+    PRINT '✓ Elementos por mes inicializados: ' + CAST(@@ROWCOUNT AS VARCHAR(20)) + ' filas';
+    PRINT '';
+END
+GO
+
+-- Carga inicial del resumen sumando los aportes
+IF NOT EXISTS (SELECT 1 FROM dbo.Resumen_Mensual_Transmision)
+BEGIN
+    INSERT INTO dbo.Resumen_Mensual_Transmision (
+        ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD,
+        TOTAL_EVENTOS, EVENTOS_FORZADOS, EVENTOS_PROGRAMADOS,
+        TOTAL_MINUTOS, EVENTOS_CON_DURACION, MAX_MINUTOS,
+        TOTAL_CARGA_MW, EVENTOS_CON_CARGA, MAX_CARGA_MW
+    )
+    SELECT 
+        ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD,
+        SUM(TOTAL_EVENTOS), SUM(EVENTOS_FORZADOS), SUM(EVENTOS_PROGRAMADOS),
+        SUM(TOTAL_MINUTOS), SUM(EVENTOS_CON_DURACION), MAX(MAX_MINUTOS),
+        SUM(TOTAL_CARGA_MW), SUM(EVENTOS_CON_CARGA), MAX(MAX_CARGA_MW)
+    FROM dbo.Resumen_Mensual_Archivos_Transmision
+    GROUP BY ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD;
+    
+    PRINT '✓ Resumen mensual inicializado: ' + CAST(@@ROWCOUNT AS VARCHAR(20)) + ' filas';
+    PRINT '';
+END
+GO
+
+-- =============================================================================
+-- TABLA: Estadisticas_Archivos_Transmision (estadísticas por archivo del ETL)
+-- =============================================================================
+-- Una fila por archivo. El ETL la calcula con los datos que acaba de cargar y
+-- la actualiza en la misma transacción, así el reporte por archivo no recorre
+-- Calidad_Transmision.
+
+IF OBJECT_ID('dbo.Estadisticas_Archivos_Transmision', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Estadisticas_Archivos_Transmision (
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL PRIMARY KEY,
+        TOTAL_REGISTROS INT NOT NULL,
+        PRIMERA_CARGA DATETIME NULL,
+        ULTIMA_CARGA DATETIME NULL,
+        ULTIMA_ACTUALIZACION DATETIME NULL,
+        REGISTROS_ACTUALIZADOS INT NOT NULL,
+        EVENTO_MAS_ANTIGUO DATETIME NULL,
+        EVENTO_MAS_RECIENTE DATETIME NULL,
+        TOTAL_MINUTOS DECIMAL(18,2) NULL,
+        
+        INDEX IX_Estadisticas_Ultima_Carga (ULTIMA_CARGA)
+    );
+    
+    PRINT '✓ Tabla Estadisticas_Archivos_Transmision creada exitosamente';
+    PRINT '';
+END
+GO
+
+-- Carga inicial de las estadísticas con los archivos ya existentes
+IF NOT EXISTS (SELECT 1 FROM dbo.Estadisticas_Archivos_Transmision)
+BEGIN
+    INSERT INTO dbo.Estadisticas_Archivos_Transmision (
+        ARCHIVO_ORIGEN, TOTAL_REGISTROS, PRIMERA_CARGA, ULTIMA_CARGA,
+        ULTIMA_ACTUALIZACION, REGISTROS_ACTUALIZADOS,
+        EVENTO_MAS_ANTIGUO, EVENTO_MAS_RECIENTE, TOTAL_MINUTOS
+    )
+    SELECT 
+        ARCHIVO_ORIGEN,
+        COUNT(*),
+        MIN(FECHA_INSERCION),
+        MAX(FECHA_INSERCION),
+        MAX(FECHA_ACTUALIZACION),
+        COUNT(CASE WHEN FECHA_ACTUALIZACION IS NOT NULL THEN 1 END),
+        MIN(FECHA_HORA_APERTURA),
+        MAX(FECHA_HORA_APERTURA),
+        SUM(DURACION_INDISPONIBILIDAD_MINUTOS)
+    FROM dbo.Calidad_Transmision
+    WHERE ARCHIVO_ORIGEN IS NOT NULL
+    GROUP BY ARCHIVO_ORIGEN;
+    
+    PRINT '✓ Estadísticas por archivo inicializadas: ' + CAST(@@ROWCOUNT AS VARCHAR(20)) + ' archivo(s)';
+    PRINT '';
+END
+GO
+
+-- =============================================================================
+-- TABLA: Checkpoint_Cargas_Transmision (cargas reanudables del ETL)
+-- =============================================================================
+-- Una fila por archivo con una carga en curso. El ETL carga la staging en lotes
+-- numerados y avanza ULTIMO_LOTE en la misma transacción de cada lote; si la
+-- corrida se interrumpe, la siguiente sigue desde ahí. La fila se elimina en
+-- la transacción que pasa la staging a Calidad_Transmision.
+
+IF OBJECT_ID('dbo.Checkpoint_Cargas_Transmision', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Checkpoint_Cargas_Transmision (
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL PRIMARY KEY,
+        
+        -- Contenido del archivo y forma de partirlo en lotes (SHA-256)
+        HUELLA CHAR(64) NOT NULL,
+        TABLA_STAGING NVARCHAR(128) NOT NULL,
+        
+        -- Avance confirmado
+        ULTIMO_LOTE INT NOT NULL,
+        FILAS_CONFIRMADAS INT NOT NULL,
+        FECHA_ACTUALIZACION DATETIME NOT NULL DEFAULT GETDATE()
+    );
+    
+    PRINT '✓ Tabla Checkpoint_Cargas_Transmision creada exitosamente';
+    PRINT '';
+END
+GO
+
 -- =============================================================================
 -- STORED PROCEDURE: Verificar si archivo ya fue cargado
 -- =============================================================================
@@ -198,6 +669,43 @@ PRINT '✓ SP sp_Verificar_Archivo_Cargado creado exitosamente';
 PRINT '';
 GO
 
+-- =============================================================================
+-- STORED PROCEDURE: Verificar varios archivos en una sola consulta
+-- =============================================================================
+-- @NombresJson: arreglo JSON de nombres, p. ej. '["ENE_2024.xlsx","FEB_2024.xlsx"]'
+-- Devuelve una fila por cada archivo que ya tiene registros (requiere SQL Server 2016+)
+
+IF OBJECT_ID('dbo.sp_Verificar_Archivos_Cargados', 'P') IS NOT NULL
+    DROP PROCEDURE dbo.sp_Verificar_Archivos_Cargados;
+GO
+
+CREATE PROCEDURE dbo.sp_Verificar_Archivos_Cargados
+    @NombresJson NVARCHAR(MAX)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT 
+        ct.ARCHIVO_ORIGEN AS Archivo,
+        COUNT(*) AS Total_Registros,
+        MIN(ct.FECHA_INSERCION) AS Primera_Carga,
+        MAX(ct.FECHA_INSERCION) AS Ultima_Carga,
+        MAX(ct.FECHA_ACTUALIZACION) AS Ultima_Actualizacion,
+        MIN(ct.FECHA_HORA_APERTURA) AS Evento_Mas_Antiguo,
+        MAX(ct.FECHA_HORA_APERTURA) AS Evento_Mas_Reciente
+    FROM (
+        SELECT DISTINCT NombreArchivo
+        FROM OPENJSON(@NombresJson) WITH (NombreArchivo NVARCHAR(255) '$')
+    ) AS n
+    INNER JOIN dbo.Calidad_Transmision ct ON ct.ARCHIVO_ORIGEN = n.NombreArchivo
+    GROUP BY ct.ARCHIVO_ORIGEN;
+END;
+GO
+
+PRINT '✓ SP sp_Verificar_Archivos_Cargados creado exitosamente';
+PRINT '';
+GO
+
 -- =============================================================================
 -- STORED PROCEDURE: Eliminar datos de un archivo específico
 -- =============================================================================
@@ -213,10 +721,48 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
+    BEGIN TRANSACTION;
+    
     DELETE FROM dbo.Calidad_Transmision
     WHERE ARCHIVO_ORIGEN = @NombreArchivo;
     
     SET @RegistrosEliminados = @@ROWCOUNT;
+    
+    -- Meses del archivo: el resumen se recalcula solo para ellos
+    DECLARE @Periodos TABLE (PERIODO INT PRIMARY KEY);
+    INSERT INTO @Periodos (PERIODO)
+    SELECT DISTINCT PERIODO
+    FROM dbo.Resumen_Mensual_Archivos_Transmision
+    WHERE ARCHIVO_ORIGEN = @NombreArchivo;
+    
+    DELETE FROM dbo.Resumen_Mensual_Archivos_Transmision
+    WHERE ARCHIVO_ORIGEN = @NombreArchivo;
+    
+    DELETE FROM dbo.Elementos_Mensual_Transmision
+    WHERE ARCHIVO_ORIGEN = @NombreArchivo;
+    
+    DELETE FROM dbo.Resumen_Mensual_Transmision
+    WHERE PERIODO IN (SELECT PERIODO FROM @Periodos);
+    
+    INSERT INTO dbo.Resumen_Mensual_Transmision (
+        ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD,
+        TOTAL_EVENTOS, EVENTOS_FORZADOS, EVENTOS_PROGRAMADOS,
+        TOTAL_MINUTOS, EVENTOS_CON_DURACION, MAX_MINUTOS,
+        TOTAL_CARGA_MW, EVENTOS_CON_CARGA, MAX_CARGA_MW
+    )
+    SELECT 
+        ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD,
+        SUM(TOTAL_EVENTOS), SUM(EVENTOS_FORZADOS), SUM(EVENTOS_PROGRAMADOS),
+        SUM(TOTAL_MINUTOS), SUM(EVENTOS_CON_DURACION), MAX(MAX_MINUTOS),
+        SUM(TOTAL_CARGA_MW), SUM(EVENTOS_CON_CARGA), MAX(MAX_CARGA_MW)
+    FROM dbo.Resumen_Mensual_Archivos_Transmision
+    WHERE PERIODO IN (SELECT PERIODO FROM @Periodos)
+    GROUP BY ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD;
+    
+    DELETE FROM dbo.Estadisticas_Archivos_Transmision
+    WHERE ARCHIVO_ORIGEN = @NombreArchivo;
+    
+    COMMIT TRANSACTION;
 END;
 GO
 
@@ -237,20 +783,19 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
+    -- Una fila por archivo, mantenida por el ETL (no recorre Calidad_Transmision)
     SELECT 
         ARCHIVO_ORIGEN,
-        COUNT(*) AS Total_Registros,
-        MIN(FECHA_INSERCION) AS Primera_Carga,
-        MAX(FECHA_INSERCION) AS Ultima_Carga,
-        MAX(FECHA_ACTUALIZACION) AS Ultima_Actualizacion,
-        COUNT(CASE WHEN FECHA_ACTUALIZACION IS NOT NULL THEN 1 END) AS Registros_Actualizados,
-        MIN(FECHA_HORA_APERTURA) AS Evento_Mas_Antiguo,
-        MAX(FECHA_HORA_APERTURA) AS Evento_Mas_Reciente,
-        SUM(DURACION_INDISPONIBILIDAD_MINUTOS) / 60.0 AS Total_Horas_Indisponibilidad
-    FROM dbo.Calidad_Transmision
-    WHERE ARCHIVO_ORIGEN IS NOT NULL
-    GROUP BY ARCHIVO_ORIGEN
-    ORDER BY MAX(FECHA_INSERCION) DESC;
+        TOTAL_REGISTROS AS Total_Registros,
+        PRIMERA_CARGA AS Primera_Carga,
+        ULTIMA_CARGA AS Ultima_Carga,
+        ULTIMA_ACTUALIZACION AS Ultima_Actualizacion,
+        REGISTROS_ACTUALIZADOS AS Registros_Actualizados,
+        EVENTO_MAS_ANTIGUO AS Evento_Mas_Antiguo,
+        EVENTO_MAS_RECIENTE AS Evento_Mas_Reciente,
+        TOTAL_MINUTOS / 60.0 AS Total_Horas_Indisponibilidad
+    FROM dbo.Estadisticas_Archivos_Transmision
+    ORDER BY ULTIMA_CARGA DESC;
 END;
 GO
 
@@ -306,7 +851,8 @@ BEGIN
         -- Elementos
         COUNT(DISTINCT CODIGO_ELEMENTO_AFECTADO) AS ELEMENTOS_AFECTADOS
         
-    FROM dbo.Calidad_Transmision
+    -- La vista resuelve los textos de las dimensiones en ambos modos de carga
+    FROM dbo.v_Resumen_Calidad_Transmision
     WHERE 
         FECHA_HORA_APERTURA BETWEEN @FechaInicio AND @FechaFin
         AND (@Subestacion IS NULL OR SUBESTACION = @Subestacion)
@@ -348,7 +894,7 @@ BEGIN
         SUM(DURACION_INDISPONIBILIDAD_MINUTOS) / 60.0 AS TOTAL_HORAS,
         AVG(DURACION_INDISPONIBILIDAD_MINUTOS) AS PROMEDIO_MINUTOS,
         SUM(CARGA_MEGAS) AS TOTAL_CARGA_MW
-    FROM dbo.Calidad_Transmision
+    FROM dbo.v_Resumen_Calidad_Transmision
     WHERE 
         FECHA_HORA_APERTURA BETWEEN @FechaInicio AND @FechaFin
         AND CAUSA_EVENTO IS NOT NULL
@@ -361,6 +907,148 @@ PRINT '✓ Stored Procedure sp_Top_Causas_Eventos creado exitosamente';
 PRINT '';
 GO
 
+-- =============================================================================
+-- STORED PROCEDURE: Estadísticas desde el resumen mensual
+-- =============================================================================
+-- Mismo resultado que sp_Estadisticas_Transmision, leyendo Resumen_Mensual_Transmision.
+-- El filtro de fechas se aplica por mes completo.
+
+IF OBJECT_ID('dbo.sp_Estadisticas_Transmision_Resumen', 'P') IS NOT NULL
+    DROP PROCEDURE dbo.sp_Estadisticas_Transmision_Resumen;
+GO
+
+CREATE PROCEDURE dbo.sp_Estadisticas_Transmision_Resumen
+    @FechaInicio DATETIME = NULL,
+    @FechaFin DATETIME = NULL,
+    @Subestacion NVARCHAR(100) = NULL,
+    @Region NVARCHAR(100) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Si no se especifican fechas, usar último año
+    IF @FechaInicio IS NULL
+        SET @FechaInicio = DATEADD(YEAR, -1, GETDATE());
+    
+    IF @FechaFin IS NULL
+        SET @FechaFin = GETDATE();
+    
+    DECLARE @PeriodoInicio INT = YEAR(@FechaInicio) * 100 + MONTH(@FechaInicio);
+    DECLARE @PeriodoFin INT = YEAR(@FechaFin) * 100 + MONTH(@FechaFin);
+    
+    -- Elementos distintos desde su propia tabla: el resumen no tiene el elemento
+    WITH Elementos AS (
+        SELECT 
+            SUBESTACION,
+            REGION,
+            COUNT(DISTINCT CODIGO_ELEMENTO_AFECTADO) AS ELEMENTOS_AFECTADOS
+        FROM dbo.Elementos_Mensual_Transmision
+        WHERE 
+            PERIODO BETWEEN @PeriodoInicio AND @PeriodoFin
+            AND (@Subestacion IS NULL OR SUBESTACION = @Subestacion)
+            AND (@Region IS NULL OR REGION = @Region)
+        GROUP BY SUBESTACION, REGION
+    ),
+    Resumen AS (
+        SELECT 
+            SUBESTACION,
+            REGION,
+            SUM(TOTAL_EVENTOS) AS TOTAL_EVENTOS,
+            SUM(EVENTOS_FORZADOS) AS EVENTOS_FORZADOS,
+            SUM(EVENTOS_PROGRAMADOS) AS EVENTOS_PROGRAMADOS,
+            SUM(TOTAL_MINUTOS) AS TOTAL_MINUTOS,
+            SUM(EVENTOS_CON_DURACION) AS EVENTOS_CON_DURACION,
+            MAX(MAX_MINUTOS) AS MAX_MINUTOS,
+            SUM(TOTAL_CARGA_MW) AS TOTAL_CARGA_MW,
+            SUM(EVENTOS_CON_CARGA) AS EVENTOS_CON_CARGA,
+            MAX(MAX_CARGA_MW) AS MAX_CARGA_MW
+        FROM dbo.Resumen_Mensual_Transmision
+        WHERE 
+            PERIODO BETWEEN @PeriodoInicio AND @PeriodoFin
+            AND (@Subestacion IS NULL OR SUBESTACION = @Subestacion)
+            AND (@Region IS NULL OR REGION = @Region)
+        GROUP BY SUBESTACION, REGION
+    )
+    SELECT 
+        -- Agrupación
+        COALESCE(r.SUBESTACION, 'Sin Subestación') AS SUBESTACION,
+        COALESCE(r.REGION, 'Sin Región') AS REGION,
+        
+        -- Conteos
+        r.TOTAL_EVENTOS,
+        r.EVENTOS_FORZADOS,
+        r.EVENTOS_PROGRAMADOS,
+        
+        -- Duraciones
+        r.TOTAL_MINUTOS,
+        CAST(r.TOTAL_MINUTOS / 60.0 AS DECIMAL(10,2)) AS TOTAL_HORAS,
+        r.TOTAL_MINUTOS / NULLIF(r.EVENTOS_CON_DURACION, 0) AS PROMEDIO_MINUTOS_EVENTO,
+        r.MAX_MINUTOS AS MAX_MINUTOS_EVENTO,
+        
+        -- Carga
+        r.TOTAL_CARGA_MW,
+        r.TOTAL_CARGA_MW / NULLIF(r.EVENTOS_CON_CARGA, 0) AS PROMEDIO_CARGA_MW,
+        r.MAX_CARGA_MW,
+        
+        -- Elementos
+        COALESCE(e.ELEMENTOS_AFECTADOS, 0) AS ELEMENTOS_AFECTADOS
+        
+    FROM Resumen r
+    LEFT JOIN Elementos e
+        ON (e.SUBESTACION = r.SUBESTACION OR (e.SUBESTACION IS NULL AND r.SUBESTACION IS NULL))
+        AND (e.REGION = r.REGION OR (e.REGION IS NULL AND r.REGION IS NULL))
+    ORDER BY TOTAL_HORAS DESC;
+END;
+GO
+
+PRINT '✓ Stored Procedure sp_Estadisticas_Transmision_Resumen creado exitosamente';
+PRINT '';
+GO
+
+-- =============================================================================
+-- STORED PROCEDURE: Top Causas desde el resumen mensual
+-- =============================================================================
+
+IF OBJECT_ID('dbo.sp_Top_Causas_Eventos_Resumen', 'P') IS NOT NULL
+    DROP PROCEDURE dbo.sp_Top_Causas_Eventos_Resumen;
+GO
+
+CREATE PROCEDURE dbo.sp_Top_Causas_Eventos_Resumen
+    @Top INT = 10,
+    @FechaInicio DATETIME = NULL,
+    @FechaFin DATETIME = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF @FechaInicio IS NULL
+        SET @FechaInicio = DATEADD(YEAR, -1, GETDATE());
+    
+    IF @FechaFin IS NULL
+        SET @FechaFin = GETDATE();
+    
+    DECLARE @PeriodoInicio INT = YEAR(@FechaInicio) * 100 + MONTH(@FechaInicio);
+    DECLARE @PeriodoFin INT = YEAR(@FechaFin) * 100 + MONTH(@FechaFin);
+    
+    SELECT TOP (@Top)
+        CAUSA_EVENTO,
+        SUM(TOTAL_EVENTOS) AS TOTAL_EVENTOS,
+        SUM(TOTAL_MINUTOS) / 60.0 AS TOTAL_HORAS,
+        SUM(TOTAL_MINUTOS) / NULLIF(SUM(EVENTOS_CON_DURACION), 0) AS PROMEDIO_MINUTOS,
+        SUM(TOTAL_CARGA_MW) AS TOTAL_CARGA_MW
+    FROM dbo.Resumen_Mensual_Transmision
+    WHERE 
+        PERIODO BETWEEN @PeriodoInicio AND @PeriodoFin
+        AND CAUSA_EVENTO IS NOT NULL
+    GROUP BY CAUSA_EVENTO
+    ORDER BY TOTAL_EVENTOS DESC;
+END;
+GO
+
+PRINT '✓ Stored Procedure sp_Top_Causas_Eventos_Resumen creado exitosamente';
+PRINT '';
+GO
+
 -- =============================================================================
 -- CONSULTAS DE EJEMPLO
 -- =============================================================================
@@ -373,9 +1061,16 @@ PRINT '';
 PRINT '-- Verificar si un archivo ya fue cargado:';
 PRINT 'EXEC sp_Verificar_Archivo_Cargado @NombreArchivo = ''TRANSMISION_ENE_2024.xlsx'';';
 PRINT '';
+PRINT '-- Verificar varios archivos en una sola consulta:';
+PRINT 'EXEC sp_Verificar_Archivos_Cargados @NombresJson = N''["TRANSMISION_ENE_2024.xlsx","TRANSMISION_FEB_2024.xlsx"]'';';
+PRINT '';
 PRINT '-- Ver estadísticas por archivo:';
 PRINT 'EXEC sp_Estadisticas_Por_Archivo;';
 PRINT '';
+PRINT '-- Estadísticas y top de causas desde el resumen mensual (para tableros):';
+PRINT 'EXEC sp_Estadisticas_Transmision_Resumen @FechaInicio = ''2024-01-01'', @FechaFin = ''2024-12-31'';';
+PRINT 'EXEC sp_Top_Causas_Eventos_Resumen @Top = 10;';
+PRINT '';
 PRINT '-- Ver últimos 10 eventos:';
 PRINT 'SELECT TOP 10 * FROM v_Resumen_Calidad_Transmision ORDER BY FECHA_HORA_APERTURA DESC;';
 PRINT '';
@@ -419,9 +1114,33 @@ ELSE
 IF OBJECT_ID('dbo.v_Resumen_Calidad_Transmision', 'V') IS NOT NULL
     PRINT '✓ Vista v_Resumen_Calidad_Transmision existe';
 
+IF OBJECT_ID('dbo.Dim_Subestacion', 'U') IS NOT NULL
+    PRINT '✓ Tablas de dimensión Dim_* existen';
+
+IF OBJECT_ID('dbo.Control_Cargas_Transmision', 'U') IS NOT NULL
+    PRINT '✓ Tabla Control_Cargas_Transmision existe';
+
+IF OBJECT_ID('dbo.Resumen_Mensual_Transmision', 'U') IS NOT NULL
+    PRINT '✓ Tabla Resumen_Mensual_Transmision existe';
+
+IF OBJECT_ID('dbo.Resumen_Mensual_Archivos_Transmision', 'U') IS NOT NULL
+    PRINT '✓ Tabla Resumen_Mensual_Archivos_Transmision existe';
+
+IF OBJECT_ID('dbo.Elementos_Mensual_Transmision', 'U') IS NOT NULL
+    PRINT '✓ Tabla Elementos_Mensual_Transmision existe';
+
+IF OBJECT_ID('dbo.Estadisticas_Archivos_Transmision', 'U') IS NOT NULL
+    PRINT '✓ Tabla Estadisticas_Archivos_Transmision existe';
+
+IF OBJECT_ID('dbo.Checkpoint_Cargas_Transmision', 'U') IS NOT NULL
+    PRINT '✓ Tabla Checkpoint_Cargas_Transmision existe';
+
 IF OBJECT_ID('dbo.sp_Verificar_Archivo_Cargado', 'P') IS NOT NULL
     PRINT '✓ SP sp_Verificar_Archivo_Cargado existe';
 
+IF OBJECT_ID('dbo.sp_Verificar_Archivos_Cargados', 'P') IS NOT NULL
+    PRINT '✓ SP sp_Verificar_Archivos_Cargados existe';
+
 IF OBJECT_ID('dbo.sp_Eliminar_Datos_Archivo', 'P') IS NOT NULL
     PRINT '✓ SP sp_Eliminar_Datos_Archivo existe';
 
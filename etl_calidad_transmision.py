@@ -1,13 +1,47 @@
-import pandas as pd
-import pyodbc
-from sqlalchemy import create_engine, text
-import urllib
 import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import uuid
+import random
+import queue
+import argparse
+import threading
+import importlib
+import tracemalloc
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
 
+class _ModuloDiferido:
+    """
+    Módulo que se importa recién al usar su primer atributo
+    
+    pandas, numpy y SQLAlchemy tardan casi un segundo en importarse; así
+    '--help', 'listar' o importar el script desde otra herramienta no lo pagan.
+    Hasta el primer uso el módulo no está en sys.modules; después el nombre
+    global (np, pd, sa) apunta directamente al módulo real.
+    """
+    
+    def __init__(self, nombre, alias):
+        self._nombre = nombre
+        self._alias = alias
+    
+    def __getattr__(self, atributo):
+        modulo = importlib.import_module(self._nombre)
+        globals()[self._alias] = modulo
+        return getattr(modulo, atributo)
+
+np = _ModuloDiferido('numpy', 'np')
+pd = _ModuloDiferido('pandas', 'pd')
+sa = _ModuloDiferido('sqlalchemy', 'sa')
+
 # Cargar variables de entorno desde el archivo .env
 load_dotenv()
 
@@ -15,22 +49,30 @@ load_dotenv()
 # CONFIGURACIÓN Y LOGGING
 # =============================================================================
 
-# Configurar logging
 log_dir = Path('logs')
-log_dir.mkdir(exist_ok=True)
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 log_file = log_dir / f"etl_transmision_{timestamp}.log"
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def configurar_logging(con_archivo=True, nivel=logging.INFO):
+    """
+    Configura el logging a consola y, si se indica, al archivo de log de la corrida
+    
+    Los procesos de lectura en paralelo (ETL_WORKERS) lo llaman sin archivo:
+    el archivo de log pertenece al proceso principal. La validación los inicia
+    con nivel WARNING para no repetir el detalle de limpieza de cada archivo.
+    """
+    log_handlers = [logging.StreamHandler()]
+    if con_archivo:
+        log_dir.mkdir(exist_ok=True)
+        log_handlers.insert(0, logging.FileHandler(log_file, encoding='utf-8'))
+    
+    logging.basicConfig(
+        level=nivel,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=log_handlers
+    )
+
 # =============================================================================
 # CONFIGURACIÓN DE CONEXIÓN A SQL SERVER
 # =============================================================================
@@ -41,25 +83,42 @@ password = os.getenv('SQL_PASSWORD')
 driver = os.getenv('SQL_DRIVER', 'ODBC Driver 17 for SQL Server')
 use_windows_auth = os.getenv('SQL_USE_WINDOWS_AUTH', 'false').lower() == 'true'
 
-# Validar configuración
-if not server or not database:
-    raise ValueError("Error: Faltan variables SQL_SERVER y/o SQL_DATABASE en .env")
-
-# Construir connection string
-if use_windows_auth:
-    connection_string = f'DRIVER={{{driver}}};SERVER={server};DATABASE={database};Trusted_Connection=yes'
-    logger.info("✓ Usando autenticación de Windows")
-else:
-    if not username or not password:
-        raise ValueError("Error: Se requieren SQL_USERNAME y SQL_PASSWORD")
-    connection_string = f'DRIVER={{{driver}}};SERVER={server};DATABASE={database};UID={username};PWD={password}'
-    logger.info("✓ Usando autenticación SQL Server")
-
-params = urllib.parse.quote_plus(connection_string)
-engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
+_engine = None
 
-logger.info(f"✓ Servidor: {server}")
-logger.info(f"✓ Base de datos: {database}")
+def obtener_engine():
+    """
+    Crea la primera vez y luego reutiliza el engine de SQL Server del .env
+    
+    Raises:
+        ValueError: si faltan SQL_SERVER/SQL_DATABASE o las credenciales
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+    
+    # Validar configuración
+    if not server or not database:
+        raise ValueError("Error: Faltan variables SQL_SERVER y/o SQL_DATABASE en .env")
+    
+    # Construir connection string
+    if use_windows_auth:
+        connection_string = f'DRIVER={{{driver}}};SERVER={server};DATABASE={database};Trusted_Connection=yes'
+        logger.info("✓ Usando autenticación de Windows")
+    else:
+        if not username or not password:
+            raise ValueError("Error: Se requieren SQL_USERNAME y SQL_PASSWORD")
+        connection_string = f'DRIVER={{{driver}}};SERVER={server};DATABASE={database};UID={username};PWD={password}'
+        logger.info("✓ Usando autenticación SQL Server")
+    
+    params = urllib.parse.quote_plus(connection_string)
+    # pool_pre_ping descarta conexiones caídas del pool (modo vigilancia de larga duración)
+    _engine = instrumentar_engine(
+        sa.create_engine(f"mssql+pyodbc:///?odbc_connect={params}", pool_pre_ping=True)
+    )
+    
+    logger.info(f"✓ Servidor: {server}")
+    logger.info(f"✓ Base de datos: {database}")
+    return _engine
 
 # =============================================================================
 # CONFIGURACIÓN DEL ETL
@@ -67,6 +126,89 @@ logger.info(f"✓ Base de datos: {database}")
 carpeta_excel = os.getenv('EXCEL_FOLDER_TRANSMISION', os.path.join(os.getcwd(), 'datos_transmision'))
 nombre_tabla_sql = os.getenv('SQL_TABLE_NAME', 'Calidad_Transmision')
 modo_interactivo = os.getenv('ETL_MODO_INTERACTIVO', 'true').lower() == 'true'
+# Modo de reemplazo de archivos ya cargados:
+# - completo: elimina todas las filas del archivo y lo vuelve a cargar
+# - incremental: aplica solo inserciones, actualizaciones y eliminaciones (MERGE)
+MODOS_REEMPLAZO = ('completo', 'incremental')
+modo_reemplazo = os.getenv('ETL_MODO_REEMPLAZO', 'completo').lower()
+
+# Manifiesto local de cargas (nombre, tamaño, mtime y hash SHA-256 de cada archivo)
+usar_manifiesto = os.getenv('ETL_USAR_MANIFIESTO', 'true').lower() == 'true'
+ruta_manifiesto = Path(os.getenv('ETL_MANIFIESTO', 'manifiesto_transmision.json'))
+tabla_control_cargas = os.getenv('SQL_TABLA_CONTROL_CARGAS', 'Control_Cargas_Transmision')
+
+# Resumen mensual por subestación, región y causa, mantenido en la misma transacción de cada carga
+usar_resumen_mensual = os.getenv('ETL_RESUMEN_MENSUAL', 'true').lower() == 'true'
+tabla_resumen_mensual = os.getenv('SQL_TABLA_RESUMEN_MENSUAL', 'Resumen_Mensual_Transmision')
+# Aporte de cada archivo al resumen y eventos por elemento y mes (elementos distintos)
+tabla_resumen_archivos = os.getenv('SQL_TABLA_RESUMEN_ARCHIVOS', 'Resumen_Mensual_Archivos_Transmision')
+tabla_elementos_mensual = os.getenv('SQL_TABLA_ELEMENTOS_MENSUAL', 'Elementos_Mensual_Transmision')
+
+# Estadísticas por archivo calculadas por el ETL (reporte final sin recorrer la tabla principal)
+usar_estadisticas_archivos = os.getenv('ETL_ESTADISTICAS_ARCHIVOS', 'true').lower() == 'true'
+tabla_estadisticas_archivos = os.getenv('SQL_TABLA_ESTADISTICAS_ARCHIVOS', 'Estadisticas_Archivos_Transmision')
+
+# Filas por bloque al leer la hoja FORMATO (acota la memoria de lectura)
+tamano_bloque_lectura = int(os.getenv('ETL_TAMANO_BLOQUE_LECTURA', '10000'))
+
+# Caché Parquet de los DataFrames ya leídos y limpiados (clave: hash del archivo y de las reglas)
+usar_cache = os.getenv('ETL_USAR_CACHE', 'true').lower() == 'true'
+carpeta_cache = os.getenv('ETL_CACHE_DIR', os.path.join(os.getcwd(), 'cache_transmision'))
+cache_max_mb = float(os.getenv('ETL_CACHE_MAX_MB', '2048'))
+
+# Procesos para leer y limpiar archivos en paralelo (1 = secuencial)
+workers_etl = max(1, int(os.getenv('ETL_WORKERS', '1')))
+
+# Descartar eventos (misma clave natural) ya cargados desde otros archivos o, al agregar, desde el mismo
+usar_deduplicacion = os.getenv('ETL_DEDUPLICAR_EVENTOS', 'false').lower() == 'true'
+
+# Esquema estrella: textos de baja cardinalidad como claves de tablas Dim_*
+usar_esquema_estrella = os.getenv('ETL_ESQUEMA_ESTRELLA', 'false').lower() == 'true'
+
+# Pipeline por bloques dentro de un archivo: lectura, limpieza y carga solapadas
+usar_pipeline = os.getenv('ETL_PIPELINE', 'false').lower() == 'true'
+# Bloques de ETL_TAMANO_BLOQUE_LECTURA filas en memoria a la vez como máximo
+bloques_en_vuelo = max(1, int(os.getenv('ETL_BLOQUES_EN_VUELO', '4')))
+
+# Modo vigilancia: proceso permanente que carga los archivos nuevos o modificados
+modo_vigilancia = os.getenv('ETL_MODO_VIGILANCIA', 'false').lower() == 'true'
+intervalo_vigilancia = float(os.getenv('ETL_INTERVALO_VIGILANCIA', '10'))
+estabilidad_vigilancia = float(os.getenv('ETL_ESTABILIDAD_VIGILANCIA', '30'))
+# Tope de la espera entre reintentos de un archivo que falló por la base de datos
+espera_maxima_vigilancia = float(os.getenv('ETL_ESPERA_MAXIMA_VIGILANCIA', '600'))
+
+# Estrategia de carga masiva: to_sql, fast_executemany, multi_values o bulk_csv
+METODOS_CARGA = ('to_sql', 'fast_executemany', 'multi_values', 'bulk_csv')
+metodo_carga = os.getenv('ETL_METODO_CARGA', 'fast_executemany').lower()
+tamano_lote = int(os.getenv('ETL_TAMANO_LOTE', '5000'))
+# Carpeta para los CSV de bulk_csv (debe ser accesible por el servidor SQL)
+carpeta_bulk = os.getenv('ETL_CARPETA_BULK', os.path.join(os.getcwd(), 'bulk_transmision'))
+
+# Carga reanudable: staging en lotes numerados, cada uno confirmado junto con un checkpoint
+carga_reanudable = os.getenv('ETL_CARGA_REANUDABLE', 'true').lower() == 'true'
+tabla_checkpoints = os.getenv('SQL_TABLA_CHECKPOINTS', 'Checkpoint_Cargas_Transmision')
+# Reintentos ante errores transitorios de la BD (conexión caída, deadlock, timeout)
+reintentos_bd = max(0, int(os.getenv('ETL_REINTENTOS_BD', '4')))
+espera_reintento = float(os.getenv('ETL_ESPERA_REINTENTO', '1'))
+espera_maxima_reintento = float(os.getenv('ETL_ESPERA_MAXIMA_REINTENTO', '30'))
+
+# Medir la memoria pico por etapa con tracemalloc (agrega sobrecosto a la lectura)
+medir_memoria = os.getenv('ETL_MEDIR_MEMORIA', 'false').lower() == 'true'
+# Archivo JSON con las métricas por etapa, junto al log de la corrida
+archivo_metricas = log_dir / f"etl_transmision_{timestamp}_metricas.json"
+
+def validar_configuracion():
+    """
+    Valida los modos del ETL configurados en el .env
+    
+    Raises:
+        ValueError: si ETL_MODO_REEMPLAZO o ETL_METODO_CARGA no son válidos
+    """
+    if modo_reemplazo not in MODOS_REEMPLAZO:
+        raise ValueError(f"Error: ETL_MODO_REEMPLAZO debe ser uno de {', '.join(MODOS_REEMPLAZO)}")
+    
+    if metodo_carga not in METODOS_CARGA:
+        raise ValueError(f"Error: ETL_METODO_CARGA debe ser uno de {', '.join(METODOS_CARGA)}")
 
 # =============================================================================
 # MAPEO DE COLUMNAS
@@ -96,6 +238,167 @@ COLUMN_MAPPING = {
 DATE_COLUMNS = ['FECHA_HORA_APERTURA', 'FECHA_HORA_CIERRE']
 NUMERIC_COLUMNS = ['DURACION_INDISPONIBILIDAD_MINUTOS', 'CARGA_MEGAS']
 
+# Longitud máxima de las columnas NVARCHAR de Calidad_Transmision
+# (debe coincidir con create_tables_transmision.sql; DESCRIPCION_EVENTO es NVARCHAR(MAX))
+LONGITUDES_MAXIMAS = {
+    'CODIGO_ELEMENTO_AFECTADO': 50,
+    'TIPO_EQUIPO': 100,
+    'CIRCUITOS_AFECTADOS': 255,
+    'SUBESTACION': 100,
+    'REGION': 100,
+    'CODIGO_INTERRUPTOR': 50,
+    'NIVEL_DE_TENSION': 50,
+    'PROTECCION_OPERADA': 255,
+    'ORIGEN_INDISPONIBILIDAD': 100,
+    'CAUSA_EVENTO': 255,
+    'EXCEPCIONES': 255,
+    'TIPO_INDISPONIBILIDAD': 100,
+    'TIPO_MANTENIMIENTO': 100,
+    'ARCHIVO_ORIGEN': 255,
+}
+
+# Clave natural de un evento y huellas por fila (actualización incremental)
+COLUMNAS_CLAVE_EVENTO = ['CODIGO_ELEMENTO_AFECTADO', 'FECHA_HORA_APERTURA', 'CODIGO_INTERRUPTOR']
+COLUMNAS_HUELLA = ['CLAVE_EVENTO', 'HASH_CONTENIDO']
+
+# =============================================================================
+# FUNCIONES DE INSTRUMENTACIÓN
+# =============================================================================
+
+# Etapas medidas por archivo, en el orden del RESUMEN FINAL
+ETAPAS = ('manifiesto', 'verificacion', 'lectura', 'limpieza', 'deduplicacion', 'resumen', 'dimensiones',
+          'comparacion', 'carga', 'intercambio', 'registro')
+
+# Idas y vueltas a la base de datos, por hilo: en el pipeline por bloques cada
+# hilo mide sus propias etapas
+_idas_vuelta_hilo = threading.local()
+
+def contar_idas_vuelta_bd(cantidad=1):
+    """Suma idas y vueltas a la BD del hilo actual (también las del cursor DBAPI directo)"""
+    _idas_vuelta_hilo.total = idas_vuelta_bd_hilo() + cantidad
+
+def idas_vuelta_bd_hilo():
+    """Idas y vueltas a la BD hechas hasta ahora por el hilo actual"""
+    return getattr(_idas_vuelta_hilo, 'total', 0)
+
+def _al_ejecutar_sentencia(conn, cursor, statement, parameters, context, executemany):
+    """Cuenta cada sentencia ejecutada por un engine instrumentado"""
+    contar_idas_vuelta_bd()
+
+def instrumentar_engine(engine):
+    """Registra en un engine de SQLAlchemy el conteo de idas y vueltas a la BD"""
+    if not sa.event.contains(engine, 'before_cursor_execute', _al_ejecutar_sentencia):
+        sa.event.listen(engine, 'before_cursor_execute', _al_ejecutar_sentencia)
+    return engine
+
+@contextmanager
+def medir_etapa(metricas, etapa, filas=None, memoria=True):
+    """
+    Mide tiempo, CPU, memoria pico e idas y vueltas a la BD de una etapa
+    
+    El resultado queda en metricas[etapa]; si la etapa ya fue medida, los
+    tiempos, filas e idas y vueltas se suman. Si las filas no se conocen al
+    empezar, se pueden fijar en el dict entregado por el with.
+    
+    La CPU y las idas y vueltas son las del hilo que ejecuta la etapa. La
+    memoria pico de tracemalloc es de todo el proceso: las etapas que corren
+    junto a otros hilos la omiten (memoria=False) y la registran como None.
+    
+    Args:
+        metricas: Dict de métricas del archivo
+        etapa: Una de ETAPAS
+        filas: Filas procesadas en la etapa (opcional)
+        memoria: Medir la memoria pico (con ETL_MEDIR_MEMORIA)
+    """
+    if memoria and medir_memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    memoria = memoria and tracemalloc.is_tracing()
+    if memoria:
+        tracemalloc.reset_peak()
+    
+    medicion = {'filas': filas}
+    idas_vuelta_inicio = idas_vuelta_bd_hilo()
+    inicio_cpu = time.thread_time()
+    inicio = time.perf_counter()
+    
+    try:
+        yield medicion
+    finally:
+        previa = metricas.get(etapa, {})
+        segundos = previa.get('segundos', 0.0) + time.perf_counter() - inicio
+        filas = medicion['filas'] if medicion['filas'] is not None else previa.get('filas')
+        if medicion['filas'] is not None and previa.get('filas') is not None:
+            filas += previa['filas']
+        memoria_pico_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if memoria else None
+        if previa.get('memoria_pico_mb') is not None:
+            memoria_pico_mb = max(memoria_pico_mb or 0.0, previa['memoria_pico_mb'])
+        
+        metricas[etapa] = {
+            'segundos': segundos,
+            'cpu_segundos': previa.get('cpu_segundos', 0.0) + time.thread_time() - inicio_cpu,
+            'filas': filas,
+            'filas_por_segundo': filas / segundos if filas and segundos > 0 else None,
+            'memoria_pico_mb': memoria_pico_mb,
+            'idas_vuelta_bd': previa.get('idas_vuelta_bd', 0) + idas_vuelta_bd_hilo() - idas_vuelta_inicio
+        }
+
+def agregar_metricas(resultados):
+    """
+    Agrega las métricas por etapa de todos los archivos de una corrida
+    
+    Returns:
+        Dict etapa -> totales (segundos, CPU, filas, idas y vueltas) y memoria pico máxima
+    """
+    agregadas = {}
+    
+    for resultado in resultados:
+        for etapa, medicion in resultado.get('metricas', {}).items():
+            total = agregadas.setdefault(etapa, {
+                'archivos': 0,
+                'segundos': 0.0,
+                'cpu_segundos': 0.0,
+                'filas': 0,
+                'memoria_pico_mb': None,
+                'idas_vuelta_bd': 0
+            })
+            total['archivos'] += 1
+            total['segundos'] += medicion['segundos']
+            total['cpu_segundos'] += medicion['cpu_segundos']
+            total['filas'] += medicion['filas'] or 0
+            total['idas_vuelta_bd'] += medicion['idas_vuelta_bd']
+            if medicion['memoria_pico_mb'] is not None:
+                total['memoria_pico_mb'] = max(total['memoria_pico_mb'] or 0.0, medicion['memoria_pico_mb'])
+    
+    for total in agregadas.values():
+        total['filas_por_segundo'] = total['filas'] / total['segundos'] if total['filas'] and total['segundos'] > 0 else None
+    
+    return {etapa: agregadas[etapa] for etapa in ETAPAS if etapa in agregadas}
+
+def exportar_metricas(resultados, ruta):
+    """Guarda en JSON las métricas por archivo y por etapa de la corrida"""
+    datos = {
+        'inicio': timestamp,
+        'metodo_carga': metodo_carga,
+        'tamano_lote': tamano_lote,
+        'workers': workers_etl,
+        'archivos': [
+            {
+                'archivo': resultado['archivo'],
+                'estado': resultado['estado'],
+                'accion': resultado.get('accion'),
+                'filas': resultado.get('filas', 0),
+                'metricas': resultado.get('metricas', {})
+            }
+            for resultado in resultados
+        ],
+        'etapas': agregar_metricas(resultados)
+    }
+    
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    
+    logger.info(f"✓ Métricas por etapa guardadas en: {ruta}")
+
 # =============================================================================
 # FUNCIONES DE VERIFICACIÓN DE ARCHIVOS
 # =============================================================================
@@ -108,7 +411,7 @@ def verificar_archivo_ya_cargado(engine, nombre_archivo):
         dict con información del archivo o None si no existe
     """
     try:
-        query = text("""
+        query = sa.text("""
             EXEC sp_Verificar_Archivo_Cargado @NombreArchivo = :nombre_archivo
         """)
         
@@ -128,11 +431,61 @@ def verificar_archivo_ya_cargado(engine, nombre_archivo):
                 }
             else:
                 return {'existe': False}
-                
+    
     except Exception as e:
         logger.warning(f"No se pudo verificar archivo (probablemente SP no existe): {e}")
         return {'existe': False}
 
+def verificar_archivos_cargados(engine, nombres_archivos, nombre_tabla='Calidad_Transmision'):
+    """
+    Verifica en una sola consulta cuáles de los archivos ya fueron cargados
+    
+    En SQL Server los nombres se envían como un arreglo JSON a
+    sp_Verificar_Archivos_Cargados (un GROUP BY por ARCHIVO_ORIGEN); en otros
+    motores se usa la misma consulta con un IN.
+    
+    Returns:
+        Dict nombre -> info en el formato de verificar_archivo_ya_cargado,
+        o None si la consulta no se pudo hacer (p. ej. el SP no existe)
+    """
+    nombres_archivos = list(dict.fromkeys(nombres_archivos))
+    estados = {nombre: {'existe': False} for nombre in nombres_archivos}
+    if not nombres_archivos:
+        return estados
+    
+    try:
+        if engine.dialect.name == 'mssql':
+            query = sa.text("EXEC sp_Verificar_Archivos_Cargados @NombresJson = :nombres_json")
+            params = {"nombres_json": json.dumps(nombres_archivos, ensure_ascii=False)}
+        else:
+            tabla = engine.dialect.identifier_preparer.quote(nombre_tabla)
+            query = sa.text(f"""
+                SELECT ARCHIVO_ORIGEN, COUNT(*), MIN(FECHA_INSERCION), MAX(FECHA_INSERCION),
+                       MAX(FECHA_ACTUALIZACION), MIN(FECHA_HORA_APERTURA), MAX(FECHA_HORA_APERTURA)
+                FROM {tabla}
+                WHERE ARCHIVO_ORIGEN IN :nombres
+                GROUP BY ARCHIVO_ORIGEN
+            """).bindparams(sa.bindparam('nombres', expanding=True))
+            params = {"nombres": nombres_archivos}
+        
+        with engine.connect() as conn:
+            for row in conn.execute(query, params):
+                estados[row[0]] = {
+                    'existe': True,
+                    'total_registros': row[1],
+                    'primera_carga': row[2],
+                    'ultima_carga': row[3],
+                    'ultima_actualizacion': row[4],
+                    'evento_mas_antiguo': row[5],
+                    'evento_mas_reciente': row[6]
+                }
+        
+        return estados
+    
+    except Exception as e:
+        logger.warning(f"No se pudo verificar los archivos en lote, se verificarán uno a uno: {e}")
+        return None
+
 def eliminar_datos_archivo(engine, nombre_archivo):
     """
     Elimina todos los registros de un archivo específico
@@ -141,7 +494,7 @@ def eliminar_datos_archivo(engine, nombre_archivo):
         Número de registros eliminados
     """
     try:
-        query = text("""
+        query = sa.text("""
             DECLARE @RegistrosEliminados INT;
             EXEC sp_Eliminar_Datos_Archivo 
                 @NombreArchivo = :nombre_archivo,
@@ -153,22 +506,30 @@ def eliminar_datos_archivo(engine, nombre_archivo):
             result = conn.execute(query, {"nombre_archivo": nombre_archivo})
             registros_eliminados = result.scalar()
             conn.commit()
+            if _indice_eventos is not None:
+                _indice_eventos.pop(nombre_archivo, None)
             return registros_eliminados
-            
+    
     except Exception as e:
         logger.error(f"Error al eliminar datos del archivo: {e}")
         return 0
 
-def solicitar_accion_usuario(info_archivo):
+def solicitar_accion_usuario(info_archivo, contenido_modificado=False):
     """
     Pregunta al usuario qué hacer con un archivo duplicado
     
+    Args:
+        contenido_modificado: True si el manifiesto detectó que el contenido
+            cambió desde la última carga (candidato a reemplazo)
+    
     Returns:
-        'skip', 'replace', o 'append'
+        'skip', 'replace', 'append' o 'upsert'
     """
     print("\n" + "="*60)
     print("⚠️  ARCHIVO YA CARGADO PREVIAMENTE")
     print("="*60)
+    if contenido_modificado:
+        print("🔄 El contenido del archivo cambió desde la última carga (se sugiere REEMPLAZAR)")
     print(f"📊 Total de registros existentes: {info_archivo['total_registros']}")
     print(f"📅 Primera carga: {info_archivo['primera_carga']}")
     print(f"📅 Última carga: {info_archivo['ultima_carga']}")
@@ -192,12 +553,20 @@ def solicitar_accion_usuario(info_archivo):
     print("")
     print("  3️⃣  AGREGAR")
     print("      └─ Mantener los datos antiguos en la base de datos")
-    print("      └─ Agregar los datos nuevos (⚠️  creará duplicados)")
-    print("      └─ Solo usar si necesitas mantener ambas versiones")
+    if usar_deduplicacion:
+        print("      └─ Agregar solo los eventos que aún no están cargados (ETL_DEDUPLICAR_EVENTOS)")
+    else:
+        print("      └─ Agregar los datos nuevos (⚠️  creará duplicados)")
+        print("      └─ Solo usar si necesitas mantener ambas versiones")
+    print("")
+    print("  4️⃣  ACTUALIZAR (INCREMENTAL)")
+    print("      └─ Comparar el archivo con los registros existentes")
+    print("      └─ Insertar, actualizar o eliminar solo los eventos que cambiaron")
+    print("      └─ Los eventos sin cambios conservan su FECHA_INSERCION")
     
     while True:
         print("\n" + "-"*60)
-        opcion = input(" Selecciona una opción (1, 2 o 3): ").strip()
+        opcion = input(" Selecciona una opción (1, 2, 3 o 4): ").strip()
         
         if opcion == '1':
             print("✓ Has seleccionado: SALTAR archivo")
@@ -213,310 +582,3321 @@ def solicitar_accion_usuario(info_archivo):
                 logger.info("Usuario eligió: REEMPLAZAR datos")
                 return 'replace'
         elif opcion == '3':
-            print("⚠️  Has seleccionado: AGREGAR datos (creará duplicados)")
+            if usar_deduplicacion:
+                print("➕ Has seleccionado: AGREGAR solo los eventos que aún no están cargados")
+            else:
+                print("⚠️  Has seleccionado: AGREGAR datos (creará duplicados)")
             confirmacion = input("  ¿Confirmas? (S/N): ").strip().upper()
             if confirmacion == 'S':
-                logger.info("Usuario eligió: AGREGAR datos (duplicados)")
+                if usar_deduplicacion:
+                    logger.info("Usuario eligió: AGREGAR datos (sin eventos ya cargados)")
+                else:
+                    logger.info("Usuario eligió: AGREGAR datos (duplicados)")
                 return 'append'
+        elif opcion == '4':
+            print("🔄 Has seleccionado: ACTUALIZAR datos de forma incremental")
+            confirmacion = input("  ¿Confirmas? (S/N): ").strip().upper()
+            if confirmacion == 'S':
+                logger.info("Usuario eligió: ACTUALIZAR datos (incremental)")
+                return 'upsert'
         else:
-            print("❌ Opción inválida. Por favor selecciona 1, 2 o 3")
+            print("❌ Opción inválida. Por favor selecciona 1, 2, 3 o 4")
 
 # =============================================================================
-# FUNCIONES DE PROCESAMIENTO
+# FUNCIONES DE MANIFIESTO DE CARGAS
 # =============================================================================
 
-def obtener_archivos_excel(carpeta):
-    """Obtiene todos los archivos Excel (.xlsx, .xls) de una carpeta"""
-    ruta = Path(carpeta)
-    archivos_excel = []
+def calcular_hash_archivo(ruta, tamano_bloque=1024 * 1024):
+    """Calcula el hash SHA-256 del contenido de un archivo"""
+    sha256 = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            sha256.update(bloque)
+    return sha256.hexdigest()
+
+def cargar_manifiesto(ruta):
+    """
+    Lee el manifiesto local de cargas
     
-    for extension in ['*.xlsx', '*.xls']:
-        archivos_excel.extend(ruta.glob(extension))
+    Returns:
+        Dict nombre de archivo → {tamano, mtime, sha256, filas, fecha_carga}
+    """
+    if not ruta.exists():
+        return {}
     
-    return sorted(archivos_excel)
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError) as e:
+        logger.warning(f"No se pudo leer el manifiesto {ruta}, se ignorará: {e}")
+        return {}
 
-def limpiar_y_preparar_datos(df, nombre_archivo):
-    """Limpia y prepara el DataFrame, agregando columna de archivo origen"""
-    logger.info(f"\n{'='*60}")
-    logger.info("LIMPIEZA Y PREPARACIÓN DE DATOS")
-    logger.info(f"{'='*60}")
+def guardar_manifiesto(manifiesto, ruta):
+    """Escribe el manifiesto local de forma atómica (archivo temporal + reemplazo)"""
+    ruta_temporal = ruta.with_name(ruta.name + '.tmp')
+    with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+    os.replace(ruta_temporal, ruta)
+
+def sincronizar_manifiesto_desde_control(engine, manifiesto):
+    """
+    Completa el manifiesto local con la tabla de control de cargas
     
-    filas_iniciales = len(df)
+    Útil cuando el ETL corre en un equipo nuevo sin manifiesto local.
+    """
+    try:
+        query = sa.text(f"""
+            SELECT ARCHIVO_ORIGEN, TAMANO_BYTES, FECHA_MODIFICACION, HASH_SHA256,
+                   TOTAL_REGISTROS, FECHA_CARGA
+            FROM {tabla_control_cargas}
+        """)
+        
+        with engine.connect() as conn:
+            for row in conn.execute(query):
+                manifiesto.setdefault(row[0], {
+                    'tamano': row[1],
+                    'mtime': row[2].timestamp() if row[2] else None,
+                    'sha256': row[3],
+                    'filas': row[4],
+                    'fecha_carga': str(row[5])
+                })
+    except Exception as e:
+        logger.warning(f"No se pudo leer la tabla de control de cargas (probablemente no existe): {e}")
     
-    # 1. Mapear columnas
-    logger.info("\n1. Mapeando columnas...")
-    columnas_a_renombrar = {}
+    return manifiesto
+
+def consultar_manifiesto(manifiesto, archivo_excel):
+    """
+    Compara un archivo contra el manifiesto de cargas
     
-    for col_excel in df.columns:
-        if col_excel in COLUMN_MAPPING:
-            columnas_a_renombrar[col_excel] = COLUMN_MAPPING[col_excel]
+    Si nombre, tamaño y mtime coinciden no se lee el archivo; en otro caso se
+    calcula su hash SHA-256.
     
-    if columnas_a_renombrar:
-        df = df.rename(columns=columnas_a_renombrar)
+    Returns:
+        Dict con 'estado' ('sin_cambios', 'modificado', 'renombrado' o 'nuevo'),
+        'huella' del archivo y 'archivo_previo' si el contenido ya se cargó con otro nombre
+    """
+    ruta = Path(archivo_excel)
+    info = ruta.stat()
+    entrada = manifiesto.get(ruta.name)
+    huella = {'tamano': info.st_size, 'mtime': info.st_mtime}
     
-    columnas_validas = list(COLUMN_MAPPING.values())
-    columnas_a_mantener = [col for col in df.columns if col in columnas_validas]
-    df = df[columnas_a_mantener]
+    if entrada and entrada['tamano'] == info.st_size and entrada['mtime'] == info.st_mtime:
+        huella['sha256'] = entrada['sha256']
+        return {'estado': 'sin_cambios', 'huella': huella}
     
-    # 2. Eliminar filas vacías
-    logger.info("\n2. Eliminando filas vacías...")
-    df = df.dropna(how='all')
+    huella['sha256'] = calcular_hash_archivo(ruta)
     
-    # 3. Filtrar filas sin fecha de apertura
-    logger.info("\n3. Validando fecha de apertura...")
-    if 'FECHA_HORA_APERTURA' in df.columns:
-        df = df.dropna(subset=['FECHA_HORA_APERTURA'])
-        logger.info(f"   ✓ Filas con fecha válida: {len(df)}")
-    
-    # 4. Convertir fechas
-    logger.info("\n4. Convirtiendo columnas de fecha...")
-    for col in DATE_COLUMNS:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-    
-    # 5. Convertir numéricos
-    logger.info("\n5. Convirtiendo columnas numéricas...")
-    for col in NUMERIC_COLUMNS:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # 6. Limpiar strings
-    for col in df.select_dtypes(include=['object']):
-        df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
-    
-    # 7. Reemplazar valores vacíos
-    df = df.replace({pd.NA: None, pd.NaT: None, '': None})
+    if entrada:
+        estado = 'sin_cambios' if entrada['sha256'] == huella['sha256'] else 'modificado'
+        return {'estado': estado, 'huella': huella}
     
-    # 8. AGREGAR COLUMNA DE ARCHIVO ORIGEN
-    logger.info(f"\n6. Agregando columna ARCHIVO_ORIGEN...")
-    df['ARCHIVO_ORIGEN'] = nombre_archivo
-    logger.info(f"   ✓ Archivo origen: {nombre_archivo}")
+    for nombre_previo, datos in manifiesto.items():
+        if datos['sha256'] == huella['sha256']:
+            return {'estado': 'renombrado', 'huella': huella, 'archivo_previo': nombre_previo}
     
-    logger.info(f"\n{'='*60}")
-    logger.info(f"✓ Limpieza completada:")
-    logger.info(f"  - Total de filas: {len(df)} (de {filas_iniciales} iniciales)")
-    logger.info(f"  - Total de columnas: {len(df.columns)}")
-    logger.info(f"{'='*60}")
+    return {'estado': 'nuevo', 'huella': huella}
+
+def registrar_carga(engine, manifiesto, nombre_archivo, huella, filas):
+    """Registra un archivo cargado en el manifiesto local y en la tabla de control"""
+    manifiesto[nombre_archivo] = {
+        **huella,
+        'filas': filas,
+        'fecha_carga': datetime.now().isoformat(timespec='seconds')
+    }
+    guardar_manifiesto(manifiesto, ruta_manifiesto)
     
-    return df
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                sa.text(f"DELETE FROM {tabla_control_cargas} WHERE ARCHIVO_ORIGEN = :archivo"),
+                {"archivo": nombre_archivo}
+            )
+            conn.execute(
+                sa.text(f"""
+                    INSERT INTO {tabla_control_cargas}
+                        (ARCHIVO_ORIGEN, TAMANO_BYTES, FECHA_MODIFICACION, HASH_SHA256, TOTAL_REGISTROS)
+                    VALUES (:archivo, :tamano, :mtime, :sha256, :filas)
+                """),
+                {
+                    "archivo": nombre_archivo,
+                    "tamano": huella['tamano'],
+                    "mtime": datetime.fromtimestamp(huella['mtime']),
+                    "sha256": huella['sha256'],
+                    "filas": filas
+                }
+            )
+    except Exception as e:
+        logger.warning(f"No se pudo actualizar la tabla de control de cargas: {e}")
+
+# =============================================================================
+# FUNCIONES DE CARGA MASIVA
+# =============================================================================
+
+# Límites de parámetros por sentencia de cada motor (SQL Server admite 2100,
+# SQLite 999 en versiones antiguas). SQL Server acepta máximo 1000 filas por VALUES.
+MAX_PARAMETROS_SENTENCIA = {'mssql': 2000, 'sqlite': 999}
+MAX_FILAS_VALUES = 1000
+
+DDL_SQLITE_CALIDAD_TRANSMISION = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        FECHA_HORA_APERTURA DATETIME NULL,
+        FECHA_HORA_CIERRE DATETIME NULL,
+        DURACION_INDISPONIBILIDAD_MINUTOS DECIMAL(18,2) NULL,
+        CARGA_MEGAS DECIMAL(18,2) NULL,
+        CODIGO_ELEMENTO_AFECTADO NVARCHAR(50) NULL,
+        TIPO_EQUIPO NVARCHAR(100) NULL,
+        CIRCUITOS_AFECTADOS NVARCHAR(255) NULL,
+        SUBESTACION NVARCHAR(100) NULL,
+        REGION NVARCHAR(100) NULL,
+        CODIGO_INTERRUPTOR NVARCHAR(50) NULL,
+        NIVEL_DE_TENSION NVARCHAR(50) NULL,
+        PROTECCION_OPERADA NVARCHAR(255) NULL,
+        ORIGEN_INDISPONIBILIDAD NVARCHAR(100) NULL,
+        CAUSA_EVENTO NVARCHAR(255) NULL,
+        EXCEPCIONES NVARCHAR(255) NULL,
+        TIPO_INDISPONIBILIDAD NVARCHAR(100) NULL,
+        TIPO_MANTENIMIENTO NVARCHAR(100) NULL,
+        DESCRIPCION_EVENTO TEXT NULL,
+        ARCHIVO_ORIGEN NVARCHAR(255) NULL,
+        CLAVE_EVENTO BIGINT NULL,
+        HASH_CONTENIDO BIGINT NULL,
+        ID_SUBESTACION INT NULL,
+        ID_REGION INT NULL,
+        ID_TIPO_EQUIPO INT NULL,
+        ID_NIVEL_DE_TENSION INT NULL,
+        ID_ORIGEN_INDISPONIBILIDAD INT NULL,
+        ID_CAUSA_EVENTO INT NULL,
+        ID_TIPO_INDISPONIBILIDAD INT NULL,
+        ID_TIPO_MANTENIMIENTO INT NULL,
+        FECHA_INSERCION DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FECHA_ACTUALIZACION DATETIME NULL
+    )
+"""
+
+DDL_SQLITE_RESUMEN_MENSUAL = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ANIO INT NOT NULL,
+        MES INT NOT NULL,
+        SUBESTACION NVARCHAR(100) NULL,
+        REGION NVARCHAR(100) NULL,
+        CAUSA_EVENTO NVARCHAR(255) NULL,
+        TIPO_INDISPONIBILIDAD NVARCHAR(100) NULL,{columnas_archivo}
+        TOTAL_EVENTOS INT NOT NULL,
+        EVENTOS_FORZADOS INT NOT NULL,
+        EVENTOS_PROGRAMADOS INT NOT NULL,
+        TOTAL_MINUTOS DECIMAL(18,2) NULL,
+        EVENTOS_CON_DURACION INT NOT NULL,
+        MAX_MINUTOS DECIMAL(18,2) NULL,
+        TOTAL_CARGA_MW DECIMAL(18,2) NULL,
+        EVENTOS_CON_CARGA INT NOT NULL,
+        MAX_CARGA_MW DECIMAL(18,2) NULL,
+        FECHA_ACTUALIZACION DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+DDL_SQLITE_ELEMENTOS_MENSUAL = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        ANIO INT NOT NULL,
+        MES INT NOT NULL,
+        SUBESTACION NVARCHAR(100) NULL,
+        REGION NVARCHAR(100) NULL,
+        CODIGO_ELEMENTO_AFECTADO NVARCHAR(50) NOT NULL,
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL,
+        TOTAL_EVENTOS INT NOT NULL
+    )
+"""
 
-def procesar_archivo(archivo_excel, engine, nombre_tabla):
+DDL_SQLITE_ESTADISTICAS_ARCHIVOS = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL PRIMARY KEY,
+        TOTAL_REGISTROS INT NOT NULL,
+        PRIMERA_CARGA DATETIME NULL,
+        ULTIMA_CARGA DATETIME NULL,
+        ULTIMA_ACTUALIZACION DATETIME NULL,
+        REGISTROS_ACTUALIZADOS INT NOT NULL,
+        EVENTO_MAS_ANTIGUO DATETIME NULL,
+        EVENTO_MAS_RECIENTE DATETIME NULL,
+        TOTAL_MINUTOS DECIMAL(18,2) NULL
+    )
+"""
+
+DDL_SQLITE_DIMENSION = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        {clave} INTEGER PRIMARY KEY AUTOINCREMENT,
+        VALOR NVARCHAR({longitud}) NOT NULL UNIQUE
+    )
+"""
+
+DDL_SQLITE_CHECKPOINTS = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL PRIMARY KEY,
+        HUELLA CHAR(64) NOT NULL,
+        TABLA_STAGING NVARCHAR(128) NOT NULL,
+        ULTIMO_LOTE INT NOT NULL,
+        FILAS_CONFIRMADAS INT NOT NULL,
+        FECHA_ACTUALIZACION DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+DDL_SQLITE_CONTROL_CARGAS = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL PRIMARY KEY,
+        TAMANO_BYTES BIGINT NOT NULL,
+        FECHA_MODIFICACION DATETIME NOT NULL,
+        HASH_SHA256 CHAR(64) NOT NULL,
+        TOTAL_REGISTROS INT NULL,
+        FECHA_CARGA DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def crear_engine_sqlite(ruta_bd=':memory:', nombre_tabla='Calidad_Transmision'):
     """
-    Procesa un archivo Excel con verificación de duplicados
+    Crea un engine SQLite con las tablas de calidad de transmisión, de control,
+    de checkpoints, de resumen, de estadísticas por archivo y de dimensiones
     
-    Returns:
-        Dict con resultado de la operación
+    Permite probar y comparar las estrategias de carga sin SQL Server.
     """
-    nombre_archivo = os.path.basename(archivo_excel)
-    
-    logger.info(f"\n{'#'*60}")
-    logger.info(f"PROCESANDO ARCHIVO: {nombre_archivo}")
-    logger.info(f"{'#'*60}")
+    engine_sqlite = instrumentar_engine(sa.create_engine(f"sqlite:///{ruta_bd}"))
+    with engine_sqlite.begin() as conn:
+        conn.execute(sa.text(DDL_SQLITE_CALIDAD_TRANSMISION.format(tabla=nombre_tabla)))
+        conn.execute(sa.text(DDL_SQLITE_CONTROL_CARGAS.format(tabla=tabla_control_cargas)))
+        conn.execute(sa.text(DDL_SQLITE_CHECKPOINTS.format(tabla=tabla_checkpoints)))
+        conn.execute(sa.text(DDL_SQLITE_RESUMEN_MENSUAL.format(tabla=tabla_resumen_mensual, columnas_archivo='')))
+        conn.execute(sa.text(DDL_SQLITE_RESUMEN_MENSUAL.format(
+            tabla=tabla_resumen_archivos, columnas_archivo="\n        ARCHIVO_ORIGEN NVARCHAR(255) NOT NULL,"
+        )))
+        conn.execute(sa.text(DDL_SQLITE_ELEMENTOS_MENSUAL.format(tabla=tabla_elementos_mensual)))
+        conn.execute(sa.text(DDL_SQLITE_ESTADISTICAS_ARCHIVOS.format(tabla=tabla_estadisticas_archivos)))
+        for columna, tabla in DIMENSIONES.items():
+            conn.execute(sa.text(DDL_SQLITE_DIMENSION.format(
+                tabla=tabla, clave=f"ID_{columna}", longitud=LONGITUDES_MAXIMAS[columna]
+            )))
+    return engine_sqlite
+
+@contextmanager
+def _conexion_dbapi(destino):
+    """
+    Entrega la conexión DBAPI de un Engine o de una Connection de SQLAlchemy
     
-    try:
-        # PASO 1: Verificar si el archivo ya fue cargado
-        logger.info("\n1. Verificando si el archivo ya fue cargado...")
-        info_archivo = verificar_archivo_ya_cargado(engine, nombre_archivo)
-        
-        accion = 'append'  # Default
-        
-        if info_archivo['existe']:
-            logger.warning(f"⚠️  El archivo ya fue cargado ({info_archivo['total_registros']} registros)")
-            
-            if modo_interactivo:
-                # Preguntar al usuario qué hacer
-                accion = solicitar_accion_usuario(info_archivo)
-                
-                if accion == 'skip':
-                    logger.info("✓ Archivo saltado por el usuario")
-                    return {
-                        'archivo': nombre_archivo,
-                        'estado': 'saltado',
-                        'filas': 0
-                    }
+    Con un Engine se confirma la transacción al terminar; con una Connection
+    la transacción pertenece a quien llama.
+    """
+    if isinstance(destino, sa.Engine):
+        conexion = destino.raw_connection()
+        try:
+            yield conexion
+            conexion.commit()
+        except Exception:
+            conexion.rollback()
+            raise
+        finally:
+            conexion.close()
+    else:
+        yield destino.connection
+
+def _valores_para_insertar(df, dialecto):
+    """Convierte el DataFrame en una lista de tuplas con tipos nativos de Python"""
+    columnas = []
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            if dialecto == 'sqlite':
+                valores = serie.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
             else:
-                # Modo no interactivo: saltar automáticamente
-                logger.info("✓ Modo no interactivo: saltando archivo duplicado")
-                return {
-                    'archivo': nombre_archivo,
-                    'estado': 'saltado',
-                    'filas': 0
-                }
+                valores = pd.Series(serie.dt.to_pydatetime(), index=serie.index, dtype=object)
         else:
-            logger.info("✓ Archivo nuevo, procediendo con la carga")
-        
-        # PASO 2: Leer la hoja FORMATO
-        xls = pd.ExcelFile(archivo_excel)
-        if 'FORMATO' not in xls.sheet_names:
-            logger.error(f"✗ Hoja 'FORMATO' no encontrada")
-            return {
-                'archivo': nombre_archivo,
-                'estado': 'error',
-                'mensaje': "Hoja 'FORMATO' no encontrada"
-            }
-        
-        logger.info(f"\n2. Leyendo hoja 'FORMATO'...")
-        df = pd.read_excel(archivo_excel, sheet_name='FORMATO')
-        logger.info(f"✓ Datos leídos: {len(df)} filas, {len(df.columns)} columnas")
-        
-        # PASO 3: Limpiar y preparar datos
-        df = limpiar_y_preparar_datos(df, nombre_archivo)
-        
-        if len(df) == 0:
-            logger.warning("⚠️  No hay datos válidos después de la limpieza")
-            return {
-                'archivo': nombre_archivo,
-                'estado': 'sin_datos',
-                'filas': 0
-            }
-        
-        # PASO 4: Si es reemplazo, eliminar datos antiguos primero
-        if accion == 'replace':
-            logger.info(f"\n3. Eliminando datos antiguos del archivo...")
-            registros_eliminados = eliminar_datos_archivo(engine, nombre_archivo)
-            logger.info(f"✓ Registros eliminados: {registros_eliminados}")
-            
-            # Agregar FECHA_ACTUALIZACION
-            df['FECHA_ACTUALIZACION'] = datetime.now()
-            logger.info(f"✓ Marcando registros con FECHA_ACTUALIZACION")
-        
-        # PASO 5: Cargar a SQL Server
-        logger.info(f"\n{'='*60}")
-        logger.info(f"CARGANDO DATOS A SQL SERVER")
-        logger.info(f"{'='*60}")
-        logger.info(f"Tabla destino: {nombre_tabla}")
-        logger.info(f"Modo: {'REEMPLAZO' if accion == 'replace' else 'AGREGAR'}")
-        logger.info(f"Filas a insertar: {len(df)}")
-        
-        df.to_sql(
-            name=nombre_tabla,
-            con=engine,
-            if_exists='append',  # Siempre append (ya eliminamos si era replace)
+            valores = serie.astype(object)
+        columnas.append(valores.where(serie.notna(), None).tolist())
+    return list(zip(*columnas))
+
+def _sentencia_insert(destino, nombre_tabla, columnas, filas_por_sentencia=1):
+    """Construye un INSERT parametrizado (qmark) para una o varias filas"""
+    preparer = destino.dialect.identifier_preparer
+    lista_columnas = ', '.join(preparer.quote(col) for col in columnas)
+    marcadores = '(' + ', '.join(['?'] * len(columnas)) + ')'
+    valores = ', '.join([marcadores] * filas_por_sentencia)
+    return f"INSERT INTO {preparer.quote(nombre_tabla)} ({lista_columnas}) VALUES {valores}"
+
+def _cargar_to_sql(df, destino, nombre_tabla, tamano):
+    """Carga con DataFrame.to_sql (un INSERT por fila, comportamiento original)"""
+    df.to_sql(
+        name=nombre_tabla,
+        con=destino,
+        if_exists='append',
+        index=False,
+        chunksize=tamano
+    )
+    return -(-len(df) // tamano)
+
+def _cargar_fast_executemany(df, destino, nombre_tabla, tamano):
+    """Carga con executemany en lotes; en SQL Server activa fast_executemany de pyodbc"""
+    dialecto = destino.dialect.name
+    filas = _valores_para_insertar(df, dialecto)
+    sentencia = _sentencia_insert(destino, nombre_tabla, df.columns)
+    lotes = 0
+    
+    with _conexion_dbapi(destino) as conexion:
+        cursor = conexion.cursor()
+        if dialecto == 'mssql':
+            cursor.fast_executemany = True
+        for inicio in range(0, len(filas), tamano):
+            cursor.executemany(sentencia, filas[inicio:inicio + tamano])
+            lotes += 1
+        cursor.close()
+    
+    return lotes
+
+def _cargar_multi_values(df, destino, nombre_tabla, tamano):
+    """Carga con INSERT ... VALUES de múltiples filas por sentencia"""
+    dialecto = destino.dialect.name
+    filas = _valores_para_insertar(df, dialecto)
+    num_columnas = len(df.columns)
+    max_parametros = MAX_PARAMETROS_SENTENCIA.get(dialecto, 999)
+    filas_por_sentencia = max(1, min(tamano, MAX_FILAS_VALUES, max_parametros // num_columnas))
+    sentencia = _sentencia_insert(destino, nombre_tabla, df.columns, filas_por_sentencia)
+    lotes = 0
+    
+    with _conexion_dbapi(destino) as conexion:
+        cursor = conexion.cursor()
+        for inicio in range(0, len(filas), filas_por_sentencia):
+            lote = filas[inicio:inicio + filas_por_sentencia]
+            if len(lote) != filas_por_sentencia:
+                sentencia = _sentencia_insert(destino, nombre_tabla, df.columns, len(lote))
+            cursor.execute(sentencia, [valor for fila in lote for valor in fila])
+            lotes += 1
+        cursor.close()
+    
+    return lotes
+
+def _cargar_bulk_csv(df, destino, nombre_tabla, tamano):
+    """
+    Carga escribiendo un CSV temporal y usando BULK INSERT sobre una tabla temporal
+    
+    En SQL Server la carpeta ETL_CARPETA_BULK debe ser accesible por el servidor.
+    En SQLite se emula leyendo el CSV e insertándolo en una tabla temporal.
+    """
+    dialecto = destino.dialect.name
+    preparer = destino.dialect.identifier_preparer
+    lista_columnas = ', '.join(preparer.quote(col) for col in df.columns)
+    tabla = preparer.quote(nombre_tabla)
+    
+    carpeta = Path(carpeta_bulk)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta_csv = carpeta / f"{nombre_tabla}_{uuid.uuid4().hex}.csv"
+    lotes = 0
+    
+    if dialecto == 'mssql':
+        # DATETIME guarda milisegundos (redondeados a 1/300 s), igual que con los
+        # otros cargadores; el texto ISO 8601 con más de 3 decimales no convierte
+        df = df.copy()
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = df[col].dt.round('ms').dt.strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3]
+    
+    try:
+        df.to_csv(
+            ruta_csv,
             index=False,
-            chunksize=500
+            header=False,
+            encoding='utf-8',
+            lineterminator='\n',
+            date_format='%Y-%m-%d %H:%M:%S.%f'
         )
         
-        logger.info(f"\n✓ Datos cargados exitosamente a la tabla '{nombre_tabla}'")
-        
-        return {
-            'archivo': nombre_archivo,
-            'estado': 'éxito',
-            'accion': accion,
-            'filas': len(df)
-        }
-        
-    except Exception as e:
-        logger.error(f"\n✗ Error procesando archivo: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return {
-            'archivo': nombre_archivo,
-            'estado': 'error',
-            'mensaje': str(e)
-        }
+        with _conexion_dbapi(destino) as conexion:
+            cursor = conexion.cursor()
+            if dialecto == 'mssql':
+                cursor.execute(f"SELECT TOP 0 {lista_columnas} INTO #carga_bulk FROM {tabla}")
+                # La ruta va como literal de T-SQL: las comillas simples se duplican
+                ruta_sql = str(ruta_csv.resolve()).replace("'", "''")
+                cursor.execute(f"""
+                    BULK INSERT #carga_bulk FROM '{ruta_sql}'
+                    WITH (FORMAT = 'CSV', CODEPAGE = '65001', ROWTERMINATOR = '0x0a',
+                          KEEPNULLS, TABLOCK, BATCHSIZE = {tamano})
+                """)
+                cursor.execute(f"INSERT INTO {tabla} ({lista_columnas}) SELECT {lista_columnas} FROM #carga_bulk")
+                cursor.execute("DROP TABLE #carga_bulk")
+                lotes = -(-len(df) // tamano)
+            else:
+                cursor.execute(f"CREATE TEMP TABLE carga_bulk AS SELECT {lista_columnas} FROM {tabla} WHERE 0")
+                sentencia = _sentencia_insert(destino, 'carga_bulk', df.columns)
+                with open(ruta_csv, encoding='utf-8', newline='') as archivo_csv:
+                    lector = csv.reader(archivo_csv)
+                    while True:
+                        lote = [tuple(valor or None for valor in fila) for _, fila in zip(range(tamano), lector)]
+                        if not lote:
+                            break
+                        cursor.executemany(sentencia, lote)
+                        lotes += 1
+                cursor.execute(f"INSERT INTO {tabla} ({lista_columnas}) SELECT {lista_columnas} FROM carga_bulk")
+                cursor.execute("DROP TABLE carga_bulk")
+            cursor.close()
+    finally:
+        ruta_csv.unlink(missing_ok=True)
+    
+    return lotes
+
+CARGADORES = {
+    'to_sql': _cargar_to_sql,
+    'fast_executemany': _cargar_fast_executemany,
+    'multi_values': _cargar_multi_values,
+    'bulk_csv': _cargar_bulk_csv,
+}
+
+def cargar_dataframe(df, destino, nombre_tabla, metodo=None, tamano=None):
+    """
+    Inserta un DataFrame en la tabla destino con la estrategia de carga indicada
+    
+    Args:
+        destino: Engine o Connection de SQLAlchemy (SQL Server o SQLite)
+        metodo: Una de METODOS_CARGA (por defecto ETL_METODO_CARGA)
+        tamano: Filas por lote (por defecto ETL_TAMANO_LOTE)
+    
+    Returns:
+        Dict con método, filas, lotes, segundos y filas_por_segundo
+    """
+    metodo = metodo or metodo_carga
+    tamano = tamano or tamano_lote
+    
+    if metodo not in CARGADORES:
+        raise ValueError(f"Método de carga no soportado: {metodo}")
+    
+    inicio = time.perf_counter()
+    lotes = CARGADORES[metodo](df, destino, nombre_tabla, tamano) if len(df) else 0
+    segundos = time.perf_counter() - inicio
+    
+    # Los cargadores con cursor DBAPI no pasan por los eventos de SQLAlchemy
+    if metodo != 'to_sql':
+        contar_idas_vuelta_bd(lotes)
+    
+    return {
+        'metodo': metodo,
+        'filas': len(df),
+        'lotes': lotes,
+        'segundos': segundos,
+        'filas_por_segundo': len(df) / segundos if segundos > 0 else 0.0
+    }
 
 # =============================================================================
-# EJECUTAR EL PROCESO
+# CARGA REANUDABLE Y REINTENTOS
 # =============================================================================
 
-if __name__ == "__main__":
-    logger.info("="*60)
-    logger.info("ETL CALIDAD DE TRANSMISIÓN - INICIO")
+# SQLSTATE de ODBC de fallas pasajeras: enlace de comunicación caído, conexión
+# rechazada, deadlock o serialización y tiempo de espera agotado
+ESTADOS_SQL_TRANSITORIOS = ('08S01', '08001', '08004', '40001', 'HYT00', 'HYT01')
+# Errores nativos de SQL Server que pyodbc informa entre paréntesis (1205: víctima de deadlock)
+ERRORES_NATIVOS_TRANSITORIOS = ('(1205)',)
+
+def es_error_transitorio(error):
+    """
+    Indica si un error de la BD es pasajero y conviene reintentar la operación
+    
+    Acepta errores de SQLAlchemy (DBAPIError) y de pyodbc: pyodbc deja el
+    SQLSTATE en args[0] y el código nativo entre paréntesis en el mensaje.
+    """
+    if getattr(error, 'connection_invalidated', False):
+        return True
+    
+    original = getattr(error, 'orig', None) or error
+    argumentos = getattr(original, 'args', ())
+    estado = argumentos[0] if argumentos and isinstance(argumentos[0], str) else ''
+    mensaje = str(original)
+    return estado in ESTADOS_SQL_TRANSITORIOS or any(codigo in mensaje for codigo in ERRORES_NATIVOS_TRANSITORIOS)
+
+def con_reintentos(funcion, descripcion):
+    """
+    Ejecuta funcion y la repite ante errores transitorios de la BD
+    
+    Entre intentos espera con retroceso exponencial y jitter: un valor al azar
+    entre la mitad y el total de ETL_ESPERA_REINTENTO * 2^intento, con tope
+    ETL_ESPERA_MAXIMA_REINTENTO. El pool descarta la conexión caída
+    (pool_pre_ping) y el intento siguiente toma una sana. funcion debe poder
+    repetirse sin duplicar datos: cada intento abre su propia transacción.
+    
+    Args:
+        descripcion: Texto para el log (p. ej. "el lote 3 de archivo.xlsx")
+    
+    Raises:
+        El error original si no es transitorio o si se agotan los ETL_REINTENTOS_BD
+    """
+    for intento in range(reintentos_bd + 1):
+        try:
+            return funcion()
+        except Exception as e:
+            if intento == reintentos_bd or not es_error_transitorio(e):
+                raise
+            tope = min(espera_maxima_reintento, espera_reintento * 2 ** intento)
+            espera = random.uniform(tope / 2, tope)
+            logger.warning(f"⚠️  Error transitorio en {descripcion} (intento {intento + 1} de {reintentos_bd + 1}): "
+                           f"{e}. Reintentando en {espera:.1f} s")
+            time.sleep(espera)
+
+def huella_carga(hash_archivo, *partes):
+    """
+    Identifica una carga reanudable: el contenido del archivo y cómo se parte en lotes
+    
+    Args:
+        hash_archivo: SHA-256 del archivo Excel
+        partes: Archivo, tabla, acción y partición en lotes; si algo cambia
+            entre corridas, la carga empieza de nuevo en vez de reanudarse
+    """
+    texto = '|'.join([hash_archivo, *(str(parte) for parte in partes)])
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+def leer_checkpoint(conn, nombre_archivo):
+    """
+    Lee el checkpoint de la carga en curso de un archivo
+    
+    Returns:
+        Dict con archivo, huella, staging, lote (último confirmado) y filas,
+        o None si el archivo no tiene una carga en curso
+    """
+    fila = conn.execute(
+        sa.text(f"SELECT HUELLA, TABLA_STAGING, ULTIMO_LOTE, FILAS_CONFIRMADAS FROM {tabla_checkpoints} "
+                "WHERE ARCHIVO_ORIGEN = :archivo"),
+        {"archivo": nombre_archivo}
+    ).first()
+    
+    if fila is None:
+        return None
+    
+    return {
+        'archivo': nombre_archivo,
+        'huella': fila.HUELLA,
+        'staging': fila.TABLA_STAGING,
+        'lote': int(fila.ULTIMO_LOTE),
+        'filas': int(fila.FILAS_CONFIRMADAS)
+    }
+
+def guardar_checkpoint(conn, checkpoint):
+    """Guarda el checkpoint de un archivo dentro de la transacción de conn"""
+    eliminar_checkpoint(conn, checkpoint['archivo'])
+    conn.execute(
+        sa.text(f"""
+            INSERT INTO {tabla_checkpoints}
+                (ARCHIVO_ORIGEN, HUELLA, TABLA_STAGING, ULTIMO_LOTE, FILAS_CONFIRMADAS, FECHA_ACTUALIZACION)
+            VALUES (:archivo, :huella, :staging, :lote, :filas, :fecha)
+        """),
+        {**checkpoint, "fecha": datetime.now()}
+    )
+
+def eliminar_checkpoint(conn, nombre_archivo):
+    """Elimina el checkpoint de un archivo dentro de la transacción de conn"""
+    conn.execute(
+        sa.text(f"DELETE FROM {tabla_checkpoints} WHERE ARCHIVO_ORIGEN = :archivo"),
+        {"archivo": nombre_archivo}
+    )
+
+def iniciar_carga_reanudable(engine, nombre_tabla, columnas, nombre_archivo, huella):
+    """
+    Prepara la staging de una carga reanudable y devuelve su checkpoint
+    
+    Si el archivo tiene un checkpoint con la misma huella y su staging sigue
+    en la BD, la carga se reanuda desde el último lote confirmado. En otro caso
+    se descarta lo que haya quedado de una carga anterior y se crea una
+    staging vacía, con nombre fijo para la huella.
+    
+    Returns:
+        Dict del checkpoint (ver leer_checkpoint)
+    """
+    staging = f"{nombre_tabla}_Staging_{huella[:12]}"
+    
+    def iniciar():
+        with engine.connect() as conn:
+            previo = leer_checkpoint(conn, nombre_archivo)
+        
+        if previo is not None and previo['huella'] == huella and sa.inspect(engine).has_table(previo['staging']):
+            return previo
+        
+        if previo is not None:
+            eliminar_tabla_staging(engine, previo['staging'])
+        eliminar_tabla_staging(engine, staging)
+        crear_tabla_staging(engine, nombre_tabla, columnas, staging)
+        
+        checkpoint = {'archivo': nombre_archivo, 'huella': huella, 'staging': staging, 'lote': 0, 'filas': 0}
+        with engine.begin() as conn:
+            guardar_checkpoint(conn, checkpoint)
+        return checkpoint
+    
+    checkpoint = con_reintentos(iniciar, f"el inicio de la carga de {nombre_archivo}")
+    if checkpoint['lote'] > 0:
+        logger.info(f"↻ Reanudando la carga de {nombre_archivo}: {checkpoint['lote']} lote(s) "
+                    f"({checkpoint['filas']} filas) ya confirmados en staging")
+    return checkpoint
+
+def confirmar_lote(engine, df, checkpoint, numero_lote):
+    """
+    Carga un lote numerado a la staging y avanza el checkpoint en la misma transacción
+    
+    Si el COMMIT llegó a la BD pero la respuesta se perdió, el reintento
+    encuentra el lote ya confirmado en el checkpoint y no lo vuelve a insertar.
+    
+    Returns:
+        Dict de cargar_dataframe, o None si el lote ya estaba confirmado
+    """
+    def confirmar():
+        with engine.begin() as conn:
+            actual = leer_checkpoint(conn, checkpoint['archivo'])
+            if actual is not None and actual['huella'] == checkpoint['huella'] and actual['lote'] >= numero_lote:
+                return None
+            carga = cargar_dataframe(df, conn, checkpoint['staging'])
+            guardar_checkpoint(conn, {**checkpoint, 'lote': numero_lote, 'filas': checkpoint['filas'] + len(df)})
+            return carga
+    
+    carga = con_reintentos(confirmar, f"el lote {numero_lote} de {checkpoint['archivo']}")
+    checkpoint['lote'] = numero_lote
+    checkpoint['filas'] += len(df)
+    return carga
+
+def cargar_staging_por_lotes(engine, df, checkpoint):
+    """
+    Carga un DataFrame a la staging del checkpoint en lotes numerados de ETL_TAMANO_LOTE filas
+    
+    Los lotes confirmados en una corrida anterior se saltan.
+    
+    Returns:
+        Dict como el de cargar_dataframe, con las filas cargadas en esta corrida
+    """
+    inicio = time.perf_counter()
+    filas = 0
+    lotes = 0
+    
+    for numero_lote, desde in enumerate(range(0, len(df), tamano_lote), start=1):
+        if numero_lote <= checkpoint['lote']:
+            continue
+        carga = confirmar_lote(engine, df.iloc[desde:desde + tamano_lote], checkpoint, numero_lote)
+        if carga is not None:
+            filas += carga['filas']
+            lotes += carga['lotes']
+    
+    segundos = time.perf_counter() - inicio
+    return {
+        'metodo': metodo_carga,
+        'filas': filas,
+        'lotes': lotes,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos > 0 else 0.0
+    }
+
+def intercambiar_staging(engine, checkpoint, aplicar):
+    """
+    Ejecuta el paso final de staging a la tabla principal en una transacción
+    
+    Con checkpoint, el checkpoint se elimina en la misma transacción y el paso
+    se reintenta ante errores transitorios: si el COMMIT ya se había aplicado,
+    el reintento no encuentra el checkpoint y no repite los cambios. Sin
+    checkpoint no hay cómo saberlo, así que no se reintenta.
+    
+    Args:
+        aplicar: Función que recibe la Connection y hace el paso
+    
+    Returns:
+        Lo que devuelve aplicar, o None si el paso ya estaba confirmado
+    """
+    if checkpoint is None:
+        with engine.begin() as conn:
+            return aplicar(conn)
+    
+    def intercambiar():
+        with engine.begin() as conn:
+            actual = leer_checkpoint(conn, checkpoint['archivo'])
+            if actual is None or actual['huella'] != checkpoint['huella']:
+                logger.info(f"✓ El intercambio de {checkpoint['archivo']} ya estaba confirmado")
+                return None
+            resultado = aplicar(conn)
+            eliminar_checkpoint(conn, checkpoint['archivo'])
+            return resultado
+    
+    return con_reintentos(intercambiar, f"el intercambio de {checkpoint['archivo']}")
+
+# =============================================================================
+# FUNCIONES DE RESUMEN MENSUAL
+# =============================================================================
+
+# Granularidad de Resumen_Mensual_Transmision (Resumen_Mensual_Archivos_Transmision
+# agrega ARCHIVO_ORIGEN)
+COLUMNAS_RESUMEN_MENSUAL = ['ANIO', 'MES', 'SUBESTACION', 'REGION', 'CAUSA_EVENTO', 'TIPO_INDISPONIBILIDAD']
+# Granularidad de Elementos_Mensual_Transmision (más ARCHIVO_ORIGEN)
+COLUMNAS_ELEMENTOS_MENSUAL = ['ANIO', 'MES', 'SUBESTACION', 'REGION', 'CODIGO_ELEMENTO_AFECTADO']
+# Granularidad con la que se calcula el resumen de un archivo: de ella salen las dos tablas
+COLUMNAS_RESUMEN_CALCULO = COLUMNAS_RESUMEN_MENSUAL + ['CODIGO_ELEMENTO_AFECTADO']
+# Medidas que se suman y medidas que se maximizan al combinar resúmenes
+MEDIDAS_SUMA_RESUMEN = ['TOTAL_EVENTOS', 'EVENTOS_FORZADOS', 'EVENTOS_PROGRAMADOS', 'TOTAL_MINUTOS',
+                        'EVENTOS_CON_DURACION', 'TOTAL_CARGA_MW', 'EVENTOS_CON_CARGA']
+MEDIDAS_MAXIMO_RESUMEN = ['MAX_MINUTOS', 'MAX_CARGA_MW']
+
+def _agrupar_resumen(base, columnas=COLUMNAS_RESUMEN_CALCULO):
+    """Agrupa filas de resumen por la granularidad indicada, con claves nulas incluidas"""
+    agrupado = base.groupby(columnas, dropna=False, sort=False)
+    resumen = pd.concat(
+        [agrupado[MEDIDAS_SUMA_RESUMEN].sum(), agrupado[MEDIDAS_MAXIMO_RESUMEN].max()],
+        axis=1
+    ).reset_index()
+    
+    # Como SUM en SQL Server: sin valores, la suma es NULL y no 0
+    resumen['TOTAL_MINUTOS'] = resumen['TOTAL_MINUTOS'].where(resumen['EVENTOS_CON_DURACION'] > 0)
+    resumen['TOTAL_CARGA_MW'] = resumen['TOTAL_CARGA_MW'].where(resumen['EVENTOS_CON_CARGA'] > 0)
+    return resumen
+
+def _agrupar_elementos(base):
+    """Eventos por mes, subestación, región y elemento (sin elemento no cuentan como distintos)"""
+    base = base[base['CODIGO_ELEMENTO_AFECTADO'].notna()]
+    return base.groupby(COLUMNAS_ELEMENTOS_MENSUAL, dropna=False, sort=False)['TOTAL_EVENTOS'].sum().reset_index()
+
+def calcular_resumen_mensual(df):
+    """
+    Calcula el resumen mensual de un DataFrame limpio
+    
+    Las duraciones y cargas se redondean a 2 decimales como en la tabla
+    principal (DECIMAL(18,2)); los eventos sin fecha de apertura se excluyen.
+    
+    Returns:
+        DataFrame con COLUMNAS_RESUMEN_CALCULO y las medidas del resumen
+        (aplicar_resumen_mensual lo reparte en las tablas del resumen)
+    """
+    df = df[df['FECHA_HORA_APERTURA'].notna()]
+    vacia = pd.Series(None, index=df.index, dtype=object)
+    minutos = df['DURACION_INDISPONIBILIDAD_MINUTOS'].round(2) if 'DURACION_INDISPONIBILIDAD_MINUTOS' in df else vacia.astype(float)
+    carga = df['CARGA_MEGAS'].round(2) if 'CARGA_MEGAS' in df else vacia.astype(float)
+    tipo = df.get('TIPO_INDISPONIBILIDAD', vacia).astype('string').str.casefold()
+    
+    base = pd.DataFrame({
+        'ANIO': df['FECHA_HORA_APERTURA'].dt.year,
+        'MES': df['FECHA_HORA_APERTURA'].dt.month,
+        **{col: df.get(col, vacia) for col in COLUMNAS_RESUMEN_CALCULO[2:]},
+        'TOTAL_EVENTOS': 1,
+        'EVENTOS_FORZADOS': (tipo == 'forzada').fillna(False).astype(int),
+        'EVENTOS_PROGRAMADOS': (tipo == 'programada').fillna(False).astype(int),
+        'TOTAL_MINUTOS': minutos,
+        'EVENTOS_CON_DURACION': minutos.notna().astype(int),
+        'MAX_MINUTOS': minutos,
+        'TOTAL_CARGA_MW': carga,
+        'EVENTOS_CON_CARGA': carga.notna().astype(int),
+        'MAX_CARGA_MW': carga
+    }, index=df.index)
+    
+    return _agrupar_resumen(base)
+
+def _leer_resumen_archivo(conn, tabla, columnas, nombre_archivo):
+    """Filas de un archivo en una tabla del resumen, con las medidas como números"""
+    existentes = pd.read_sql(
+        sa.text(f"SELECT {', '.join(columnas)} FROM {tabla} WHERE ARCHIVO_ORIGEN = :archivo"),
+        conn,
+        params={"archivo": nombre_archivo}
+    )
+    medidas = [col for col in columnas if col in MEDIDAS_SUMA_RESUMEN + MEDIDAS_MAXIMO_RESUMEN]
+    existentes[medidas] = existentes[medidas].apply(pd.to_numeric)
+    return existentes
+
+def aplicar_resumen_mensual(conn, resumen, nombre_archivo, acumular=False):
+    """
+    Actualiza el resumen mensual con los eventos de un archivo dentro de una transacción
+    
+    El aporte de cada archivo se guarda aparte (Resumen_Mensual_Archivos_Transmision
+    y, por elemento, Elementos_Mensual_Transmision) y se reemplaza completo.
+    Resumen_Mensual_Transmision, sin archivo ni elemento, se recalcula sumando
+    los aportes solo en los meses que el archivo tenía o tiene ahora: así un
+    reemplazo corrige también los máximos sin recorrer la tabla principal.
+    
+    Args:
+        conn: Connection de SQLAlchemy con la transacción de la carga
+        resumen: Resultado de calcular_resumen_mensual para el archivo (vacío
+            para quitar el archivo del resumen)
+        acumular: True si los eventos se agregaron a los ya cargados del archivo
+            (modo agregar); False si el resumen describe el archivo completo
+    
+    Returns:
+        Número de filas del aporte del archivo al resumen
+    """
+    preparer = conn.dialect.identifier_preparer
+    tabla = preparer.quote(tabla_resumen_mensual)
+    tabla_archivos = preparer.quote(tabla_resumen_archivos)
+    tabla_elementos = preparer.quote(tabla_elementos_mensual)
+    medidas = MEDIDAS_SUMA_RESUMEN + MEDIDAS_MAXIMO_RESUMEN
+    
+    aporte = _agrupar_resumen(resumen, COLUMNAS_RESUMEN_MENSUAL)
+    elementos = _agrupar_elementos(resumen)
+    previo = _leer_resumen_archivo(conn, tabla_archivos, COLUMNAS_RESUMEN_MENSUAL + medidas, nombre_archivo)
+    
+    if acumular:
+        if len(previo):
+            aporte = _agrupar_resumen(pd.concat([previo, aporte], ignore_index=True), COLUMNAS_RESUMEN_MENSUAL)
+        elementos_previos = _leer_resumen_archivo(conn, tabla_elementos, COLUMNAS_ELEMENTOS_MENSUAL + ['TOTAL_EVENTOS'],
+                                                  nombre_archivo)
+        if len(elementos_previos):
+            elementos = _agrupar_elementos(pd.concat([elementos_previos, elementos], ignore_index=True))
+    
+    # Meses a recalcular: los que el archivo tenía y los que tiene ahora
+    periodos = sorted({int(anio) * 100 + int(mes) for anio, mes in zip(previo['ANIO'], previo['MES'])}
+                      | {int(anio) * 100 + int(mes) for anio, mes in zip(aporte['ANIO'], aporte['MES'])})
+    
+    for tabla_aporte in (tabla_archivos, tabla_elementos):
+        conn.execute(sa.text(f"DELETE FROM {tabla_aporte} WHERE ARCHIVO_ORIGEN = :archivo"),
+                     {"archivo": nombre_archivo})
+    cargar_dataframe(aporte.assign(ARCHIVO_ORIGEN=nombre_archivo), conn, tabla_resumen_archivos)
+    cargar_dataframe(elementos.assign(ARCHIVO_ORIGEN=nombre_archivo), conn, tabla_elementos_mensual)
+    
+    if periodos:
+        en_periodos = f"ANIO * 100 + MES IN ({', '.join(str(periodo) for periodo in periodos)})"
+        columnas = ', '.join(COLUMNAS_RESUMEN_MENSUAL)
+        agregados = ', '.join([f"SUM({col})" for col in MEDIDAS_SUMA_RESUMEN]
+                              + [f"MAX({col})" for col in MEDIDAS_MAXIMO_RESUMEN])
+        conn.execute(sa.text(f"DELETE FROM {tabla} WHERE {en_periodos}"))
+        conn.execute(sa.text(f"""
+            INSERT INTO {tabla} ({columnas}, {', '.join(medidas)})
+            SELECT {columnas}, {agregados}
+            FROM {tabla_archivos}
+            WHERE {en_periodos}
+            GROUP BY {columnas}
+        """))
+    
+    return len(aporte)
+
+# =============================================================================
+# ESTADÍSTICAS POR ARCHIVO
+# =============================================================================
+
+COLUMNAS_ESTADISTICAS_ARCHIVO = ['ARCHIVO_ORIGEN', 'TOTAL_REGISTROS', 'PRIMERA_CARGA', 'ULTIMA_CARGA',
+                                 'ULTIMA_ACTUALIZACION', 'REGISTROS_ACTUALIZADOS', 'EVENTO_MAS_ANTIGUO',
+                                 'EVENTO_MAS_RECIENTE', 'TOTAL_MINUTOS']
+
+def _fecha_o_none(valor):
+    """Timestamp de pandas, o None para nulos (NaT, NULL)"""
+    return None if valor is None or pd.isna(valor) else pd.Timestamp(valor)
+
+def _combinar(a, b, funcion):
+    """Aplica funcion a dos valores ignorando los nulos"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return funcion(a, b)
+
+def calcular_estadisticas_archivo(df, previas=None):
+    """
+    Estadísticas de un DataFrame limpio para Estadisticas_Archivos_Transmision
+    
+    Args:
+        previas: Estadísticas de los bloques anteriores del mismo archivo
+            (pipeline por bloques); se combinan con las de este bloque
+    
+    Returns:
+        Dict con filas, evento_mas_antiguo, evento_mas_reciente y total_minutos
+    """
+    apertura = df['FECHA_HORA_APERTURA'] if 'FECHA_HORA_APERTURA' in df else pd.Series(dtype='datetime64[ns]')
+    minutos = (df['DURACION_INDISPONIBILIDAD_MINUTOS'].round(2) if 'DURACION_INDISPONIBILIDAD_MINUTOS' in df
+               else pd.Series(dtype=float))
+    
+    estadisticas = {
+        'filas': len(df),
+        'evento_mas_antiguo': _fecha_o_none(apertura.min()),
+        'evento_mas_reciente': _fecha_o_none(apertura.max()),
+        # Como SUM en SQL Server: sin valores, la suma es NULL
+        'total_minutos': float(minutos.sum()) if minutos.notna().any() else None
+    }
+    
+    if previas is not None:
+        estadisticas = {
+            'filas': previas['filas'] + estadisticas['filas'],
+            'evento_mas_antiguo': _combinar(previas['evento_mas_antiguo'], estadisticas['evento_mas_antiguo'], min),
+            'evento_mas_reciente': _combinar(previas['evento_mas_reciente'], estadisticas['evento_mas_reciente'], max),
+            'total_minutos': _combinar(previas['total_minutos'], estadisticas['total_minutos'], lambda x, y: x + y)
+        }
+    return estadisticas
+
+def aplicar_estadisticas_archivo(conn, nombre_archivo, estadisticas, accion, insertadas=None, actualizadas=0):
+    """
+    Actualiza la fila de Estadisticas_Archivos_Transmision de un archivo dentro de una transacción
+    
+    La fila se calcula con los DataFrames ya en memoria y la fila anterior
+    del archivo, sin recorrer Calidad_Transmision.
+    
+    Args:
+        conn: Connection de SQLAlchemy con la transacción de la carga
+        estadisticas: Resultado de calcular_estadisticas_archivo para el archivo
+        accion: 'append' (filas agregadas a las existentes), 'replace' (el
+            archivo completo reemplazado) o 'upsert' (actualización incremental)
+        insertadas, actualizadas: Filas insertadas y actualizadas en 'upsert'.
+            Con 'upsert' REGISTROS_ACTUALIZADOS es aproximado: una fila
+            actualizada en dos corridas se cuenta dos veces (hasta el total)
+    """
+    tabla = conn.dialect.identifier_preparer.quote(tabla_estadisticas_archivos)
+    ahora = pd.Timestamp(datetime.now().replace(microsecond=0))
+    
+    previa = conn.execute(
+        sa.text(f"SELECT {', '.join(COLUMNAS_ESTADISTICAS_ARCHIVO)} FROM {tabla} WHERE ARCHIVO_ORIGEN = :archivo"),
+        {"archivo": nombre_archivo}
+    ).mappings().first()
+    
+    fila = {
+        'ARCHIVO_ORIGEN': nombre_archivo,
+        'TOTAL_REGISTROS': estadisticas['filas'],
+        'PRIMERA_CARGA': ahora,
+        'ULTIMA_CARGA': ahora,
+        'ULTIMA_ACTUALIZACION': None,
+        'REGISTROS_ACTUALIZADOS': 0,
+        'EVENTO_MAS_ANTIGUO': estadisticas['evento_mas_antiguo'],
+        'EVENTO_MAS_RECIENTE': estadisticas['evento_mas_reciente'],
+        'TOTAL_MINUTOS': estadisticas['total_minutos']
+    }
+    
+    if accion == 'replace':
+        # Todas las filas son nuevas y quedan marcadas con FECHA_ACTUALIZACION
+        fila['ULTIMA_ACTUALIZACION'] = ahora
+        fila['REGISTROS_ACTUALIZADOS'] = estadisticas['filas']
+    elif previa is not None:
+        minutos_previos = float(previa['TOTAL_MINUTOS']) if previa['TOTAL_MINUTOS'] is not None else None
+        fila['PRIMERA_CARGA'] = _fecha_o_none(previa['PRIMERA_CARGA']) or ahora
+        fila['ULTIMA_ACTUALIZACION'] = _fecha_o_none(previa['ULTIMA_ACTUALIZACION'])
+        fila['REGISTROS_ACTUALIZADOS'] = previa['REGISTROS_ACTUALIZADOS']
+        
+        if accion == 'append':
+            fila['TOTAL_REGISTROS'] += previa['TOTAL_REGISTROS']
+            fila['EVENTO_MAS_ANTIGUO'] = _combinar(_fecha_o_none(previa['EVENTO_MAS_ANTIGUO']),
+                                                   fila['EVENTO_MAS_ANTIGUO'], min)
+            fila['EVENTO_MAS_RECIENTE'] = _combinar(_fecha_o_none(previa['EVENTO_MAS_RECIENTE']),
+                                                    fila['EVENTO_MAS_RECIENTE'], max)
+            fila['TOTAL_MINUTOS'] = _combinar(minutos_previos, fila['TOTAL_MINUTOS'], lambda x, y: x + y)
+        else:
+            # upsert: el DataFrame es el archivo completo tras aplicar los cambios
+            if not insertadas:
+                fila['ULTIMA_CARGA'] = _fecha_o_none(previa['ULTIMA_CARGA']) or ahora
+            if actualizadas:
+                fila['ULTIMA_ACTUALIZACION'] = ahora
+            fila['REGISTROS_ACTUALIZADOS'] = min(previa['REGISTROS_ACTUALIZADOS'] + actualizadas,
+                                                 estadisticas['filas'])
+    elif accion == 'upsert' and actualizadas:
+        fila['ULTIMA_ACTUALIZACION'] = ahora
+        fila['REGISTROS_ACTUALIZADOS'] = actualizadas
+    
+    if fila['TOTAL_MINUTOS'] is not None:
+        fila['TOTAL_MINUTOS'] = round(fila['TOTAL_MINUTOS'], 2)
+    for columna in ('PRIMERA_CARGA', 'ULTIMA_CARGA', 'ULTIMA_ACTUALIZACION', 'EVENTO_MAS_ANTIGUO', 'EVENTO_MAS_RECIENTE'):
+        if fila[columna] is not None:
+            fila[columna] = fila[columna].to_pydatetime()
+    
+    conn.execute(sa.text(f"DELETE FROM {tabla} WHERE ARCHIVO_ORIGEN = :archivo"), {"archivo": nombre_archivo})
+    conn.execute(
+        sa.text(f"INSERT INTO {tabla} ({', '.join(COLUMNAS_ESTADISTICAS_ARCHIVO)}) "
+                f"VALUES ({', '.join(':' + col for col in COLUMNAS_ESTADISTICAS_ARCHIVO)})"),
+        fila
+    )
+
+# =============================================================================
+# ESQUEMA ESTRELLA (DIMENSIONES)
+# =============================================================================
+
+# Columna de texto de baja cardinalidad → tabla de dimensión (clave ID_<columna>)
+DIMENSIONES = {
+    'SUBESTACION': 'Dim_Subestacion',
+    'REGION': 'Dim_Region',
+    'TIPO_EQUIPO': 'Dim_Tipo_Equipo',
+    'NIVEL_DE_TENSION': 'Dim_Nivel_Tension',
+    'ORIGEN_INDISPONIBILIDAD': 'Dim_Origen_Indisponibilidad',
+    'CAUSA_EVENTO': 'Dim_Causa_Evento',
+    'TIPO_INDISPONIBILIDAD': 'Dim_Tipo_Indisponibilidad',
+    'TIPO_MANTENIMIENTO': 'Dim_Tipo_Mantenimiento',
+}
+
+# Caché en proceso de cada dimensión: columna → {valor: clave}. Se vacía al
+# empezar cada corrida (procesar_archivos) y se lee de la base de datos la
+# primera vez que se usa; los miembros nuevos se releen después de insertarlos.
+_miembros_dimensiones = {}
+
+def reiniciar_miembros_dimensiones():
+    """Vacía la caché de dimensiones: el próximo uso las vuelve a leer de la BD"""
+    _miembros_dimensiones.clear()
+
+def _leer_miembros_dimension(conn, columna, valores=None):
+    """
+    Lee los miembros de una dimensión como dict valor → clave
+    
+    Args:
+        valores: Solo estos valores (p. ej. los recién insertados); None = todos
+    """
+    preparer = conn.dialect.identifier_preparer
+    sentencia = (f"SELECT {preparer.quote(f'ID_{columna}')} AS CLAVE, VALOR "
+                 f"FROM {preparer.quote(DIMENSIONES[columna])}")
+    
+    if valores is None:
+        filas = conn.execute(sa.text(sentencia)).fetchall()
+    else:
+        consulta = sa.text(f"{sentencia} WHERE VALOR IN :valores").bindparams(
+            sa.bindparam('valores', expanding=True)
+        )
+        tamano = MAX_PARAMETROS_SENTENCIA.get(conn.dialect.name, 999)
+        filas = []
+        for inicio in range(0, len(valores), tamano):
+            filas += conn.execute(consulta, {"valores": valores[inicio:inicio + tamano]}).fetchall()
+    
+    return {fila.VALOR: int(fila.CLAVE) for fila in filas}
+
+def _insertar_miembros_dimension(conn, columna, valores):
+    """
+    Inserta en la dimensión los valores que todavía no tiene
+    
+    Otro proceso pudo agregar el mismo valor después de leer la caché: cada
+    INSERT comprueba antes que el valor no exista, así no choca con
+    UQ_Dim_*_Valor. En SQL Server UPDLOCK/HOLDLOCK mantiene el bloqueo del
+    valor hasta el COMMIT.
+    """
+    tabla = conn.dialect.identifier_preparer.quote(DIMENSIONES[columna])
+    bloqueo = ' WITH (UPDLOCK, HOLDLOCK)' if conn.dialect.name == 'mssql' else ''
+    conn.execute(
+        sa.text(f"INSERT INTO {tabla} (VALOR) SELECT :valor "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {tabla}{bloqueo} WHERE VALOR = :valor)"),
+        [{"valor": valor} for valor in valores]
+    )
+
+def resolver_dimensiones(engine, df):
+    """
+    Reemplaza los textos de DIMENSIONES por sus claves sustitutas ID_<columna>
+    
+    Los valores que no están en la caché se insertan en su tabla Dim_* (una
+    transacción por dimensión, sin repetir los que otro proceso ya agregó) y
+    sus claves se releen de la tabla antes de agregarlas a la caché. Las columnas
+    de texto quedan en None: la fila viaja y se guarda solo con las claves, y
+    v_Resumen_Calidad_Transmision recupera el texto con un JOIN.
+    
+    Args:
+        df: DataFrame limpio (se modifica en el lugar); el resumen mensual y
+            las huellas deben calcularse antes, con los textos
+    
+    Returns:
+        Número de miembros nuevos insertados en las dimensiones
+    """
+    nuevos_totales = 0
+    
+    for columna in DIMENSIONES:
+        if columna not in df.columns:
+            continue
+        
+        if columna not in _miembros_dimensiones:
+            with engine.connect() as conn:
+                _miembros_dimensiones[columna] = _leer_miembros_dimension(conn, columna)
+        miembros = _miembros_dimensiones[columna]
+        
+        # Como texto, igual que lo guardaría la columna NVARCHAR
+        serie = df[columna]
+        textos = serie.astype(object).where(serie.isna(), serie.astype(str))
+        
+        nuevos = [valor for valor in textos.dropna().unique() if valor not in miembros]
+        if nuevos:
+            with engine.begin() as conn:
+                _insertar_miembros_dimension(conn, columna, nuevos)
+                miembros.update(_leer_miembros_dimension(conn, columna, nuevos))
+            nuevos_totales += len(nuevos)
+        
+        df[f"ID_{columna}"] = textos.map(miembros).astype('Int64')
+        df[columna] = None
+    
+    return nuevos_totales
+
+# =============================================================================
+# DEDUPLICACIÓN DE EVENTOS ENTRE ARCHIVOS
+# =============================================================================
+
+# Índice en proceso de los eventos ya cargados: archivo → claves naturales
+# (hash de 64 bits de COLUMNAS_CLAVE_EVENTO, únicas y ordenadas). Se lee de la
+# base de datos una vez por corrida y lo actualiza cada carga del ETL.
+_indice_eventos = None
+
+def clave_natural_eventos(df):
+    """Hash de 64 bits de la clave natural de cada evento (COLUMNAS_CLAVE_EVENTO)"""
+    return _hash_filas(df, COLUMNAS_CLAVE_EVENTO, texto=_texto_clave)
+
+def obtener_indice_eventos(engine, nombre_tabla, tamano_bloque=100000):
+    """
+    Devuelve el índice de eventos cargados; la primera vez lo lee con una sola consulta
+    
+    La consulta se recorre por bloques de tamano_bloque filas y de cada uno
+    solo se conservan las claves (8 bytes por evento).
+    """
+    global _indice_eventos
+    if _indice_eventos is not None:
+        return _indice_eventos
+    
+    preparer = engine.dialect.identifier_preparer
+    columnas = ', '.join(preparer.quote(col) for col in ['ARCHIVO_ORIGEN', *COLUMNAS_CLAVE_EVENTO])
+    consulta = sa.text(f"SELECT {columnas} FROM {preparer.quote(nombre_tabla)} WHERE ARCHIVO_ORIGEN IS NOT NULL")
+    
+    partes = {}
+    with engine.connect() as conn:
+        for bloque in pd.read_sql(consulta, conn, parse_dates=['FECHA_HORA_APERTURA'], chunksize=tamano_bloque):
+            claves = clave_natural_eventos(bloque)
+            for archivo, claves_archivo in claves.groupby(bloque['ARCHIVO_ORIGEN']):
+                partes.setdefault(archivo, []).append(claves_archivo.to_numpy())
+    
+    _indice_eventos = {archivo: np.unique(np.concatenate(arreglos)) for archivo, arreglos in partes.items()}
+    logger.info(f"✓ Índice de eventos cargados: {sum(len(c) for c in _indice_eventos.values())} claves "
+                f"de {len(_indice_eventos)} archivo(s)")
+    return _indice_eventos
+
+def claves_cargadas(engine, nombre_tabla, nombre_archivo, accion):
+    """
+    Claves naturales ya cargadas contra las que se compara un archivo
+    
+    Al reemplazar o actualizar, las filas anteriores del mismo archivo se van a
+    sustituir y no cuentan; al agregar, sí.
+    
+    Returns:
+        Arreglo de claves únicas y ordenadas
+    """
+    indice = obtener_indice_eventos(engine, nombre_tabla)
+    arreglos = [claves for archivo, claves in indice.items() if accion == 'append' or archivo != nombre_archivo]
+    if not arreglos:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(arreglos))
+
+def descartar_eventos_cargados(df, cargadas):
+    """
+    Quita del DataFrame los eventos cuya clave natural está en cargadas
+    
+    Búsqueda vectorizada (np.isin) en memoria, sin consultas a la BD por fila.
+    Los eventos repetidos dentro del mismo archivo se conservan, como en
+    CLAVE_EVENTO.
+    
+    Returns:
+        Tupla (DataFrame sin los eventos ya cargados, claves de las filas conservadas)
+    """
+    claves = clave_natural_eventos(df).to_numpy()
+    repetidas = np.isin(claves, cargadas)
+    if not repetidas.any():
+        return df, claves
+    return df[~repetidas].reset_index(drop=True), claves[~repetidas]
+
+def registrar_eventos_cargados(nombre_archivo, claves, accion):
+    """
+    Actualiza el índice en memoria después de cargar un archivo, sin consultar la BD
+    
+    Args:
+        claves: Claves naturales de las filas cargadas
+        accion: 'append' las suma a las del archivo; 'replace' y 'upsert' las reemplazan
+    """
+    if _indice_eventos is None:
+        return
+    
+    claves = np.unique(claves)
+    if accion == 'append' and nombre_archivo in _indice_eventos:
+        claves = np.union1d(_indice_eventos[nombre_archivo], claves)
+    _indice_eventos[nombre_archivo] = claves
+
+# =============================================================================
+# FUNCIONES DE ACTUALIZACIÓN INCREMENTAL
+# =============================================================================
+
+def _texto_para_huella(serie):
+    """Representación en texto de una columna, estable entre Excel y SQL Server"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # DATETIME de SQL Server no conserva más precisión que el segundo de forma fiable
+        texto = serie.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_numeric_dtype(serie):
+        # DECIMAL(18,2) en la tabla destino
+        texto = serie.round(2).astype(str)
+    else:
+        texto = serie.astype(str)
+    return texto.where(serie.notna(), '')
+
+def _texto_clave(serie):
+    """
+    Texto canónico de una columna de la clave natural
+    
+    El mismo código debe dar el mismo texto aunque pandas lo lea como int64,
+    como float64 (la columna tiene celdas vacías), como texto o desde la BD:
+    1234, 1234.0, ' 1234 ' y '1234.0' quedan como '1234'.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return _texto_para_huella(serie)
+    texto = serie.astype(str).str.strip().str.replace(r'^(-?\d+)\.0+$', r'\1', regex=True)
+    return texto.where(serie.notna(), '')
+
+def _hash_filas(df, columnas, texto=_texto_para_huella):
+    """
+    Hash de 64 bits por fila de las columnas indicadas, como enteros con signo (BIGINT)
+    
+    BLAKE2b de 8 bytes sobre el texto de las columnas unido con el carácter 0x1F: el
+    valor guardado en la BD depende solo de los datos, no de la versión de
+    pandas (pd.util.hash_pandas_object no garantiza un resultado estable).
+    """
+    textos = [texto(df[col]).tolist() if col in df.columns else [''] * len(df) for col in columnas]
+    digestos = b''.join(
+        hashlib.blake2b('\x1f'.join(valores).encode('utf-8'), digest_size=8).digest()
+        for valores in zip(*textos)
+    )
+    return pd.Series(np.frombuffer(digestos, dtype='<i8').astype(np.int64), index=df.index)
+
+def agregar_huellas_filas(df, apariciones=None):
+    """
+    Agrega CLAVE_EVENTO y HASH_CONTENIDO a un DataFrame limpio
+    
+    CLAVE_EVENTO identifica el evento dentro de su archivo (clave natural más
+    el número de aparición, para eventos repetidos). HASH_CONTENIDO cambia si
+    cambia cualquier columna de datos.
+    
+    Args:
+        apariciones: Dict clave natural → apariciones en los bloques anteriores
+            del mismo archivo (pipeline por bloques). Se actualiza con este bloque,
+            así las claves resultan iguales a las del archivo completo.
+    """
+    clave_natural = clave_natural_eventos(df)
+    aparicion = clave_natural.groupby(clave_natural).cumcount()
+    if apariciones is not None:
+        aparicion += clave_natural.map(apariciones).fillna(0).astype(np.int64)
+        for clave, cantidad in clave_natural.value_counts().items():
+            apariciones[clave] = apariciones.get(clave, 0) + cantidad
+    
+    df['CLAVE_EVENTO'] = _hash_filas(
+        pd.DataFrame({'CLAVE': clave_natural, 'APARICION': aparicion}),
+        ['CLAVE', 'APARICION']
+    )
+    df['HASH_CONTENIDO'] = _hash_filas(df, list(COLUMN_MAPPING.values()))
+    return df
+
+def crear_tabla_staging(engine, nombre_tabla, columnas, nombre_staging=None):
+    """
+    Crea una tabla staging sin índices con las columnas indicadas de la tabla destino
+    
+    Args:
+        nombre_staging: Nombre de la staging (por defecto uno único por llamada)
+    
+    Returns:
+        Nombre de la tabla staging
+    """
+    preparer = engine.dialect.identifier_preparer
+    nombre_staging = nombre_staging or f"{nombre_tabla}_Staging_{uuid.uuid4().hex[:12]}"
+    lista_columnas = ', '.join(preparer.quote(col) for col in columnas)
+    
+    if engine.dialect.name == 'mssql':
+        sentencia = f"SELECT TOP 0 {lista_columnas} INTO {preparer.quote(nombre_staging)} FROM {preparer.quote(nombre_tabla)}"
+    else:
+        sentencia = f"CREATE TABLE {preparer.quote(nombre_staging)} AS SELECT {lista_columnas} FROM {preparer.quote(nombre_tabla)} WHERE 0"
+    
+    with engine.begin() as conn:
+        conn.execute(sa.text(sentencia))
+    
+    return nombre_staging
+
+def eliminar_tabla_staging(engine, nombre_staging):
+    """Elimina una tabla staging si existe (no propaga errores)"""
+    try:
+        with engine.begin() as conn:
+            conn.execute(sa.text(f"DROP TABLE IF EXISTS {engine.dialect.identifier_preparer.quote(nombre_staging)}"))
+    except Exception as e:
+        logger.warning(f"No se pudo eliminar la tabla staging {nombre_staging}: {e}")
+
+def pasar_staging_a_tabla(conn, nombre_tabla, staging, columnas, nombre_archivo, reemplazar=True):
+    """
+    Copia las filas de una staging a la tabla principal dentro de la transacción de conn
+    
+    Args:
+        reemplazar: Si es True, antes se eliminan las filas anteriores del archivo
+    
+    Returns:
+        Número de filas anteriores eliminadas
+    """
+    preparer = conn.dialect.identifier_preparer
+    lista_columnas = ', '.join(preparer.quote(col) for col in columnas)
+    
+    eliminadas = 0
+    if reemplazar:
+        eliminadas = conn.execute(
+            sa.text(f"DELETE FROM {preparer.quote(nombre_tabla)} WHERE ARCHIVO_ORIGEN = :archivo"),
+            {"archivo": nombre_archivo}
+        ).rowcount
+    conn.execute(sa.text(
+        f"INSERT INTO {preparer.quote(nombre_tabla)} ({lista_columnas}) "
+        f"SELECT {lista_columnas} FROM {preparer.quote(staging)}"
+    ))
+    return eliminadas
+
+def cargar_con_staging(engine, df, nombre_tabla, nombre_archivo, accion='replace', metricas=None,
+                       resumen_mensual=None, estadisticas=None, huella=None):
+    """
+    Carga las filas de un archivo con una tabla staging y un intercambio atómico
+    
+    El DataFrame se carga primero a una staging sin índices, sin bloquear la
+    tabla principal. Luego, en una sola transacción corta, se eliminan las filas
+    anteriores del archivo (solo al reemplazar) y se insertan las de staging.
+    Si algo falla, los datos previos quedan intactos.
+    
+    Con huella, la staging se carga en lotes numerados con checkpoint: si la
+    corrida se interrumpe, la staging y el checkpoint quedan en la BD y la
+    siguiente carga del mismo archivo sigue desde el último lote confirmado.
+    
+    Args:
+        accion: 'replace' o 'append'
+        metricas: Dict donde se registran las etapas 'carga' e 'intercambio' (opcional)
+        resumen_mensual: Resumen del archivo (calcular_resumen_mensual) que se
+            aplica en la misma transacción (opcional)
+        estadisticas: Estadísticas del archivo (calcular_estadisticas_archivo)
+            que se guardan en la misma transacción (opcional)
+        huella: Huella de la carga (huella_carga) para cargar con checkpoint (opcional)
+    
+    Returns:
+        Dict con eliminadas y la estadística de carga a staging
+    """
+    metricas = {} if metricas is None else metricas
+    columnas = list(df.columns)
+    
+    checkpoint = None
+    with medir_etapa(metricas, 'carga'):
+        if huella is not None:
+            checkpoint = iniciar_carga_reanudable(engine, nombre_tabla, columnas, nombre_archivo, huella)
+            staging = checkpoint['staging']
+        else:
+            staging = crear_tabla_staging(engine, nombre_tabla, columnas)
+    
+    def aplicar(conn):
+        eliminadas = pasar_staging_a_tabla(conn, nombre_tabla, staging, columnas, nombre_archivo,
+                                           reemplazar=accion == 'replace')
+        if resumen_mensual is not None:
+            aplicar_resumen_mensual(conn, resumen_mensual, nombre_archivo, acumular=accion != 'replace')
+        if estadisticas is not None:
+            aplicar_estadisticas_archivo(conn, nombre_archivo, estadisticas, accion)
+        return eliminadas
+    
+    completada = False
+    try:
+        with medir_etapa(metricas, 'carga', len(df)):
+            if checkpoint is not None:
+                carga = cargar_staging_por_lotes(engine, df, checkpoint)
+            else:
+                carga = cargar_dataframe(df, engine, staging)
+        
+        with medir_etapa(metricas, 'intercambio', len(df)):
+            eliminadas = intercambiar_staging(engine, checkpoint, aplicar)
+        completada = True
+    finally:
+        # Con checkpoint, la staging de una carga interrumpida queda para reanudarla
+        if completada or checkpoint is None:
+            eliminar_tabla_staging(engine, staging)
+    
+    return {'eliminadas': eliminadas or 0, **carga}
+
+def comparar_con_existentes(engine, df, nombre_tabla, nombre_archivo):
+    """
+    Compara las huellas del DataFrame con las filas ya almacenadas del archivo
+    
+    Returns:
+        Dict con 'nuevas' y 'cambiadas' (DataFrames), 'ids_eliminar' (Series)
+        y 'sin_cambios' (número de filas)
+    """
+    tabla = engine.dialect.identifier_preparer.quote(nombre_tabla)
+    with engine.connect() as conn:
+        existentes = pd.read_sql(
+            sa.text(f"SELECT ID, CLAVE_EVENTO, HASH_CONTENIDO FROM {tabla} WHERE ARCHIVO_ORIGEN = :archivo"),
+            conn,
+            params={"archivo": nombre_archivo},
+            # Int64 admite NULL sin pasar por float64, que redondea los hashes de 64 bits
+            dtype_backend='numpy_nullable'
+        )
+    
+    # Filas sin huella (cargadas antes del modo incremental) o repetidas se reemplazan
+    vigentes = existentes['CLAVE_EVENTO'].notna() & ~existentes['CLAVE_EVENTO'].duplicated()
+    por_clave = existentes[vigentes].set_index('CLAVE_EVENTO')['HASH_CONTENIDO']
+    
+    en_bd = df['CLAVE_EVENTO'].isin(por_clave.index)
+    hash_bd = df['CLAVE_EVENTO'].map(por_clave)
+    # Un HASH_CONTENIDO NULL en la base cuenta como fila cambiada
+    cambiadas = en_bd & df['HASH_CONTENIDO'].ne(hash_bd).fillna(True).astype(bool)
+    eliminar = ~vigentes | ~existentes['CLAVE_EVENTO'].isin(df['CLAVE_EVENTO'])
+    
+    return {
+        'nuevas': df[~en_bd],
+        'cambiadas': df[cambiadas],
+        'ids_eliminar': existentes.loc[eliminar, 'ID'].astype(np.int64),
+        'sin_cambios': int((en_bd & ~cambiadas).sum())
+    }
+
+def _sentencias_aplicar_cambios(engine, nombre_tabla, staging, staging_ids, columnas):
+    """Sentencias set-based que aplican una staging de filas y otra de IDs a eliminar"""
+    preparer = engine.dialect.identifier_preparer
+    tabla = preparer.quote(nombre_tabla)
+    stg = preparer.quote(staging)
+    stg_ids = preparer.quote(staging_ids)
+    cols = [preparer.quote(col) for col in columnas]
+    lista_columnas = ', '.join(cols)
+    coincide = "destino.ARCHIVO_ORIGEN = origen.ARCHIVO_ORIGEN AND destino.CLAVE_EVENTO = origen.CLAVE_EVENTO"
+    
+    if engine.dialect.name == 'mssql':
+        asignaciones = ', '.join(f"{col} = origen.{col}" for col in cols)
+        return [
+            f"""
+            MERGE {tabla} WITH (HOLDLOCK) AS destino
+            USING {stg} AS origen
+                ON {coincide}
+            WHEN MATCHED AND destino.HASH_CONTENIDO <> origen.HASH_CONTENIDO THEN
+                UPDATE SET {asignaciones}, FECHA_ACTUALIZACION = GETDATE()
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({lista_columnas})
+                VALUES ({', '.join(f'origen.{col}' for col in cols)});
+            """,
+            f"DELETE FROM {tabla} WHERE ID IN (SELECT ID FROM {stg_ids})"
+        ]
+    
+    asignaciones = ', '.join(f"{col} = origen.{col}" for col in cols)
+    return [
+        f"""
+        UPDATE {tabla} AS destino
+        SET {asignaciones}, FECHA_ACTUALIZACION = CURRENT_TIMESTAMP
+        FROM {stg} AS origen
+        WHERE {coincide} AND destino.HASH_CONTENIDO <> origen.HASH_CONTENIDO
+        """,
+        f"""
+        INSERT INTO {tabla} ({lista_columnas})
+        SELECT {lista_columnas} FROM {stg} AS origen
+        WHERE NOT EXISTS (SELECT 1 FROM {tabla} AS destino WHERE {coincide})
+        """,
+        f"DELETE FROM {tabla} WHERE ID IN (SELECT ID FROM {stg_ids})"
+    ]
+
+def actualizar_incremental(engine, df, nombre_tabla, nombre_archivo, metricas=None, resumen_mensual=None,
+                           estadisticas=None, huella=None):
+    """
+    Aplica al archivo solo las inserciones, actualizaciones y eliminaciones necesarias
+    
+    Las filas nuevas y cambiadas se cargan a una tabla staging y se aplican con
+    un MERGE, junto con las eliminaciones, en una sola transacción. Con huella,
+    la staging se carga en lotes con checkpoint como en cargar_con_staging.
+    
+    Args:
+        metricas: Dict donde se registran las etapas 'comparacion', 'carga' e
+            'intercambio' (opcional)
+        resumen_mensual: Resumen del archivo completo (calcular_resumen_mensual)
+            que reemplaza al anterior junto con los cambios (opcional)
+        estadisticas: Estadísticas del archivo completo (calcular_estadisticas_archivo)
+            que se guardan junto con los cambios (opcional)
+        huella: Huella de la carga (huella_carga) para cargar con checkpoint (opcional)
+    
+    Returns:
+        Dict con insertadas, actualizadas, eliminadas, sin_cambios y
+        filas_por_segundo de la carga a staging
+    """
+    metricas = {} if metricas is None else metricas
+    columnas = list(df.columns)
+    
+    with medir_etapa(metricas, 'comparacion', len(df)):
+        cambios = con_reintentos(lambda: comparar_con_existentes(engine, df, nombre_tabla, nombre_archivo),
+                                 f"la comparación de {nombre_archivo}")
+    por_escribir = pd.concat([cambios['nuevas'], cambios['cambiadas']])
+    resumen = {
+        'insertadas': len(cambios['nuevas']),
+        'actualizadas': len(cambios['cambiadas']),
+        'eliminadas': len(cambios['ids_eliminar']),
+        'sin_cambios': cambios['sin_cambios'],
+        'filas_por_segundo': 0.0
+    }
+    
+    if len(por_escribir) == 0 and len(cambios['ids_eliminar']) == 0:
+        return resumen
+    
+    checkpoint = None
+    with medir_etapa(metricas, 'carga'):
+        if huella is not None:
+            checkpoint = iniciar_carga_reanudable(engine, nombre_tabla, columnas, nombre_archivo, huella)
+            staging = checkpoint['staging']
+        else:
+            staging = crear_tabla_staging(engine, nombre_tabla, columnas)
+    staging_ids = f"{staging}_Eliminar"
+    
+    def cargar_ids():
+        # Los IDs a eliminar son pocos: se vuelven a cargar completos en cada intento
+        eliminar_tabla_staging(engine, staging_ids)
+        with engine.begin() as conn:
+            conn.execute(sa.text(f"CREATE TABLE {engine.dialect.identifier_preparer.quote(staging_ids)} (ID INT NOT NULL)"))
+        cargar_dataframe(cambios['ids_eliminar'].to_frame('ID'), engine, staging_ids)
+    
+    def aplicar(conn):
+        for sentencia in _sentencias_aplicar_cambios(engine, nombre_tabla, staging, staging_ids, columnas):
+            conn.execute(sa.text(sentencia))
+        if resumen_mensual is not None:
+            aplicar_resumen_mensual(conn, resumen_mensual, nombre_archivo)
+        if estadisticas is not None:
+            aplicar_estadisticas_archivo(conn, nombre_archivo, estadisticas, 'upsert',
+                                         resumen['insertadas'], resumen['actualizadas'])
+    
+    completada = False
+    try:
+        with medir_etapa(metricas, 'carga', len(por_escribir)):
+            if checkpoint is not None:
+                carga = cargar_staging_por_lotes(engine, por_escribir, checkpoint)
+            else:
+                carga = cargar_dataframe(por_escribir, engine, staging)
+            resumen['filas_por_segundo'] = carga['filas_por_segundo']
+            con_reintentos(cargar_ids, f"los IDs a eliminar de {nombre_archivo}")
+        
+        with medir_etapa(metricas, 'intercambio', len(por_escribir) + len(cambios['ids_eliminar'])):
+            intercambiar_staging(engine, checkpoint, aplicar)
+        completada = True
+    finally:
+        eliminar_tabla_staging(engine, staging_ids)
+        if completada or checkpoint is None:
+            eliminar_tabla_staging(engine, staging)
+    
+    return resumen
+
+# =============================================================================
+# LECTURA DE LA HOJA FORMATO
+# =============================================================================
+
+HOJA_FORMATO = 'FORMATO'
+
+# Encabezados que se leen: los del Excel y los ya normalizados (mismo criterio
+# que limpiar_y_preparar_datos)
+ENCABEZADOS_LEIDOS = set(COLUMN_MAPPING) | set(COLUMN_MAPPING.values())
+
+class HojaFormatoNoEncontrada(Exception):
+    """El archivo Excel no tiene la hoja FORMATO"""
+
+def _iterar_bloques_openpyxl(libro, hoja, tamano_bloque):
+    """Recorre una hoja abierta en modo read-only entregando DataFrames por bloque"""
+    try:
+        filas = hoja.iter_rows(values_only=True)
+        encabezados = next(filas, None)
+        if encabezados is None:
+            return
+        
+        # Solo las columnas mapeadas (primera aparición de cada encabezado)
+        indices = {}
+        for idx, encabezado in enumerate(encabezados):
+            if encabezado in ENCABEZADOS_LEIDOS and encabezado not in indices:
+                indices[encabezado] = idx
+        columnas = list(indices)
+        posiciones = list(indices.values())
+        ultima_columna = max(posiciones) + 1 if posiciones else 1
+        # Encabezados originales de la hoja (para el reporte de validación)
+        encabezados_hoja = [str(e) for e in encabezados if e is not None]
+        
+        def _crear_bloque(filas_bloque, inicio):
+            bloque_df = pd.DataFrame(filas_bloque, columns=columnas,
+                                     index=pd.RangeIndex(inicio, inicio + len(filas_bloque)))
+            bloque_df.attrs['encabezados'] = encabezados_hoja
+            return bloque_df
+        
+        inicio = 0
+        bloque = []
+        for fila in hoja.iter_rows(min_row=2, max_col=ultima_columna, values_only=True):
+            fila = fila + (None,) * (ultima_columna - len(fila))
+            bloque.append([fila[pos] for pos in posiciones])
+            if len(bloque) >= tamano_bloque:
+                yield _crear_bloque(bloque, inicio)
+                inicio += len(bloque)
+                bloque = []
+        
+        if bloque or inicio == 0:
+            yield _crear_bloque(bloque, inicio)
+    finally:
+        libro.close()
+
+def _iterar_bloques_xls(xls, tamano_bloque):
+    """Lee una hoja de un archivo .xls (sin modo streaming) y la entrega por bloques"""
+    encabezados_hoja = [str(e) for e in xls.parse(HOJA_FORMATO, nrows=0).columns]
+    df = xls.parse(HOJA_FORMATO, usecols=lambda col: col in ENCABEZADOS_LEIDOS)
+    df.attrs['encabezados'] = encabezados_hoja
+    for inicio in range(0, max(len(df), 1), tamano_bloque):
+        yield df.iloc[inicio:inicio + tamano_bloque]
+
+def iterar_hoja_formato(archivo_excel, tamano_bloque=None):
+    """
+    Abre un archivo Excel una sola vez y lee la hoja FORMATO por bloques
+    
+    Solo se materializan las columnas mapeadas. Los .xlsx se leen en
+    modo read-only (streaming); los .xls se leen completos con pandas.
+    
+    Returns:
+        Generador de DataFrames de a lo sumo tamano_bloque filas
+    
+    Raises:
+        HojaFormatoNoEncontrada: si el archivo no tiene la hoja FORMATO
+    """
+    tamano_bloque = tamano_bloque or tamano_bloque_lectura
+    
+    if Path(archivo_excel).suffix.lower() == '.xls':
+        xls = pd.ExcelFile(archivo_excel)
+        if HOJA_FORMATO not in xls.sheet_names:
+            raise HojaFormatoNoEncontrada(f"Hoja '{HOJA_FORMATO}' no encontrada")
+        return _iterar_bloques_xls(xls, tamano_bloque)
+    
+    from openpyxl import load_workbook
+    
+    libro = load_workbook(archivo_excel, read_only=True, data_only=True)
+    if HOJA_FORMATO not in libro.sheetnames:
+        libro.close()
+        raise HojaFormatoNoEncontrada(f"Hoja '{HOJA_FORMATO}' no encontrada")
+    
+    return _iterar_bloques_openpyxl(libro, libro[HOJA_FORMATO], tamano_bloque)
+
+def leer_hoja_formato(archivo_excel, tamano_bloque=None):
+    """
+    Lee la hoja FORMATO completa (solo columnas mapeadas) en un DataFrame
+    
+    Raises:
+        HojaFormatoNoEncontrada: si el archivo no tiene la hoja FORMATO
+    """
+    bloques = list(iterar_hoja_formato(archivo_excel, tamano_bloque))
+    if len(bloques) == 1:
+        return bloques[0]
+    df = pd.concat(bloques)
+    df.attrs['encabezados'] = bloques[0].attrs.get('encabezados', [])
+    return df
+
+# =============================================================================
+# FUNCIONES DE CACHÉ PARQUET
+# =============================================================================
+
+# Funciones y constantes que definen el DataFrame limpio: si cambian, la caché se invalida
+REGLAS_LIMPIEZA = ('_normalizar_texto', 'limpiar_y_preparar_datos', '_texto_para_huella',
+                   '_texto_clave', '_hash_filas', 'clave_natural_eventos', 'agregar_huellas_filas')
+
+_version_reglas = None
+
+def version_reglas_limpieza():
+    """
+    Hash corto del código de limpieza, de COLUMN_MAPPING y de las columnas tipadas
+    
+    Forma parte de la clave de la caché, así un cambio en las reglas no
+    reutiliza DataFrames limpiados con las reglas anteriores.
+    """
+    global _version_reglas
+    if _version_reglas is None:
+        import inspect
+        
+        h = hashlib.sha256()
+        for nombre in REGLAS_LIMPIEZA:
+            h.update(inspect.getsource(globals()[nombre]).encode('utf-8'))
+        h.update(json.dumps(
+            [COLUMN_MAPPING, DATE_COLUMNS, NUMERIC_COLUMNS, COLUMNAS_CLAVE_EVENTO, pd.__version__],
+            sort_keys=True
+        ).encode('utf-8'))
+        _version_reglas = h.hexdigest()[:16]
+    return _version_reglas
+
+def cache_disponible():
+    """Indica si la caché está activada y hay un motor Parquet (pyarrow) instalado"""
+    global usar_cache
+    if not usar_cache:
+        return False
+    
+    import importlib.util
+    
+    if importlib.util.find_spec('pyarrow') is None:
+        logger.warning("⚠️  pyarrow no está instalado: se desactiva la caché Parquet")
+        usar_cache = False
+    return usar_cache
+
+def ruta_cache(hash_archivo):
+    """Archivo Parquet de la caché para un contenido y una versión de las reglas"""
+    return Path(carpeta_cache) / f"{hash_archivo}_{version_reglas_limpieza()}.parquet"
+
+def leer_cache(hash_archivo, nombre_archivo):
+    """
+    Lee el DataFrame limpio de un archivo desde la caché
+    
+    Returns:
+        DataFrame con ARCHIVO_ORIGEN = nombre_archivo, o None si no está en caché
+    """
+    ruta = ruta_cache(hash_archivo)
+    if not ruta.exists():
+        return None
+    
+    try:
+        df = pd.read_parquet(ruta)
+    except Exception as e:
+        logger.warning(f"⚠️  Caché ilegible, se descarta ({ruta.name}): {e}")
+        ruta.unlink(missing_ok=True)
+        return None
+    
+    # El mismo contenido puede llegar con otro nombre de archivo
+    df['ARCHIVO_ORIGEN'] = nombre_archivo
+    os.utime(ruta)  # Marca de uso para el desalojo LRU
+    return df
+
+def archivo_en_cache(archivo_excel, hash_archivo=None):
+    """
+    True si preparar_archivo tomará el archivo de la caché sin abrir el Excel
+    
+    Args:
+        hash_archivo: SHA-256 del archivo ya calculado (p. ej. por el manifiesto);
+            si no se indica, se calcula aquí
+    """
+    if not cache_disponible():
+        return False
+    return ruta_cache(hash_archivo or calcular_hash_archivo(archivo_excel)).exists()
+
+def _columnas_para_parquet(df):
+    """
+    Copia del DataFrame que Parquet puede escribir
+    
+    Las columnas object con valores de tipos mezclados (p. ej. CODIGO_INTERRUPTOR
+    con códigos numéricos y de texto) se pasan a texto, conservando los nulos
+    como None. Las huellas ya están calculadas, así que no cambian; en la base
+    de datos las columnas son NVARCHAR y reciben el mismo texto.
+    """
+    mezcladas = [col for col in df.columns
+                 if df[col].dtype == object
+                 and pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty')]
+    if not mezcladas:
+        return df
+    
+    df = df.copy()
+    for col in mezcladas:
+        df[col] = df[col].astype(str).where(df[col].notna(), None)
+    return df
+
+def guardar_cache(hash_archivo, df):
+    """Guarda el DataFrame limpio en la caché y desaloja las entradas más antiguas"""
+    ruta = ruta_cache(hash_archivo)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta_temporal = ruta.with_name(f"{ruta.name}.{uuid.uuid4().hex}.tmp")
+    
+    try:
+        _columnas_para_parquet(df).to_parquet(ruta_temporal, index=True)
+        os.replace(ruta_temporal, ruta)
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo guardar en caché ({ruta.name}): {e}")
+        ruta_temporal.unlink(missing_ok=True)
+        return
+    
+    desalojar_cache(carpeta_cache, cache_max_mb)
+
+def desalojar_cache(carpeta, max_mb):
+    """Elimina los Parquet usados hace más tiempo hasta quedar bajo max_mb"""
+    entradas = []
+    for ruta in Path(carpeta).glob('*.parquet'):
+        try:
+            estado = ruta.stat()
+        except FileNotFoundError:
+            continue  # Desalojado por otro proceso del pool
+        entradas.append((estado.st_mtime, estado.st_size, ruta))
+    
+    total = sum(tamano for _, tamano, _ in entradas)
+    limite = max_mb * 1024 * 1024
+    
+    for _, tamano, ruta in sorted(entradas):
+        if total <= limite:
+            break
+        ruta.unlink(missing_ok=True)
+        total -= tamano
+        logger.info(f"✓ Caché: desalojado {ruta.name}")
+
+# =============================================================================
+# FUNCIONES DE PROCESAMIENTO
+# =============================================================================
+
+def obtener_archivos_excel(carpeta):
+    """Obtiene todos los archivos Excel (.xlsx, .xls) de una carpeta"""
+    ruta = Path(carpeta)
+    archivos_excel = []
+    
+    for extension in ['*.xlsx', '*.xls']:
+        archivos_excel.extend(ruta.glob(extension))
+    
+    return sorted(archivos_excel)
+
+def _normalizar_texto(serie):
+    """
+    Recorta espacios de los strings y convierte vacíos y nulos en None (columna object)
+    
+    Las columnas de texto tienen pocos valores distintos (subestaciones, causas,
+    regiones), así que se factoriza y se limpia cada valor único una sola vez.
+    """
+    codigos, unicos = pd.factorize(serie)
+    if pd.api.types.infer_dtype(unicos, skipna=True) == 'string':
+        limpios = pd.Series(unicos, dtype=object).str.strip()
+        limpios = limpios.where(limpios != '', None).to_numpy()
+        # El código -1 (nulo) toma el None agregado al final
+        valores = np.append(limpios, None)[codigos]
+        return pd.Series(valores, index=serie.index, dtype=object)
+    
+    # Columnas con tipos mezclados (p. ej. códigos numéricos y de texto)
+    try:
+        recortada = serie.str.strip()
+        serie = recortada.where(recortada.notna(), serie)
+    except AttributeError:
+        pass  # La columna no tiene strings
+    return serie.where(serie.notna() & (serie != ''), None)
+
+def limpiar_y_preparar_datos(df, nombre_archivo, detallado=True):
+    """
+    Limpia y prepara el DataFrame, agregando columna de archivo origen
+    
+    Todas las transformaciones son por columna (sin funciones Python por celda)
+    y el DataFrame resultante se construye una sola vez. Los nulos quedan como
+    None en columnas de texto, NaT en fechas y NaN en numéricas.
+    
+    Si varios encabezados del Excel corresponden a la misma columna (p. ej.
+    'PROTECCION _OPERADA' y 'PROTECCION_OPERADA'), se combinan en una sola:
+    cada fila toma el primer valor no nulo en el orden de la hoja. Una fila
+    se descarta por falta de fecha de apertura solo si todas sus columnas de
+    apertura están vacías.
+    
+    Las reglas son por fila, así que se pueden aplicar bloque a bloque
+    (ETL_PIPELINE); con detallado=False el detalle de pasos va a nivel DEBUG.
+    """
+    registrar = logger.info if detallado else logger.debug
+    
+    registrar(f"\n{'='*60}")
+    registrar("LIMPIEZA Y PREPARACIÓN DE DATOS")
+    registrar(f"{'='*60}")
+    
+    filas_iniciales = len(df)
+    
+    # 1. Mapear columnas
+    registrar("\n1. Mapeando columnas...")
+    columnas_validas = set(COLUMN_MAPPING.values())
+    origenes = {}  # nombre normalizado -> encabezados del Excel, en orden de la hoja
+    for col_excel in df.columns:
+        nombre = COLUMN_MAPPING.get(col_excel, col_excel)
+        if nombre in columnas_validas:
+            origenes.setdefault(nombre, []).append(col_excel)
+    
+    for nombre, cols_excel in origenes.items():
+        if len(cols_excel) > 1:
+            logger.warning(f"⚠️  {nombre}: encabezados repetidos {cols_excel}, se combinan en una columna")
+    
+    # 2. Eliminar filas vacías
+    registrar("\n2. Eliminando filas vacías...")
+    nulos = df[[col for cols_excel in origenes.values() for col in cols_excel]].isna()
+    filas_validas = ~nulos.all(axis=1)
+    
+    # 3. Filtrar filas sin fecha de apertura
+    registrar("\n3. Validando fecha de apertura...")
+    if 'FECHA_HORA_APERTURA' in origenes:
+        filas_validas &= ~nulos[origenes['FECHA_HORA_APERTURA']].all(axis=1)
+        registrar(f"   ✓ Filas con fecha válida: {int(filas_validas.sum())}")
+    
+    indice = df.index[filas_validas.to_numpy()]
+    columnas = {}
+    
+    # 4-7. Convertir fechas y numéricos, limpiar strings y normalizar vacíos
+    registrar("\n4. Convirtiendo columnas de fecha...")
+    registrar("\n5. Convirtiendo columnas numéricas...")
+    for nombre, cols_excel in origenes.items():
+        serie = None
+        for col_excel in cols_excel:
+            parcial = df[col_excel][filas_validas]
+            
+            if nombre in DATE_COLUMNS:
+                parcial = pd.to_datetime(parcial, errors='coerce')
+            elif nombre in NUMERIC_COLUMNS:
+                parcial = pd.to_numeric(parcial, errors='coerce')
+            elif parcial.dtype == object:
+                parcial = _normalizar_texto(parcial)
+            
+            # Encabezados repetidos: se completan los nulos con la siguiente columna
+            serie = parcial if serie is None else serie.where(serie.notna(), parcial)
+        
+        columnas[nombre] = serie
+    
+    # 8. AGREGAR COLUMNA DE ARCHIVO ORIGEN
+    registrar(f"\n6. Agregando columna ARCHIVO_ORIGEN...")
+    columnas['ARCHIVO_ORIGEN'] = pd.Series(nombre_archivo, index=indice, dtype=object)
+    registrar(f"   ✓ Archivo origen: {nombre_archivo}")
+    
+    df = pd.DataFrame(columnas, index=indice)
+    
+    registrar(f"\n{'='*60}")
+    registrar(f"✓ Limpieza completada:")
+    registrar(f"  - Total de filas: {len(df)} (de {filas_iniciales} iniciales)")
+    registrar(f"  - Total de columnas: {len(df.columns)}")
+    registrar(f"{'='*60}")
+    
+    return df
+
+def preparar_archivo(archivo_excel, hash_archivo=None):
+    """
+    Lee la hoja FORMATO de un archivo Excel y la limpia, sin tocar la base de datos
+    
+    Se ejecuta en el proceso principal o en un proceso del pool (ETL_WORKERS).
+    Con la caché activada (ETL_USAR_CACHE), un archivo con el mismo contenido
+    y las mismas reglas de limpieza se toma del Parquet sin abrir el Excel.
+    
+    Args:
+        hash_archivo: SHA-256 del archivo ya calculado (p. ej. por el manifiesto);
+            si no se indica y la caché está activada, se calcula aquí
+    
+    Returns:
+        Dict con estado 'preparado' y el DataFrame limpio, o el resultado de
+        error; en ambos casos con las métricas de las etapas 'lectura' y 'limpieza'
+    """
+    nombre_archivo = os.path.basename(archivo_excel)
+    metricas = {}
+    
+    try:
+        if not cache_disponible():
+            hash_archivo = None
+        else:
+            with medir_etapa(metricas, 'lectura') as medicion:
+                hash_archivo = hash_archivo or calcular_hash_archivo(archivo_excel)
+                df = leer_cache(hash_archivo, nombre_archivo)
+                medicion['filas'] = len(df) if df is not None else None
+            
+            if df is not None:
+                logger.info(f"\n2. ✓ {nombre_archivo} leído desde la caché Parquet: {len(df)} filas limpias")
+                return {
+                    'archivo': nombre_archivo,
+                    'estado': 'preparado',
+                    'df': df,
+                    'desde_cache': True,
+                    'metricas': metricas
+                }
+        
+        logger.info(f"\n2. Leyendo hoja 'FORMATO' de {nombre_archivo}...")
+        with medir_etapa(metricas, 'lectura') as medicion:
+            df = leer_hoja_formato(archivo_excel)
+            medicion['filas'] = len(df)
+        logger.info(f"✓ Datos leídos: {len(df)} filas, {len(df.columns)} columnas mapeadas")
+        
+        with medir_etapa(metricas, 'limpieza', len(df)):
+            df = limpiar_y_preparar_datos(df, nombre_archivo)
+            df = agregar_huellas_filas(df)
+        
+        if hash_archivo is not None:
+            guardar_cache(hash_archivo, df)
+        
+        return {
+            'archivo': nombre_archivo,
+            'estado': 'preparado',
+            'df': df,
+            'desde_cache': False,
+            'metricas': metricas
+        }
+    
+    except HojaFormatoNoEncontrada as e:
+        logger.error(f"✗ {e}")
+        return {
+            'archivo': nombre_archivo,
+            'estado': 'error',
+            'mensaje': str(e),
+            'error_contenido': True,
+            'metricas': metricas
+        }
+    
+    except Exception as e:
+        logger.error(f"\n✗ Error leyendo archivo {nombre_archivo}: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {
+            'archivo': nombre_archivo,
+            'estado': 'error',
+            'mensaje': str(e),
+            'metricas': metricas
+        }
+
+def procesar_archivo(archivo_excel, engine, nombre_tabla, datos_preparados=None, manifiesto=None,
+                     info_archivo=None, consulta_manifiesto=None, metricas=None):
+    """
+    Procesa un archivo Excel con verificación de duplicados
+    
+    Args:
+        datos_preparados: Callable opcional que entrega el resultado de
+            preparar_archivo (p. ej. future.result del pool de lectura).
+            Solo se invoca si el archivo no se salta.
+        manifiesto: Manifiesto de cargas (ver cargar_manifiesto). Si se indica,
+            los archivos sin cambios o renombrados se saltan sin abrirlos ni
+            consultar SQL Server.
+        info_archivo: Estado de carga ya consultado con verificar_archivos_cargados.
+            Si no se indica, se consulta solo este archivo.
+        consulta_manifiesto: Resultado de consultar_manifiesto ya obtenido para
+            este archivo (opcional; si no se indica, se consulta aquí)
+        metricas: Métricas del archivo ya medidas antes de llamar (opcional)
+    
+    Returns:
+        Dict con resultado de la operación y sus métricas por etapa ('metricas')
+    """
+    metricas = {} if metricas is None else metricas
+    resultado = _procesar_archivo(archivo_excel, engine, nombre_tabla, datos_preparados, manifiesto,
+                                  info_archivo, consulta_manifiesto, metricas)
+    resultado['metricas'] = {etapa: metricas[etapa] for etapa in ETAPAS if etapa in metricas}
+    return resultado
+
+def _procesar_archivo(archivo_excel, engine, nombre_tabla, datos_preparados, manifiesto, info_archivo,
+                      consulta_manifiesto, metricas):
+    """Pasos de procesar_archivo; las métricas de cada etapa se registran en metricas"""
+    nombre_archivo = os.path.basename(archivo_excel)
+    
+    logger.info(f"\n{'#'*60}")
+    logger.info(f"PROCESANDO ARCHIVO: {nombre_archivo}")
+    logger.info(f"{'#'*60}")
+    
+    try:
+        # PASO 0: Consultar el manifiesto local de cargas
+        if manifiesto is None:
+            consulta_manifiesto = None
+        elif consulta_manifiesto is None:
+            with medir_etapa(metricas, 'manifiesto'):
+                consulta_manifiesto = consultar_manifiesto(manifiesto, archivo_excel)
+        
+        if consulta_manifiesto is not None:
+            if consulta_manifiesto['estado'] == 'sin_cambios':
+                logger.info("✓ Archivo sin cambios desde la última carga (manifiesto), saltando")
+                return {
+                    'archivo': nombre_archivo,
+                    'estado': 'saltado',
+                    'filas': 0
+                }
+            
+            if consulta_manifiesto['estado'] == 'renombrado':
+                archivo_previo = consulta_manifiesto['archivo_previo']
+                logger.info(f"✓ Contenido idéntico a '{archivo_previo}' ya cargado (archivo renombrado), saltando")
+                manifiesto[nombre_archivo] = {**manifiesto[archivo_previo], **consulta_manifiesto['huella']}
+                guardar_manifiesto(manifiesto, ruta_manifiesto)
+                return {
+                    'archivo': nombre_archivo,
+                    'estado': 'saltado',
+                    'filas': 0
+                }
+        
+        contenido_modificado = consulta_manifiesto is not None and consulta_manifiesto['estado'] == 'modificado'
+        
+        # PASO 1: Verificar si el archivo ya fue cargado
+        logger.info("\n1. Verificando si el archivo ya fue cargado...")
+        if info_archivo is None:
+            with medir_etapa(metricas, 'verificacion'):
+                info_archivo = verificar_archivo_ya_cargado(engine, nombre_archivo)
+        
+        accion = 'append'  # Default
+        
+        if info_archivo['existe']:
+            logger.warning(f"⚠️  El archivo ya fue cargado ({info_archivo['total_registros']} registros)")
+            
+            if contenido_modificado:
+                logger.warning("🔄 El contenido cambió desde la última carga: candidato a reemplazo")
+            
+            if modo_interactivo:
+                # Preguntar al usuario qué hacer
+                accion = solicitar_accion_usuario(info_archivo, contenido_modificado)
+                
+                if accion == 'skip':
+                    logger.info("✓ Archivo saltado por el usuario")
+                    return {
+                        'archivo': nombre_archivo,
+                        'estado': 'saltado',
+                        'filas': 0
+                    }
+            elif contenido_modificado:
+                # Modo no interactivo: reemplazar archivos con contenido nuevo
+                logger.info("✓ Modo no interactivo: reemplazando archivo con contenido modificado")
+                accion = 'replace'
+            else:
+                # Modo no interactivo: saltar automáticamente
+                logger.info("✓ Modo no interactivo: saltando archivo duplicado")
+                return {
+                    'archivo': nombre_archivo,
+                    'estado': 'saltado',
+                    'filas': 0
+                }
+        else:
+            logger.info("✓ Archivo nuevo, procediendo con la carga")
+        
+        if accion == 'replace' and modo_reemplazo == 'incremental':
+            accion = 'upsert'
+        
+        # SHA-256 del contenido: del manifiesto o, si hace falta para la caché o
+        # la carga reanudable, calculado una sola vez aquí
+        hash_archivo = consulta_manifiesto['huella']['sha256'] if consulta_manifiesto is not None else None
+        if hash_archivo is None and (carga_reanudable or (datos_preparados is None and cache_disponible())):
+            hash_archivo = calcular_hash_archivo(archivo_excel)
+        
+        # La actualización incremental compara el archivo completo: sin pipeline
+        en_pipeline = (usar_pipeline and datos_preparados is None and accion != 'upsert'
+                       and not archivo_en_cache(archivo_excel, hash_archivo))
+        
+        # Deduplicación: claves naturales de los eventos ya cargados (índice en memoria)
+        cargadas = None
+        if usar_deduplicacion:
+            with medir_etapa(metricas, 'deduplicacion'):
+                cargadas = claves_cargadas(engine, nombre_tabla, nombre_archivo, accion)
+        
+        # Carga reanudable: la huella fija la staging y el checkpoint del archivo
+        huella = None
+        if carga_reanudable:
+            particion = f"bloques:{tamano_bloque_lectura}" if en_pipeline else f"lotes:{tamano_lote}"
+            # Las filas descartadas dependen de los eventos cargados: otro índice, otra carga
+            dedup = hashlib.sha256(cargadas.tobytes()).hexdigest() if cargadas is not None else ''
+            huella = huella_carga(hash_archivo, nombre_archivo, nombre_tabla, accion, particion,
+                                  usar_esquema_estrella, dedup)
+        
+        # PASO 2 y 3: Leer la hoja FORMATO, limpiar y preparar datos
+        if not en_pipeline:
+            if datos_preparados is None:
+                preparado = preparar_archivo(archivo_excel, hash_archivo)
+            else:
+                preparado = datos_preparados()
+            
+            metricas.update(preparado.pop('metricas', {}))
+            
+            if preparado['estado'] != 'preparado':
+                return preparado
+            
+            df = preparado['df']
+            
+            if len(df) == 0:
+                logger.warning("⚠️  No hay datos válidos después de la limpieza")
+                return {
+                    'archivo': nombre_archivo,
+                    'estado': 'sin_datos',
+                    'filas': 0
+                }
+            
+            claves_eventos = None
+            if cargadas is not None:
+                filas_leidas = len(df)
+                with medir_etapa(metricas, 'deduplicacion', filas_leidas):
+                    df, claves_eventos = descartar_eventos_cargados(df, cargadas)
+                descartadas = filas_leidas - len(df)
+                logger.info(f"\n✓ Eventos ya cargados descartados: {descartadas} de {filas_leidas}")
+                
+                if len(df) == 0:
+                    logger.warning("⚠️  Todos los eventos del archivo ya están cargados")
+                    return {
+                        'archivo': nombre_archivo,
+                        'estado': 'sin_datos',
+                        'filas': 0
+                    }
+            
+            resumen_mensual = None
+            estadisticas = None
+            with medir_etapa(metricas, 'resumen', len(df)):
+                if usar_resumen_mensual:
+                    resumen_mensual = calcular_resumen_mensual(df)
+                if usar_estadisticas_archivos:
+                    estadisticas = calcular_estadisticas_archivo(df)
+            
+            # Esquema estrella: textos de baja cardinalidad → claves de las dimensiones
+            if usar_esquema_estrella:
+                with medir_etapa(metricas, 'dimensiones', len(df)):
+                    nuevos = resolver_dimensiones(engine, df)
+                logger.info(f"\n✓ Dimensiones resueltas ({nuevos} miembro(s) nuevo(s))")
+        
+        if en_pipeline:
+            # PASO 2 a 5: Leer, limpiar y cargar por bloques, con las etapas solapadas
+            logger.info(f"\n2. Cargando en pipeline por bloques de {tamano_bloque_lectura} filas "
+                        f"(hasta {bloques_en_vuelo} en vuelo)")
+            logger.info(f"Tabla destino: {nombre_tabla}")
+            logger.info(f"Modo: {'REEMPLAZO' if accion == 'replace' else 'AGREGAR'}")
+            logger.info(f"Método de carga: {metodo_carga} (lotes de {tamano_lote} filas)")
+            
+            carga = cargar_archivo_por_bloques(archivo_excel, engine, nombre_tabla, accion, metricas, huella,
+                                               cargadas)
+            
+            if carga['filas'] == 0:
+                logger.warning("⚠️  No hay datos válidos después de la limpieza")
+                return {
+                    'archivo': nombre_archivo,
+                    'estado': 'sin_datos',
+                    'filas': 0
+                }
+            
+            logger.info(f"\n✓ Datos cargados exitosamente a la tabla '{nombre_tabla}'")
+            if accion == 'replace':
+                logger.info(f"  - Registros anteriores reemplazados: {carga['eliminadas']}")
+            logger.info(f"  - Bloques: {carga['bloques']}")
+            if cargadas is not None:
+                logger.info(f"  - Eventos ya cargados descartados: {carga['descartadas']}")
+            logger.info(f"  - Tiempo total: {carga['segundos']:.2f} s "
+                        f"(etapa más lenta: {carga['etapa_mas_lenta']}, {carga['segundos_etapa_mas_lenta']:.2f} s)")
+            logger.info(f"  - Velocidad: {carga['filas_por_segundo']:,.0f} filas/s")
+            
+            filas_archivo = filas_escritas = carga['filas']
+            filas_por_segundo = carga['filas_por_segundo']
+            claves_eventos = carga['claves_eventos']
+            descartadas = carga['descartadas']
+        elif accion == 'upsert':
+            # PASO 4: Aplicar solo las diferencias con los registros existentes
+            logger.info(f"\n{'='*60}")
+            logger.info(f"ACTUALIZACIÓN INCREMENTAL EN SQL SERVER")
+            logger.info(f"{'='*60}")
+            logger.info(f"Tabla destino: {nombre_tabla}")
+            logger.info(f"Filas en el archivo: {len(df)}")
+            
+            cambios = actualizar_incremental(engine, df, nombre_tabla, nombre_archivo, metricas, resumen_mensual,
+                                             estadisticas, huella)
+            
+            logger.info(f"\n✓ Actualización incremental aplicada a la tabla '{nombre_tabla}'")
+            logger.info(f"  - Insertadas: {cambios['insertadas']}")
+            logger.info(f"  - Actualizadas: {cambios['actualizadas']}")
+            logger.info(f"  - Eliminadas: {cambios['eliminadas']}")
+            logger.info(f"  - Sin cambios: {cambios['sin_cambios']}")
+            
+            filas_escritas = cambios['insertadas'] + cambios['actualizadas']
+            filas_por_segundo = cambios['filas_por_segundo']
+            filas_archivo = len(df)
+        else:
+            # PASO 4: Si es reemplazo, marcar los registros como actualizados
+            if accion == 'replace':
+                df['FECHA_ACTUALIZACION'] = datetime.now()
+                logger.info(f"\n3. Marcando registros con FECHA_ACTUALIZACION")
+            
+            # PASO 5: Cargar a SQL Server
+            logger.info(f"\n{'='*60}")
+            logger.info(f"CARGANDO DATOS A SQL SERVER")
+            logger.info(f"{'='*60}")
+            logger.info(f"Tabla destino: {nombre_tabla}")
+            logger.info(f"Modo: {'REEMPLAZO' if accion == 'replace' else 'AGREGAR'}")
+            logger.info(f"Filas a insertar: {len(df)}")
+            
+            logger.info(f"Método de carga: {metodo_carga} (lotes de {tamano_lote} filas)")
+            
+            if accion == 'replace' or huella is not None:
+                # Staging + intercambio atómico: los datos anteriores no se tocan hasta el final
+                carga = cargar_con_staging(engine, df, nombre_tabla, nombre_archivo, accion, metricas,
+                                           resumen_mensual, estadisticas, huella)
+                if accion == 'replace':
+                    logger.info(f"✓ Registros anteriores reemplazados: {carga['eliminadas']}")
+            else:
+                # Eventos, resumen mensual y estadísticas del archivo en una sola transacción
+                with medir_etapa(metricas, 'carga', len(df)), engine.begin() as conn:
+                    carga = cargar_dataframe(df, conn, nombre_tabla)
+                    if resumen_mensual is not None:
+                        aplicar_resumen_mensual(conn, resumen_mensual, nombre_archivo, acumular=True)
+                    if estadisticas is not None:
+                        aplicar_estadisticas_archivo(conn, nombre_archivo, estadisticas, 'append')
+            
+            logger.info(f"\n✓ Datos cargados exitosamente a la tabla '{nombre_tabla}'")
+            logger.info(f"  - Tiempo de carga: {carga['segundos']:.2f} s")
+            logger.info(f"  - Velocidad: {carga['filas_por_segundo']:,.0f} filas/s")
+            
+            filas_archivo = filas_escritas = len(df)
+            filas_por_segundo = carga['filas_por_segundo']
+        
+        if claves_eventos is not None:
+            registrar_eventos_cargados(nombre_archivo, claves_eventos, accion)
+        
+        if consulta_manifiesto is not None:
+            with medir_etapa(metricas, 'registro'):
+                registrar_carga(engine, manifiesto, nombre_archivo, consulta_manifiesto['huella'], filas_archivo)
+        
+        resultado = {
+            'archivo': nombre_archivo,
+            'estado': 'éxito',
+            'accion': accion,
+            'filas': filas_escritas,
+            'filas_por_segundo': filas_por_segundo
+        }
+        
+        if accion == 'upsert':
+            for clave in ('insertadas', 'actualizadas', 'eliminadas', 'sin_cambios'):
+                resultado[clave] = cambios[clave]
+        
+        if cargadas is not None:
+            resultado['descartadas'] = descartadas
+        
+        return resultado
+    
+    except HojaFormatoNoEncontrada as e:
+        # Pipeline por bloques: el archivo no se puede cargar hasta que cambie
+        logger.error(f"✗ {e}")
+        return {
+            'archivo': nombre_archivo,
+            'estado': 'error',
+            'mensaje': str(e),
+            'error_contenido': True
+        }
+    
+    except Exception as e:
+        logger.error(f"\n✗ Error procesando archivo: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {
+            'archivo': nombre_archivo,
+            'estado': 'error',
+            'mensaje': str(e)
+        }
+
+def procesar_archivos(archivos, engine, nombre_tabla, workers=1, manifiesto=None):
+    """
+    Procesa una lista de archivos Excel en orden
+    
+    Con workers > 1 la lectura y limpieza de los archivos se hace en un pool de
+    procesos, mientras un único escritor (este proceso) verifica duplicados y
+    carga cada archivo en el mismo orden de la lista.
+    
+    El estado de carga de todos los archivos se consulta antes, en una sola
+    ida y vuelta a la base de datos (verificar_archivos_cargados).
+    
+    Returns:
+        Lista de resultados de procesar_archivo, en el orden de los archivos
+    """
+    resultados = []
+    # Las dimensiones pudieron cambiar desde la corrida anterior (otro proceso, modo vigilancia)
+    reiniciar_miembros_dimensiones()
+    
+    # Verificación previa en lote; si falla, cada archivo se verifica por separado
+    inicio = time.perf_counter()
+    estados = verificar_archivos_cargados(
+        engine, [os.path.basename(str(archivo)) for archivo in archivos], nombre_tabla
+    ) or {}
+    if estados:
+        ya_cargados = sum(1 for estado in estados.values() if estado['existe'])
+        logger.info(f"\n✓ Verificación en lote: {ya_cargados} de {len(estados)} archivo(s) ya cargados "
+                    f"({time.perf_counter() - inicio:.2f} s)")
+    
+    if workers <= 1:
+        for archivo in archivos:
+            resultado = procesar_archivo(
+                archivo_excel=str(archivo),
+                engine=engine,
+                nombre_tabla=nombre_tabla,
+                manifiesto=manifiesto,
+                info_archivo=estados.get(os.path.basename(str(archivo)))
+            )
+            resultados.append(resultado)
+        return resultados
+    
+    # Solo se leen en el pool los archivos que se van a cargar con seguridad
+    planes = planificar_lectura(archivos, engine, manifiesto, estados)
+    a_leer = sum(1 for plan in planes if plan['leer'])
+    logger.info(f"\n✓ Lectura en paralelo con {workers} procesos: {a_leer} de {len(planes)} archivo(s)")
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=configurar_logging, initargs=(False,)) as executor:
+        # Ventana acotada de archivos en vuelo para no acumular DataFrames en memoria
+        futuros = {}
+        por_leer = iter([posicion for posicion, plan in enumerate(planes) if plan['leer']])
+        
+        def enviar_siguiente():
+            posicion = next(por_leer, None)
+            if posicion is not None:
+                # El hash ya calculado por el manifiesto evita releer el archivo para la caché
+                consulta = planes[posicion]['consulta']
+                hash_archivo = consulta['huella']['sha256'] if consulta is not None else None
+                futuros[posicion] = executor.submit(preparar_archivo, planes[posicion]['archivo'], hash_archivo)
+        
+        for _ in range(workers * 2):
+            enviar_siguiente()
+        
+        for posicion, plan in enumerate(planes):
+            futuro = futuros.pop(posicion, None)
+            resultado = procesar_archivo(
+                archivo_excel=plan['archivo'],
+                engine=engine,
+                nombre_tabla=nombre_tabla,
+                datos_preparados=futuro.result if futuro is not None else None,
+                manifiesto=manifiesto,
+                info_archivo=plan['info'],
+                consulta_manifiesto=plan['consulta'],
+                metricas=plan['metricas']
+            )
+            resultados.append(resultado)
+            if futuro is not None:
+                enviar_siguiente()
+    
+    return resultados
+
+def planificar_lectura(archivos, engine, manifiesto, estados):
+    """
+    Anticipa, sin abrir los Excel, qué archivos se van a cargar
+    
+    Aplica las mismas reglas que procesar_archivo: se saltan los archivos sin
+    cambios o renombrados según el manifiesto y, en modo no interactivo, los
+    ya cargados cuyo contenido no cambió. Los ya cargados en modo interactivo
+    esperan la respuesta del usuario y se leen después, en este proceso.
+    
+    Args:
+        estados: Resultado de verificar_archivos_cargados (los archivos que
+            falten se verifican uno por uno)
+    
+    Returns:
+        Lista, en el orden de archivos, de dicts con archivo, leer (True si se
+        lee en el pool), info, consulta del manifiesto y metricas ya medidas
+    """
+    planes = []
+    hashes_a_cargar = set()
+    
+    for archivo in archivos:
+        archivo = str(archivo)
+        nombre_archivo = os.path.basename(archivo)
+        metricas = {}
+        consulta = None
+        
+        if manifiesto is not None:
+            with medir_etapa(metricas, 'manifiesto'):
+                consulta = consultar_manifiesto(manifiesto, archivo)
+            
+            if consulta['estado'] in ('sin_cambios', 'renombrado'):
+                planes.append({'archivo': archivo, 'leer': False, 'info': estados.get(nombre_archivo),
+                               'consulta': consulta, 'metricas': metricas})
+                continue
+            
+            # Mismo contenido que otro archivo de la lista: tras cargar el primero
+            # será 'renombrado', así que se vuelve a consultar en su turno
+            if consulta['huella']['sha256'] in hashes_a_cargar:
+                planes.append({'archivo': archivo, 'leer': False, 'info': estados.get(nombre_archivo),
+                               'consulta': None, 'metricas': {}})
+                continue
+        
+        info = estados.get(nombre_archivo)
+        if info is None:
+            with medir_etapa(metricas, 'verificacion'):
+                info = verificar_archivo_ya_cargado(engine, nombre_archivo)
+        
+        contenido_modificado = consulta is not None and consulta['estado'] == 'modificado'
+        leer = not info['existe'] or (not modo_interactivo and contenido_modificado)
+        if leer and consulta is not None:
+            hashes_a_cargar.add(consulta['huella']['sha256'])
+        
+        planes.append({'archivo': archivo, 'leer': leer, 'info': info, 'consulta': consulta, 'metricas': metricas})
+    
+    return planes
+
+def mostrar_resumen_final(resultados):
+    """
+    Muestra el RESUMEN FINAL de una corrida
+    
+    Returns:
+        Número de archivos cargados exitosamente
+    """
+    logger.info("\n" + "="*60)
+    logger.info("RESUMEN FINAL")
+    logger.info("="*60)
+    
+    exitosos = 0
+    saltados = 0
+    errores = 0
+    sin_datos = 0
+    total_filas = 0
+    reemplazos = 0
+    incrementales = 0
+    descartadas = 0
+    
+    for resultado in resultados:
+        if resultado['estado'] == 'éxito':
+            accion = resultado.get('accion', 'append')
+            if accion == 'upsert':
+                accion_texto = (f"(INCREMENTAL: +{resultado['insertadas']} "
+                                f"~{resultado['actualizadas']} -{resultado['eliminadas']})")
+            else:
+                accion_texto = '(REEMPLAZO)' if accion == 'replace' else '(AGREGADO)'
+            logger.info(f"✓ {resultado['archivo']}: {resultado['filas']} filas cargadas {accion_texto} "
+                        f"- {resultado['filas_por_segundo']:,.0f} filas/s")
+            exitosos += 1
+            total_filas += resultado['filas']
+            descartadas += resultado.get('descartadas', 0)
+            if accion == 'replace':
+                reemplazos += 1
+            elif accion == 'upsert':
+                incrementales += 1
+        elif resultado['estado'] == 'saltado':
+            logger.info(f"⊘ {resultado['archivo']}: Saltado (ya cargado previamente)")
+            saltados += 1
+        elif resultado['estado'] == 'sin_datos':
+            logger.info(f"⊘ {resultado['archivo']}: Sin datos válidos")
+            sin_datos += 1
+        else:
+            logger.error(f"✗ {resultado['archivo']}: ERROR - {resultado['mensaje']}")
+            errores += 1
+    
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Archivos procesados exitosamente: {exitosos}")
+    logger.info(f"  - Nuevos: {exitosos - reemplazos - incrementales}")
+    logger.info(f"  - Reemplazados: {reemplazos}")
+    logger.info(f"  - Actualizados (incremental): {incrementales}")
+    logger.info(f"Archivos saltados (duplicados): {saltados}")
+    logger.info(f"Archivos sin datos: {sin_datos}")
+    logger.info(f"Archivos con errores: {errores}")
+    logger.info(f"Total de filas cargadas: {total_filas}")
+    if usar_deduplicacion:
+        logger.info(f"Eventos ya cargados descartados: {descartadas}")
+    logger.info(f"{'='*60}")
+    
+    # Tiempos por etapa de todos los archivos
+    etapas = agregar_metricas(resultados)
+    if etapas:
+        logger.info(f"\n{'Etapa':<14} {'Segundos':>10} {'CPU (s)':>10} {'Filas':>10} "
+                    f"{'Filas/s':>12} {'Mem. pico MB':>13} {'Idas BD':>8}")
+        logger.info("-"*83)
+        for etapa, total in etapas.items():
+            filas_por_segundo = f"{total['filas_por_segundo']:,.0f}" if total['filas_por_segundo'] else '-'
+            memoria = f"{total['memoria_pico_mb']:,.1f}" if total['memoria_pico_mb'] is not None else '-'
+            logger.info(f"{etapa:<14} {total['segundos']:>10.2f} {total['cpu_segundos']:>10.2f} "
+                        f"{total['filas']:>10} {filas_por_segundo:>12} {memoria:>13} {total['idas_vuelta_bd']:>8}")
+        logger.info(f"{'='*60}")
+    
+    return exitosos
+
+# =============================================================================
+# PIPELINE POR BLOQUES
+# =============================================================================
+
+def cargar_archivo_por_bloques(archivo_excel, engine, nombre_tabla, accion, metricas=None, huella=None,
+                               cargadas=None):
+    """
+    Lee, limpia y carga un archivo por bloques, con las tres etapas solapadas
+    
+    Un hilo lee la hoja FORMATO por bloques (ETL_TAMANO_BLOQUE_LECTURA), otro
+    aplica a cada bloque las reglas de limpiar_y_preparar_datos y este hilo
+    escribe los bloques limpios en una tabla staging mientras se lee el
+    siguiente. Como máximo hay ETL_BLOQUES_EN_VUELO bloques en memoria: si la
+    escritura se atrasa, el lector espera.
+    
+    Al final, en una sola transacción, las filas pasan de staging a la tabla
+    principal (agregando o reemplazando las del archivo) junto con el resumen
+    mensual y las estadísticas del archivo, igual que en la carga completa. Si algo falla, la
+    tabla principal queda sin cambios.
+    
+    Con huella, cada bloque se confirma en staging junto con el checkpoint del
+    archivo; al reanudar, los bloques ya confirmados se leen y limpian (el
+    resumen y las estadísticas necesitan el archivo completo) pero no se
+    vuelven a escribir.
+    
+    Args:
+        accion: 'append' o 'replace'
+        metricas: Dict donde se registran las etapas 'lectura', 'limpieza',
+            'resumen', 'dimensiones', 'carga' e 'intercambio' (opcional)
+        huella: Huella de la carga (huella_carga) para cargar con checkpoint (opcional)
+        cargadas: Claves de eventos ya cargados (claves_cargadas); el hilo de
+            limpieza descarta esos eventos de cada bloque (opcional)
+    
+    Returns:
+        Dict con filas, bloques, eliminadas, descartadas, segundos,
+        filas_por_segundo, la etapa más lenta y, con cargadas, claves_eventos de
+        las filas cargadas; filas = 0 si no quedaron datos válidos (no se carga nada)
+    
+    Raises:
+        HojaFormatoNoEncontrada: si el archivo no tiene la hoja FORMATO
+    """
+    metricas = {} if metricas is None else metricas
+    nombre_archivo = os.path.basename(archivo_excel)
+    inicio = time.perf_counter()
+    
+    bloques = iterar_hoja_formato(archivo_excel)
+    
+    cupos = threading.BoundedSemaphore(bloques_en_vuelo)
+    crudos = queue.Queue()
+    limpios = queue.Queue()
+    detener = threading.Event()
+    # Cada hilo mide sus etapas en su propio dict (CPU e idas y vueltas del
+    # hilo); mientras corren juntos, la memoria pico del proceso no se mide
+    metricas_lectura = {}
+    metricas_limpieza = {}
+    apariciones = {}
+    # Estadísticas acumuladas de los bloques ya limpios (las actualiza el hilo de limpieza)
+    estadisticas = [None]
+    descartadas = [0]
+    claves_eventos = []
+    fecha_actualizacion = datetime.now()
+    
+    def leer():
+        try:
+            while not detener.is_set():
+                if not cupos.acquire(timeout=0.1):
+                    continue
+                with medir_etapa(metricas_lectura, 'lectura', memoria=False) as medicion:
+                    bloque = next(bloques, None)
+                    medicion['filas'] = len(bloque) if bloque is not None else 0
+                if bloque is None:
+                    break
+                crudos.put(bloque)
+            crudos.put(None)
+        except Exception as e:
+            crudos.put(e)
+        finally:
+            bloques.close()
+    
+    def limpiar():
+        try:
+            while True:
+                bloque = crudos.get()
+                if bloque is None or isinstance(bloque, Exception) or detener.is_set():
+                    limpios.put(bloque if not detener.is_set() else None)
+                    return
+                with medir_etapa(metricas_limpieza, 'limpieza', len(bloque), memoria=False):
+                    df = limpiar_y_preparar_datos(bloque, nombre_archivo, detallado=False)
+                    df = agregar_huellas_filas(df, apariciones)
+                    if accion == 'replace':
+                        df['FECHA_ACTUALIZACION'] = fecha_actualizacion
+                    # El filtro por bloque se mide con la limpieza; 'deduplicacion' queda para el índice
+                    if cargadas is not None:
+                        filas_bloque = len(df)
+                        df, claves = descartar_eventos_cargados(df, cargadas)
+                        descartadas[0] += filas_bloque - len(df)
+                        claves_eventos.append(claves)
+                resumen = None
+                with medir_etapa(metricas_limpieza, 'resumen', len(df), memoria=False):
+                    if usar_resumen_mensual:
+                        resumen = calcular_resumen_mensual(df)
+                    if usar_estadisticas_archivos:
+                        estadisticas[0] = calcular_estadisticas_archivo(df, estadisticas[0])
+                limpios.put((df, resumen))
+        except Exception as e:
+            limpios.put(e)
+    
+    hilos = [
+        threading.Thread(target=leer, name='etl-lectura', daemon=True),
+        threading.Thread(target=limpiar, name='etl-limpieza', daemon=True)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    
+    staging = None
+    checkpoint = None
+    completada = False
+    columnas = None
+    filas = 0
+    numero_bloques = 0
+    resumenes = []
+    
+    try:
+        while True:
+            elemento = limpios.get()
+            if elemento is None:
+                break
+            if isinstance(elemento, Exception):
+                raise elemento
+            
+            df, resumen = elemento
+            numero_bloques += 1
+            filas += len(df)
+            if resumen is not None:
+                resumenes.append(resumen)
+            
+            if usar_esquema_estrella:
+                with medir_etapa(metricas, 'dimensiones', len(df), memoria=False):
+                    resolver_dimensiones(engine, df)
+            
+            if staging is None:
+                columnas = list(df.columns)
+                with medir_etapa(metricas, 'carga', memoria=False):
+                    if huella is not None:
+                        checkpoint = iniciar_carga_reanudable(engine, nombre_tabla, columnas, nombre_archivo, huella)
+                        staging = checkpoint['staging']
+                    else:
+                        staging = crear_tabla_staging(engine, nombre_tabla, columnas)
+            
+            if checkpoint is not None and numero_bloques <= checkpoint['lote']:
+                cupos.release()
+                logger.info(f"   ✓ Bloque {numero_bloques}: ya confirmado en staging, saltando")
+                continue
+            
+            with medir_etapa(metricas, 'carga', len(df), memoria=False):
+                if checkpoint is not None:
+                    confirmar_lote(engine, df, checkpoint, numero_bloques)
+                else:
+                    cargar_dataframe(df, engine, staging)
+            
+            cupos.release()
+            logger.info(f"   ✓ Bloque {numero_bloques}: {len(df)} filas cargadas a staging ({filas} en total)")
+        
+        for hilo in hilos:
+            hilo.join()
+        
+        eliminadas = 0
+        if filas > 0:
+            resumen_mensual = None
+            if resumenes:
+                with medir_etapa(metricas_limpieza, 'resumen'):
+                    resumen_mensual = _agrupar_resumen(pd.concat(resumenes, ignore_index=True))
+            
+            def aplicar(conn):
+                eliminadas = pasar_staging_a_tabla(conn, nombre_tabla, staging, columnas, nombre_archivo,
+                                                   reemplazar=accion == 'replace')
+                if resumen_mensual is not None:
+                    aplicar_resumen_mensual(conn, resumen_mensual, nombre_archivo,
+                                            acumular=accion != 'replace')
+                if estadisticas[0] is not None:
+                    aplicar_estadisticas_archivo(conn, nombre_archivo, estadisticas[0], accion)
+                return eliminadas
+            
+            with medir_etapa(metricas, 'intercambio', filas):
+                eliminadas = intercambiar_staging(engine, checkpoint, aplicar) or 0
+        elif checkpoint is not None:
+            with engine.begin() as conn:
+                eliminar_checkpoint(conn, nombre_archivo)
+        completada = True
+    finally:
+        detener.set()
+        for hilo in hilos:
+            hilo.join()
+        # Con checkpoint, la staging de una carga interrumpida queda para reanudarla
+        if staging is not None and (completada or checkpoint is None):
+            eliminar_tabla_staging(engine, staging)
+    
+    metricas.update(metricas_lectura)
+    metricas.update(metricas_limpieza)
+    
+    segundos = time.perf_counter() - inicio
+    etapa_mas_lenta = max(('lectura', 'limpieza', 'carga'),
+                          key=lambda etapa: metricas.get(etapa, {}).get('segundos', 0.0))
+    
+    resultado = {
+        'filas': filas,
+        'bloques': numero_bloques,
+        'eliminadas': eliminadas,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos > 0 else 0.0,
+        'etapa_mas_lenta': etapa_mas_lenta,
+        'segundos_etapa_mas_lenta': metricas.get(etapa_mas_lenta, {}).get('segundos', 0.0),
+        'descartadas': descartadas[0],
+        'claves_eventos': None
+    }
+    
+    if cargadas is not None:
+        resultado['claves_eventos'] = np.concatenate(claves_eventos) if claves_eventos else np.empty(0, dtype=np.int64)
+    
+    return resultado
+
+# =============================================================================
+# MODO VIGILANCIA
+# =============================================================================
+
+def _firma_archivo(ruta):
+    """Tamaño y mtime de un archivo, o None si ya no existe"""
+    try:
+        estado = ruta.stat()
+    except FileNotFoundError:
+        return None
+    return (estado.st_size, estado.st_mtime_ns)
+
+def vigilar_carpeta(carpeta, engine, nombre_tabla, manifiesto=None, intervalo=None, estabilidad=None,
+                    workers=1, ciclos=None):
+    """
+    Vigila la carpeta y procesa cada archivo nuevo o modificado cuando deja de cambiar
+    
+    Un archivo se procesa cuando su tamaño y mtime no cambian durante
+    'estabilidad' segundos, contados desde que se vio por primera vez, y en
+    al menos dos revisiones seguidas (así no se lee un Excel que aún se está
+    copiando, aunque la copia conserve el mtime original). El engine, su pool
+    de conexiones y la configuración se reutilizan entre archivos.
+    
+    Un archivo con error no detiene la cola. Si el error es del contenido (sin
+    hoja FORMATO o sin datos válidos) se vuelve a intentar solo cuando el
+    archivo cambia; cualquier otro error (p. ej. la base de datos no responde)
+    se reintenta con esperas crecientes, desde 'intervalo' hasta
+    ETL_ESPERA_MAXIMA_VIGILANCIA. Las métricas de cada tanda se exportan a JSON
+    junto al log, como en una carga normal.
+    
+    Args:
+        manifiesto: Manifiesto de cargas; sin él, los archivos modificados ya
+            cargados se saltan como duplicados
+        intervalo: Segundos entre revisiones de la carpeta (por defecto ETL_INTERVALO_VIGILANCIA)
+        estabilidad: Segundos sin cambios antes de procesar (por defecto ETL_ESTABILIDAD_VIGILANCIA)
+        ciclos: Número de revisiones antes de terminar (None = sin fin)
+    """
+    global modo_interactivo
+    
+    intervalo = intervalo if intervalo is not None else intervalo_vigilancia
+    estabilidad = estabilidad if estabilidad is not None else estabilidad_vigilancia
+    
+    if modo_interactivo:
+        logger.warning("⚠️  El modo vigilancia no pregunta al usuario: se usa el modo automático")
+        modo_interactivo = False
+    if manifiesto is None:
+        logger.warning("⚠️  Sin manifiesto (ETL_USAR_MANIFIESTO) los archivos modificados no se recargan")
+    
+    logger.info(f"\n✓ Vigilando {carpeta} cada {intervalo:g} s (estabilidad {estabilidad:g} s)")
+    
+    observados = {}   # nombre -> (firma, instante desde el que no cambia, ciclo en que se vio)
+    procesados = {}   # nombre -> firma con la que se cargó o descartó por última vez
+    reintentos = {}   # nombre -> (firma, intentos fallidos, instante del próximo intento)
+    tandas = 0
+    ciclo = 0
+    
+    while ciclos is None or ciclo < ciclos:
+        ciclo += 1
+        ahora = time.time()
+        listos = []
+        
+        # Los '~$' son archivos de bloqueo que crea Excel mientras un libro está abierto
+        archivos = [ruta for ruta in obtener_archivos_excel(carpeta) if not ruta.name.startswith('~$')]
+        presentes = {ruta.name for ruta in archivos}
+        for nombre in set(observados) - presentes:
+            del observados[nombre]
+        
+        for ruta in archivos:
+            firma = _firma_archivo(ruta)
+            if firma is None:
+                observados.pop(ruta.name, None)
+                continue
+            
+            # El mtime no sirve de referencia: una copia puede conservar el del original
+            if ruta.name not in observados or observados[ruta.name][0] != firma:
+                observados[ruta.name] = (firma, ahora, ciclo)
+            
+            _, desde, ciclo_firma = observados[ruta.name]
+            estable = ciclo > ciclo_firma and ahora - desde >= estabilidad
+            reintento = reintentos.get(ruta.name)
+            en_espera = reintento is not None and reintento[0] == firma and ahora < reintento[2]
+            if estable and procesados.get(ruta.name) != firma and not en_espera:
+                listos.append(ruta)
+        
+        if listos:
+            logger.info(f"\n✓ {len(listos)} archivo(s) listos para procesar: {', '.join(r.name for r in listos)}")
+            firmas = {ruta.name: observados[ruta.name][0] for ruta in listos}
+            resultados = []
+            
+            try:
+                resultados = procesar_archivos(
+                    listos,
+                    engine=engine,
+                    nombre_tabla=nombre_tabla,
+                    workers=workers,
+                    manifiesto=manifiesto
+                )
+                mostrar_resumen_final(resultados)
+                tandas += 1
+                # Un JSON por tanda, numerado, junto al log de la corrida
+                exportar_metricas(resultados, archivo_metricas.with_name(f"{archivo_metricas.stem}_{tandas:04d}.json"))
+            except Exception as e:
+                # p. ej. un proceso de lectura que murió; la vigilancia continúa
+                logger.error(f"\n✗ Error procesando {len(listos)} archivo(s): {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+            
+            por_archivo = {resultado['archivo']: resultado for resultado in resultados}
+            for nombre, firma in firmas.items():
+                resultado = por_archivo.get(nombre)
+                terminado = resultado is not None and (resultado['estado'] != 'error'
+                                                       or resultado.get('error_contenido', False))
+                if terminado:
+                    # Cargado, saltado o con errores de contenido: se espera a que cambie
+                    procesados[nombre] = firma
+                    reintentos.pop(nombre, None)
+                    continue
+                
+                previo = reintentos.get(nombre)
+                intentos = previo[1] + 1 if previo is not None and previo[0] == firma else 1
+                espera = min(espera_maxima_vigilancia, intervalo * 2 ** (intentos - 1))
+                reintentos[nombre] = (firma, intentos, time.time() + espera)
+                logger.warning(f"⚠️  {nombre}: se reintentará en {espera:g} s (intento {intentos + 1})")
+        
+        if ciclos is None or ciclo < ciclos:
+            time.sleep(intervalo)
+
+# =============================================================================
+# VALIDACIÓN SIN BASE DE DATOS
+# =============================================================================
+
+MAX_EJEMPLOS_VALIDACION = 5
+
+def _perfilar_columna(crudo, limpio, nombre):
+    """
+    Calidad de datos de una columna: nulos, fallos de conversión y longitudes
+    
+    Args:
+        crudo: Valores leídos del Excel para las filas que quedan tras la limpieza
+        limpio: La misma columna después de limpiar_y_preparar_datos
+        nombre: Nombre de la columna en SQL
+    """
+    perfil = {'nulos': int(limpio.isna().sum())}
+    
+    if nombre in DATE_COLUMNS or nombre in NUMERIC_COLUMNS:
+        # Había un valor en el Excel y la conversión lo dejó nulo
+        presentes = crudo.notna() & (crudo.astype(str).str.strip() != '')
+        fallidos = presentes & limpio.isna()
+        perfil['fallos_conversion'] = int(fallidos.sum())
+        perfil['ejemplos_fallidos'] = crudo[fallidos].astype(str).unique()[:MAX_EJEMPLOS_VALIDACION].tolist()
+    
+    if nombre in LONGITUDES_MAXIMAS:
+        longitudes = limpio.dropna().astype(str).str.len()
+        limite = LONGITUDES_MAXIMAS[nombre]
+        perfil['longitud_maxima'] = int(longitudes.max()) if len(longitudes) else 0
+        perfil['limite_nvarchar'] = limite
+        perfil['excede_limite'] = int((longitudes > limite).sum())
+    
+    return perfil
+
+def perfilar_archivo(archivo_excel):
+    """
+    Lee y limpia un archivo sin tocar la base de datos y arma su reporte de calidad
+    
+    El reporte indica si falta la hoja FORMATO, los encabezados no mapeados o
+    faltantes, cuántas filas descartaría limpiar_y_preparar_datos (vacías o sin
+    fecha de apertura) y, por columna, nulos, fallos de conversión de fechas y
+    números y textos que superan el largo NVARCHAR de la tabla destino.
+    
+    Returns:
+        Dict con 'archivo', 'estado' ('valido', 'advertencias', 'sin_formato'
+        o 'error') y el detalle del perfil
+    """
+    nombre_archivo = os.path.basename(archivo_excel)
+    inicio = time.perf_counter()
+    
+    try:
+        df_crudo = leer_hoja_formato(archivo_excel)
+    except HojaFormatoNoEncontrada as e:
+        return {'archivo': nombre_archivo, 'estado': 'sin_formato', 'mensaje': str(e)}
+    except Exception as e:
+        return {'archivo': nombre_archivo, 'estado': 'error', 'mensaje': str(e)}
+    
+    try:
+        # Encabezados de la hoja frente al mapeo
+        encabezados = df_crudo.attrs.get('encabezados', list(df_crudo.columns))
+        no_mapeados = [enc for enc in encabezados if enc not in ENCABEZADOS_LEIDOS]
+        presentes = {COLUMN_MAPPING.get(enc, enc) for enc in encabezados if enc in ENCABEZADOS_LEIDOS}
+        faltantes = [nombre for nombre in dict.fromkeys(COLUMN_MAPPING.values()) if nombre not in presentes]
+        
+        # Filas que descartará la limpieza (mismas reglas que limpiar_y_preparar_datos)
+        nulos = df_crudo.isna()
+        filas_vacias = nulos.all(axis=1)
+        col_apertura = next((col for col in df_crudo.columns
+                             if COLUMN_MAPPING.get(col, col) == 'FECHA_HORA_APERTURA'), None)
+        sin_apertura = ~filas_vacias & nulos[col_apertura] if col_apertura is not None else ~filas_vacias & False
+        
+        df = limpiar_y_preparar_datos(df_crudo, nombre_archivo)
+        
+        columnas = {}
+        for col_excel in df_crudo.columns:
+            nombre = COLUMN_MAPPING.get(col_excel, col_excel)
+            if nombre in df.columns and nombre not in columnas:
+                columnas[nombre] = _perfilar_columna(df_crudo.loc[df.index, col_excel], df[nombre], nombre)
+        columnas['ARCHIVO_ORIGEN'] = _perfilar_columna(df['ARCHIVO_ORIGEN'], df['ARCHIVO_ORIGEN'], 'ARCHIVO_ORIGEN')
+    except Exception as e:
+        return {'archivo': nombre_archivo, 'estado': 'error', 'mensaje': str(e)}
+    
+    fallos_conversion = sum(perfil.get('fallos_conversion', 0) for perfil in columnas.values())
+    excesos_longitud = sum(perfil.get('excede_limite', 0) for perfil in columnas.values())
+    con_advertencias = bool(no_mapeados or faltantes or fallos_conversion or excesos_longitud or df.empty)
+    
+    return {
+        'archivo': nombre_archivo,
+        'estado': 'advertencias' if con_advertencias else 'valido',
+        'filas_leidas': len(df_crudo),
+        'filas_validas': len(df),
+        'filas_descartadas': len(df_crudo) - len(df),
+        'filas_vacias': int(filas_vacias.sum()),
+        'filas_sin_apertura': int(sin_apertura.sum()),
+        'encabezados_no_mapeados': no_mapeados,
+        'columnas_faltantes': faltantes,
+        'fallos_conversion': fallos_conversion,
+        'excesos_longitud': excesos_longitud,
+        'columnas': columnas,
+        'segundos': round(time.perf_counter() - inicio, 3),
+    }
+
+def validar_archivos(archivos, workers=1):
+    """
+    Perfila todos los archivos (lectura y limpieza) sin engine de base de datos
+    
+    Con workers > 1 los archivos se reparten en un pool de procesos.
+    
+    Returns:
+        Lista de reportes de perfilar_archivo, en el orden de los archivos
+    """
+    rutas = [str(archivo) for archivo in archivos]
+    if workers <= 1 or len(rutas) <= 1:
+        return [perfilar_archivo(ruta) for ruta in rutas]
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=configurar_logging,
+                             initargs=(False, logging.WARNING)) as executor:
+        return list(executor.map(perfilar_archivo, rutas))
+
+def exportar_reporte_validacion(reportes, ruta):
+    """Guarda el reporte de validación por archivo y por columna en JSON"""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'generado': datetime.now().isoformat(timespec='seconds'), 'archivos': reportes},
+                  f, ensure_ascii=False, indent=2)
+
+# =============================================================================
+# INTERFAZ DE LÍNEA DE COMANDOS
+# =============================================================================
+
+def mostrar_estadisticas_por_archivo(engine):
+    """
+    Muestra las estadísticas por archivo de la base de datos
+    
+    Se leen de Estadisticas_Archivos_Transmision, que el ETL mantiene en cada
+    carga: el costo no depende del historial de Calidad_Transmision. Con
+    ETL_ESTADISTICAS_ARCHIVOS desactivado se agrupa la tabla principal.
+    """
+    logger.info("\n" + "="*60)
+    logger.info("ESTADÍSTICAS POR ARCHIVO EN LA BASE DE DATOS")
+    logger.info("="*60)
+    
+    preparer = engine.dialect.identifier_preparer
+    if usar_estadisticas_archivos:
+        consulta = f"""
+            SELECT ARCHIVO_ORIGEN, TOTAL_REGISTROS, PRIMERA_CARGA, ULTIMA_CARGA,
+                   TOTAL_MINUTOS / 60.0 AS TOTAL_HORAS
+            FROM {preparer.quote(tabla_estadisticas_archivos)}
+            ORDER BY ULTIMA_CARGA DESC
+        """
+    else:
+        consulta = f"""
+            SELECT ARCHIVO_ORIGEN, COUNT(*) AS TOTAL_REGISTROS, MIN(FECHA_INSERCION) AS PRIMERA_CARGA,
+                   MAX(FECHA_INSERCION) AS ULTIMA_CARGA,
+                   SUM(DURACION_INDISPONIBILIDAD_MINUTOS) / 60.0 AS TOTAL_HORAS
+            FROM {preparer.quote(nombre_tabla_sql)}
+            WHERE ARCHIVO_ORIGEN IS NOT NULL
+            GROUP BY ARCHIVO_ORIGEN
+            ORDER BY MAX(FECHA_INSERCION) DESC
+        """
+    
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(sa.text(consulta)).fetchall()
+            
+            if rows:
+                logger.info(f"\n{'Archivo':<40} {'Registros':>10} {'Primera Carga':>20} {'Última Carga':>20} {'Horas':>10}")
+                logger.info("-"*104)
+                for row in rows:
+                    horas = f"{float(row[4]):,.1f}" if row[4] is not None else '-'
+                    logger.info(f"{row[0]:<40} {row[1]:>10} {str(row[2])[:19]:>20} {str(row[3])[:19]:>20} {horas:>10}")
+            else:
+                logger.info("No hay estadísticas disponibles")
+    except Exception as e:
+        logger.warning(f"No se pudieron obtener estadísticas: {e}")
+
+def _cargar_manifiesto_de_cargas(engine):
+    """Manifiesto de cargas previas (None si ETL_USAR_MANIFIESTO está desactivado)"""
+    if not usar_manifiesto:
+        return None
+    manifiesto = cargar_manifiesto(ruta_manifiesto)
+    if not manifiesto:
+        sincronizar_manifiesto_desde_control(engine, manifiesto)
+    logger.info(f"✓ Manifiesto de cargas: {len(manifiesto)} archivo(s) registrados")
+    return manifiesto
+
+def comando_cargar(args):
+    """Carga los archivos de la carpeta a SQL Server (o los vigila con --vigilar)"""
+    global modo_interactivo
+    if args.automatico:
+        modo_interactivo = False
+    
+    logger.info("="*60)
+    logger.info("ETL CALIDAD DE TRANSMISIÓN - INICIO")
     logger.info("="*60)
     logger.info(f"Modo: {'INTERACTIVO' if modo_interactivo else 'AUTOMÁTICO'}")
     
+    engine = obtener_engine()
+    
     try:
+        # Cargar el manifiesto de cargas previas
+        manifiesto = _cargar_manifiesto_de_cargas(engine)
+        
+        if args.vigilar:
+            # Proceso permanente: el engine y la configuración se mantienen entre archivos
+            vigilar_carpeta(
+                args.carpeta,
+                engine=engine,
+                nombre_tabla=nombre_tabla_sql,
+                manifiesto=manifiesto,
+                workers=args.workers
+            )
+            return 0
+        
         # Obtener archivos Excel
-        archivos = obtener_archivos_excel(carpeta_excel)
+        archivos = obtener_archivos_excel(args.carpeta)
         
         if not archivos:
-            logger.error(f"\n✗ No se encontraron archivos Excel en: {carpeta_excel}")
-            exit()
+            logger.error(f"\n✗ No se encontraron archivos Excel en: {args.carpeta}")
+            return 1
         
         logger.info(f"\n✓ Se encontraron {len(archivos)} archivo(s) Excel:")
         for idx, archivo in enumerate(archivos, 1):
             logger.info(f"  {idx}. {archivo.name}")
         
         # Procesar cada archivo
-        resultados = []
-        
-        for archivo in archivos:
-            resultado = procesar_archivo(
-                archivo_excel=str(archivo),
-                engine=engine,
-                nombre_tabla=nombre_tabla_sql
-            )
-            resultados.append(resultado)
+        resultados = procesar_archivos(
+            archivos,
+            engine=engine,
+            nombre_tabla=nombre_tabla_sql,
+            workers=args.workers,
+            manifiesto=manifiesto
+        )
         
         # Resumen final
-        logger.info("\n" + "="*60)
-        logger.info("RESUMEN FINAL")
-        logger.info("="*60)
-        
-        exitosos = 0
-        saltados = 0
-        errores = 0
-        sin_datos = 0
-        total_filas = 0
-        reemplazos = 0
-        
-        for resultado in resultados:
-            if resultado['estado'] == 'éxito':
-                accion = resultado.get('accion', 'append')
-                accion_texto = '(REEMPLAZO)' if accion == 'replace' else '(AGREGADO)'
-                logger.info(f"✓ {resultado['archivo']}: {resultado['filas']} filas cargadas {accion_texto}")
-                exitosos += 1
-                total_filas += resultado['filas']
-                if accion == 'replace':
-                    reemplazos += 1
-            elif resultado['estado'] == 'saltado':
-                logger.info(f"⊘ {resultado['archivo']}: Saltado (ya cargado previamente)")
-                saltados += 1
-            elif resultado['estado'] == 'sin_datos':
-                logger.info(f"⊘ {resultado['archivo']}: Sin datos válidos")
-                sin_datos += 1
-            else:
-                logger.error(f"✗ {resultado['archivo']}: ERROR - {resultado['mensaje']}")
-                errores += 1
-        
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Archivos procesados exitosamente: {exitosos}")
-        logger.info(f"  - Nuevos: {exitosos - reemplazos}")
-        logger.info(f"  - Reemplazados: {reemplazos}")
-        logger.info(f"Archivos saltados (duplicados): {saltados}")
-        logger.info(f"Archivos sin datos: {sin_datos}")
-        logger.info(f"Archivos con errores: {errores}")
-        logger.info(f"Total de filas cargadas: {total_filas}")
-        logger.info(f"{'='*60}")
+        exitosos = mostrar_resumen_final(resultados)
+        exportar_metricas(resultados, archivo_metricas)
         
         # Mostrar estadísticas por archivo
         if exitosos > 0:
-            logger.info("\n" + "="*60)
-            logger.info("ESTADÍSTICAS POR ARCHIVO EN LA BASE DE DATOS")
-            logger.info("="*60)
-            try:
-                with engine.connect() as conn:
-                    result = conn.execute(text("EXEC sp_Estadisticas_Por_Archivo"))
-                    rows = result.fetchall()
-                    
-                    if rows:
-                        logger.info(f"\n{'Archivo':<40} {'Registros':>10} {'Primera Carga':>20}")
-                        logger.info("-"*70)
-                        for row in rows:
-                            logger.info(f"{row[0]:<40} {row[1]:>10} {str(row[2])[:19]:>20}")
-                    else:
-                        logger.info("No hay estadísticas disponibles")
-            except Exception as e:
-                logger.warning(f"No se pudieron obtener estadísticas: {e}")
+            mostrar_estadisticas_por_archivo(engine)
         
         logger.info(f"\n✓ Proceso completado")
         logger.info(f"📄 Log guardado en: {log_file}")
-        
-    except Exception as e:
-        logger.error(f"\n✗ Error general: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        return 0 if all(r['estado'] != 'error' for r in resultados) else 1
+    
+    except KeyboardInterrupt:
+        logger.info("\n✓ Proceso detenido por el usuario")
+        return 0
     
     finally:
         engine.dispose()
         logger.info("\n Conexión cerrada")
+
+def comando_verificar(args):
+    """Muestra el estado de carga de cada archivo de la carpeta, sin cargar nada"""
+    archivos = obtener_archivos_excel(args.carpeta)
+    if not archivos:
+        logger.error(f"✗ No se encontraron archivos Excel en: {args.carpeta}")
+        return 1
+    
+    engine = obtener_engine()
+    try:
+        nombres = [archivo.name for archivo in archivos]
+        estados = verificar_archivos_cargados(engine, nombres, nombre_tabla_sql)
+        if estados is None:
+            estados = {nombre: verificar_archivo_ya_cargado(engine, nombre) for nombre in nombres}
+        manifiesto = _cargar_manifiesto_de_cargas(engine)
+    finally:
+        engine.dispose()
+    
+    logger.info(f"\n{'Archivo':<40} {'Registros':>10} {'Manifiesto':>12}")
+    logger.info("-"*64)
+    for archivo in archivos:
+        estado = estados[archivo.name]
+        registros = estado['total_registros'] if estado['existe'] else 0
+        en_manifiesto = consultar_manifiesto(manifiesto, archivo)['estado'] if manifiesto is not None else '-'
+        logger.info(f"{archivo.name:<40} {registros:>10} {en_manifiesto:>12}")
+    
+    return 0
+
+def comando_estadisticas(args):
+    """Muestra las estadísticas por archivo de la base de datos"""
+    engine = obtener_engine()
+    try:
+        mostrar_estadisticas_por_archivo(engine)
+    finally:
+        engine.dispose()
+    return 0
+
+def comando_validar(args):
+    """
+    Valida los archivos de la carpeta sin conectarse a SQL Server
+    
+    Lee y limpia todos los archivos en paralelo, muestra un resumen por archivo
+    y guarda el reporte detallado por columna en JSON.
+    
+    Returns:
+        0 si todos los archivos se pueden cargar, 1 si alguno no tiene hoja
+        FORMATO o no se pudo leer
+    """
+    archivos = obtener_archivos_excel(args.carpeta)
+    if not archivos:
+        logger.error(f"✗ No se encontraron archivos Excel en: {args.carpeta}")
+        return 1
+    
+    workers = max(1, min(args.workers, len(archivos)))
+    inicio = time.perf_counter()
+    
+    # El detalle de limpieza de cada archivo no aporta al reporte
+    nivel_anterior = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        reportes = validar_archivos(archivos, workers)
+    finally:
+        logger.setLevel(nivel_anterior)
+    
+    logger.info(f"\n{'Archivo':<40} {'Estado':>13} {'Leídas':>8} {'Válidas':>8} {'Descart.':>8} "
+                f"{'Conv.':>6} {'Largo':>6}")
+    logger.info("-"*95)
+    for reporte in reportes:
+        if reporte['estado'] in ('sin_formato', 'error'):
+            logger.info(f"{reporte['archivo']:<40} {reporte['estado']:>13}")
+            logger.error(f"  ✗ {reporte['mensaje']}")
+            continue
+        logger.info(f"{reporte['archivo']:<40} {reporte['estado']:>13} {reporte['filas_leidas']:>8} "
+                    f"{reporte['filas_validas']:>8} {reporte['filas_descartadas']:>8} "
+                    f"{reporte['fallos_conversion']:>6} {reporte['excesos_longitud']:>6}")
+        if reporte['encabezados_no_mapeados']:
+            logger.warning(f"  ⚠ Encabezados no mapeados: {', '.join(reporte['encabezados_no_mapeados'])}")
+        if reporte['columnas_faltantes']:
+            logger.warning(f"  ⚠ Columnas faltantes: {', '.join(reporte['columnas_faltantes'])}")
+        for nombre, perfil in reporte['columnas'].items():
+            if perfil.get('fallos_conversion'):
+                logger.warning(f"  ⚠ {nombre}: {perfil['fallos_conversion']} valor(es) no convertibles "
+                               f"(ej. {', '.join(perfil['ejemplos_fallidos'])})")
+            if perfil.get('excede_limite'):
+                logger.warning(f"  ⚠ {nombre}: {perfil['excede_limite']} valor(es) superan "
+                               f"NVARCHAR({perfil['limite_nvarchar']}) (máx. {perfil['longitud_maxima']})")
+    
+    ruta_reporte = args.salida or log_dir / f"etl_transmision_{timestamp}_validacion.json"
+    exportar_reporte_validacion(reportes, ruta_reporte)
+    
+    con_error = sum(1 for r in reportes if r['estado'] in ('sin_formato', 'error'))
+    con_advertencias = sum(1 for r in reportes if r['estado'] == 'advertencias')
+    logger.info(f"\n✓ {len(reportes)} archivo(s) validados en {time.perf_counter() - inicio:.2f} s "
+                f"con {workers} proceso(s): {con_error} con error, {con_advertencias} con advertencias")
+    logger.info(f"✓ Reporte de validación: {ruta_reporte}")
+    
+    return 1 if con_error else 0
+
+def comando_listar(args):
+    """Lista los archivos Excel de la carpeta"""
+    archivos = obtener_archivos_excel(args.carpeta)
+    for archivo in archivos:
+        print(archivo.name)
+    return 0
+
+def crear_parser():
+    """Parser de argumentos con los subcomandos del ETL"""
+    parser = argparse.ArgumentParser(
+        prog='etl_calidad_transmision',
+        description="ETL de Calidad de Transmisión: hoja FORMATO de los Excel → SQL Server. "
+                    "Sin subcomando equivale a 'cargar'."
+    )
+    subparsers = parser.add_subparsers(dest='comando', metavar='COMANDO')
+    
+    carpeta = argparse.ArgumentParser(add_help=False)
+    carpeta.add_argument('--carpeta', default=carpeta_excel,
+                         help="Carpeta con los archivos Excel (por defecto EXCEL_FOLDER_TRANSMISION)")
+    
+    cargar = subparsers.add_parser('cargar', aliases=['load'], parents=[carpeta],
+                                   help="Cargar los archivos a SQL Server")
+    cargar.add_argument('--workers', type=int, default=workers_etl,
+                        help="Procesos de lectura en paralelo (por defecto ETL_WORKERS)")
+    cargar.add_argument('--vigilar', action='store_true', default=modo_vigilancia,
+                        help="Quedar vigilando la carpeta (por defecto ETL_MODO_VIGILANCIA)")
+    cargar.add_argument('--automatico', action='store_true',
+                        help="No preguntar por archivos ya cargados (ETL_MODO_INTERACTIVO=false)")
+    cargar.set_defaults(funcion=comando_cargar, con_archivo_log=True)
+    
+    verificar = subparsers.add_parser('verificar', aliases=['check'], parents=[carpeta],
+                                      help="Ver qué archivos ya están cargados, sin cargar")
+    verificar.set_defaults(funcion=comando_verificar)
+    
+    estadisticas = subparsers.add_parser('estadisticas', aliases=['stats'],
+                                         help="Estadísticas por archivo en la base de datos")
+    estadisticas.set_defaults(funcion=comando_estadisticas)
+    
+    validar = subparsers.add_parser('validar', aliases=['validate'], parents=[carpeta],
+                                    help="Leer y limpiar los archivos sin conectarse a SQL Server")
+    validar.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                         help="Procesos en paralelo (por defecto, uno por CPU)")
+    validar.add_argument('--salida', type=Path,
+                         help="Ruta del reporte JSON (por defecto en la carpeta de logs)")
+    validar.set_defaults(funcion=comando_validar)
+    
+    listar = subparsers.add_parser('listar', aliases=['list'], parents=[carpeta],
+                                   help="Listar los archivos Excel de la carpeta")
+    listar.set_defaults(funcion=comando_listar)
+    
+    return parser
+
+def main(argv=None):
+    """
+    Punto de entrada de la línea de comandos
+    
+    Returns:
+        Código de salida (0 = éxito)
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    
+    # Compatibilidad: sin subcomando, 'python etl_calidad_transmision.py' carga como antes
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'cargar')
+    
+    args = crear_parser().parse_args(argv)
+    
+    configurar_logging(con_archivo=getattr(args, 'con_archivo_log', False))
+    
+    try:
+        validar_configuracion()
+        return args.funcion(args)
+    except Exception as e:
+        logger.error(f"\n✗ Error general: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return 1
+
+# =============================================================================
+# EJECUTAR EL PROCESO
+# =============================================================================
+
+if __name__ == "__main__":
+    sys.exit(main())
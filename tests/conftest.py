@@ -0,0 +1,45 @@
+"""
+Configuración común de las pruebas del ETL de Calidad de Transmisión
+
+Permite importar etl_calidad_transmision y benchmark_etl_transmision desde
+la raíz del repositorio sin instalarlos.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+import etl_calidad_transmision as etl  # noqa: E402
+
+TABLA = 'Calidad_Transmision'
+
+@pytest.fixture
+def etl_sqlite(monkeypatch):
+    """
+    ETL sin SQL Server: base SQLite en memoria y acción elegida por la prueba
+    
+    Devuelve el engine y cargar(ruta, accion), que procesa el archivo como si
+    ya estuviera cargado y el usuario hubiera elegido accion.
+    """
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    acciones = []
+    monkeypatch.setattr(etl, 'usar_cache', False)
+    monkeypatch.setattr(etl, 'modo_interactivo', True)
+    monkeypatch.setattr(etl, 'verificar_archivo_ya_cargado', lambda engine, nombre: {
+        'existe': True, 'total_registros': 1, 'primera_carga': None, 'ultima_carga': None,
+        'ultima_actualizacion': None, 'evento_mas_antiguo': None, 'evento_mas_reciente': None
+    })
+    monkeypatch.setattr(etl, 'solicitar_accion_usuario', lambda *args: acciones[-1])
+    
+    def cargar(ruta, accion):
+        acciones.append(accion)
+        resultado = etl.procesar_archivo(str(ruta), engine, TABLA)
+        assert resultado['estado'] == 'éxito', resultado.get('mensaje')
+        return resultado
+    
+    return engine, cargar
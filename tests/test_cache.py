@@ -0,0 +1,51 @@
+"""
+Caché Parquet de los DataFrames limpios
+"""
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+from benchmark_etl_transmision import generar_libro_formato
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(etl, 'usar_cache', True)
+    monkeypatch.setattr(etl, 'carpeta_cache', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+def test_libro_con_tipos_mezclados_vuelve_igual_de_la_cache(tmp_path, cache):
+    # CODIGO_INTERRUPTOR mezcla códigos numéricos (1234) y de texto ('B-100')
+    ruta = generar_libro_formato(tmp_path / 'FORMATO_300.xlsx', 300, semilla=3)
+    hash_archivo = etl.calcular_hash_archivo(ruta)
+    
+    leido = etl.preparar_archivo(str(ruta), hash_archivo)
+    assert leido['estado'] == 'preparado' and not leido['desde_cache']
+    assert etl.ruta_cache(hash_archivo).exists()
+    
+    cacheado = etl.preparar_archivo(str(ruta), hash_archivo)
+    assert cacheado['desde_cache']
+    
+    original, desde_cache = leido['df'], cacheado['df']
+    assert list(desde_cache.columns) == list(original.columns)
+    assert list(desde_cache.index) == list(original.index)
+    for col in original.columns:
+        esperado = [None if pd.isna(v) else (str(v) if col == 'CODIGO_INTERRUPTOR' else v) for v in original[col]]
+        assert [None if pd.isna(v) else v for v in desde_cache[col]] == esperado, col
+    # Las huellas se calculan antes de guardar: la clave de los eventos no cambia
+    assert desde_cache['CLAVE_EVENTO'].equals(original['CLAVE_EVENTO'])
+    assert etl.clave_natural_eventos(desde_cache).equals(etl.clave_natural_eventos(original))
+
+def test_hash_ya_calculado_no_se_recalcula(tmp_path, cache, monkeypatch):
+    ruta = generar_libro_formato(tmp_path / 'FORMATO_50.xlsx', 50, semilla=1)
+    hash_archivo = etl.calcular_hash_archivo(ruta)
+    
+    def sin_hash(*args, **kwargs):
+        raise AssertionError("el archivo se volvió a leer para calcular su hash")
+    
+    monkeypatch.setattr(etl, 'calcular_hash_archivo', sin_hash)
+    
+    assert not etl.archivo_en_cache(str(ruta), hash_archivo)
+    assert etl.preparar_archivo(str(ruta), hash_archivo)['estado'] == 'preparado'
+    assert etl.archivo_en_cache(str(ruta), hash_archivo)
@@ -0,0 +1,67 @@
+"""
+Estrategias de carga (cargar_dataframe) contra SQLite
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+TAMANO = 4
+
+@pytest.fixture(autouse=True)
+def carpeta_bulk(tmp_path, monkeypatch):
+    monkeypatch.setattr(etl, 'carpeta_bulk', str(tmp_path / 'bulk'))
+
+def _eventos(filas):
+    """DataFrame limpio con nulos en cada tipo de columna, decimales y textos difíciles para CSV"""
+    textos = ['SE NORTE', 'O\'HIGGINS, "SUR"', 'LÍNEA\nDOBLE', None, 'Ñuble']
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 1 + n % 28, n % 24, n % 60, 59) for n in range(filas)],
+        'FECHA_HORA_CIERRE': [None if n % 3 == 0 else datetime(2024, 2, 1 + n % 28, 8, 30) for n in range(filas)],
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': [None if n % 4 == 1 else n + 0.25 for n in range(filas)],
+        'CARGA_MEGAS': [None if n % 5 == 2 else round(n * 1.1, 2) for n in range(filas)],
+        'CODIGO_ELEMENTO_AFECTADO': [f'L{n}' for n in range(filas)],
+        'SUBESTACION': [textos[n % len(textos)] for n in range(filas)],
+        'CODIGO_INTERRUPTOR': [1000 + n if n % 2 else f'B-{n}' for n in range(filas)],
+    })
+    return etl.agregar_huellas_filas(etl.limpiar_y_preparar_datos(df, 'ENERO.xlsx', detallado=False))
+
+def _cargar(df, metodo):
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    carga = etl.cargar_dataframe(df, engine, TABLA, metodo=metodo, tamano=TAMANO)
+    with engine.connect() as conn:
+        cargado = pd.read_sql(
+            f"SELECT {', '.join(df.columns)} FROM {TABLA} ORDER BY ID", conn,
+            parse_dates=['FECHA_HORA_APERTURA', 'FECHA_HORA_CIERRE']
+        )
+    return carga, cargado
+
+@pytest.mark.parametrize('metodo', etl.METODOS_CARGA)
+@pytest.mark.parametrize('filas', [TAMANO * 3 - 1, TAMANO * 3, TAMANO * 3 + 1])
+def test_metodos_cargan_las_mismas_filas(metodo, filas):
+    df = _eventos(filas)
+    
+    carga, cargado = _cargar(df, metodo)
+    
+    # Mismos valores que el DataFrame: nulos, fechas al segundo y decimales
+    for col in df.columns:
+        esperado = [None if pd.isna(v) else v for v in df[col]]
+        obtenido = [None if pd.isna(v) else v for v in cargado[col]]
+        if col == 'CODIGO_INTERRUPTOR':
+            esperado = [None if v is None else str(v) for v in esperado]
+        assert obtenido == esperado, col
+    # Y lo mismo que el cargador original
+    pd.testing.assert_frame_equal(cargado, _cargar(df, 'to_sql')[1])
+    
+    assert carga['metodo'] == metodo
+    assert carga['filas'] == filas
+    assert carga['lotes'] == -(-filas // TAMANO)
+    assert carga['filas_por_segundo'] == pytest.approx(filas / carga['segundos'])
+
+@pytest.mark.parametrize('metodo', etl.METODOS_CARGA)
+def test_dataframe_vacio_no_carga_nada(metodo):
+    carga, cargado = _cargar(_eventos(0), metodo)
+    assert (carga['filas'], carga['lotes'], len(cargado)) == (0, 0, 0)
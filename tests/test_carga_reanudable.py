@@ -0,0 +1,113 @@
+"""
+Carga reanudable: reintentos ante errores transitorios y checkpoint por lote
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+
+class ErrorOdbc(Exception):
+    """Error con la forma de pyodbc: SQLSTATE en args[0] y código nativo en el mensaje"""
+
+def _error_bd(estado, mensaje):
+    return sa.exc.OperationalError('INSERT ...', {}, ErrorOdbc(estado, mensaje))
+
+@pytest.fixture
+def esperas(monkeypatch):
+    """Esperas entre intentos, sin dormir"""
+    registro = []
+    monkeypatch.setattr(etl.time, 'sleep', registro.append)
+    monkeypatch.setattr(etl, 'reintentos_bd', 4)
+    monkeypatch.setattr(etl, 'espera_reintento', 1.0)
+    monkeypatch.setattr(etl, 'espera_maxima_reintento', 3.0)
+    return registro
+
+def _falla(veces, error):
+    """Función que lanza error las primeras `veces` llamadas y después devuelve 'ok'"""
+    llamadas = []
+    
+    def funcion():
+        llamadas.append(1)
+        if len(llamadas) <= veces:
+            raise error
+        return 'ok'
+    
+    return funcion, llamadas
+
+@pytest.mark.parametrize('error', [
+    _error_bd('08S01', '[08S01] [Microsoft][ODBC Driver 18 for SQL Server]Communication link failure'),
+    _error_bd('HY000', 'Transaction (Process ID 61) was deadlocked on lock resources and has been '
+                       'chosen as the deadlock victim. Rerun the transaction. (1205)'),
+])
+def test_error_transitorio_se_reintenta_con_espera_acotada(esperas, error):
+    funcion, llamadas = _falla(3, error)
+    
+    assert etl.con_reintentos(funcion, 'la prueba') == 'ok'
+    
+    assert len(llamadas) == 4
+    # 1 * 2^intento con tope 3 s; cada espera entre la mitad y el total del tope
+    for espera, tope in zip(esperas, [1.0, 2.0, 3.0]):
+        assert tope / 2 <= espera <= tope
+
+def test_error_no_transitorio_no_se_reintenta(esperas):
+    funcion, llamadas = _falla(1, _error_bd('42S02', "[42S02] Invalid object name 'Calidad_Transmision'. (208)"))
+    
+    with pytest.raises(sa.exc.OperationalError):
+        etl.con_reintentos(funcion, 'la prueba')
+    assert len(llamadas) == 1
+    assert esperas == []
+
+def test_carga_interrumpida_sigue_desde_el_lote_siguiente(monkeypatch, esperas):
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    monkeypatch.setattr(etl, 'tamano_lote', 10)
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 1) + timedelta(hours=n) for n in range(35)],
+        'CODIGO_ELEMENTO_AFECTADO': [f'L{n}' for n in range(35)],
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': [n + 0.25 for n in range(35)],
+    })
+    df = etl.agregar_huellas_filas(etl.limpiar_y_preparar_datos(df, 'ENERO.xlsx', detallado=False))
+    huella = etl.huella_carga('0' * 64, 'ENERO.xlsx', TABLA, 'replace', 'lotes:10', False, '')
+    
+    lotes = []
+    confirmar_lote = etl.confirmar_lote
+    
+    def confirmar_registrando(engine, df, checkpoint, numero_lote):
+        lotes.append(numero_lote)
+        return confirmar_lote(engine, df, checkpoint, numero_lote)
+    
+    monkeypatch.setattr(etl, 'confirmar_lote', confirmar_registrando)
+    
+    # Primera corrida: el lote 3 falla con un error que no se reintenta
+    cargar_dataframe = etl.cargar_dataframe
+    
+    def cargar_hasta_el_lote_2(df, destino, tabla, **kwargs):
+        if len(lotes) == 3:
+            raise _error_bd('42000', 'The transaction log for database is full. (9002)')
+        return cargar_dataframe(df, destino, tabla, **kwargs)
+    
+    monkeypatch.setattr(etl, 'cargar_dataframe', cargar_hasta_el_lote_2)
+    with pytest.raises(sa.exc.OperationalError):
+        etl.cargar_con_staging(engine, df, TABLA, 'ENERO.xlsx', huella=huella)
+    
+    with engine.connect() as conn:
+        checkpoint = etl.leer_checkpoint(conn, 'ENERO.xlsx')
+        assert (checkpoint['lote'], checkpoint['filas']) == (2, 20)
+        assert conn.execute(sa.text(f"SELECT COUNT(*) FROM {checkpoint['staging']}")).scalar() == 20
+        assert conn.execute(sa.text(f"SELECT COUNT(*) FROM {TABLA}")).scalar() == 0
+    
+    # Segunda corrida: solo los lotes 3 y 4
+    lotes.clear()
+    monkeypatch.setattr(etl, 'cargar_dataframe', cargar_dataframe)
+    etl.cargar_con_staging(engine, df, TABLA, 'ENERO.xlsx', huella=huella)
+    
+    assert lotes == [3, 4]
+    with engine.connect() as conn:
+        cargadas = pd.read_sql(f"SELECT CLAVE_EVENTO FROM {TABLA}", conn)
+        assert etl.leer_checkpoint(conn, 'ENERO.xlsx') is None
+    assert sorted(cargadas['CLAVE_EVENTO']) == sorted(df['CLAVE_EVENTO'])
+    assert not sa.inspect(engine).has_table(checkpoint['staging'])
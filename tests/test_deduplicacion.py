@@ -0,0 +1,62 @@
+"""
+Deduplicación de eventos entre archivos con la clave natural
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+
+def _libro(ruta, filas):
+    pd.DataFrame(filas).to_excel(ruta, sheet_name='FORMATO', index=False)
+    return ruta
+
+@pytest.fixture
+def libros(tmp_path):
+    """Mismos eventos; en el segundo libro una fila sin interruptor convierte la columna a float64"""
+    eventos = {
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, dia, 8) for dia in (1, 2, 3)],
+        'CODIGO_ELEMENTO_AFECTADO': ['L101', 'L102', 'L103'],
+        'CODIGO_INTERRUPTOR': [1234, 5678, 9012],
+        'SUBESTACION': ['SE NORTE', 'SE SUR', 'SE NORTE'],
+    }
+    enteros = _libro(tmp_path / 'ENERO.xlsx', eventos)
+    con_vacio = _libro(tmp_path / 'ENERO_CORREGIDO.xlsx', {
+        'FECHA_HORA_APERTURA': eventos['FECHA_HORA_APERTURA'] + [datetime(2024, 1, 4, 8)],
+        'CODIGO_ELEMENTO_AFECTADO': eventos['CODIGO_ELEMENTO_AFECTADO'] + ['L104'],
+        'CODIGO_INTERRUPTOR': eventos['CODIGO_INTERRUPTOR'] + [None],
+        'SUBESTACION': eventos['SUBESTACION'] + ['SE SUR'],
+    })
+    return enteros, con_vacio
+
+def test_clave_natural_no_depende_del_tipo_leido(libros):
+    enteros, con_vacio = (etl.limpiar_y_preparar_datos(etl.leer_hoja_formato(ruta), ruta.name, detallado=False)
+                          for ruta in libros)
+    assert con_vacio['CODIGO_INTERRUPTOR'].dtype == 'float64'
+    
+    claves = etl.clave_natural_eventos(enteros)
+    assert etl.clave_natural_eventos(con_vacio).iloc[:3].tolist() == claves.tolist()
+    # Texto, espacios sobrantes y el valor leído de la BD dan la misma clave
+    como_texto = enteros.assign(CODIGO_INTERRUPTOR=[' 1234 ', '5678.0', '9012'])
+    assert etl.clave_natural_eventos(como_texto).tolist() == claves.tolist()
+
+@pytest.mark.parametrize('indice_desde_bd', [False, True])
+def test_eventos_de_otro_libro_no_se_duplican(libros, monkeypatch, indice_desde_bd):
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    monkeypatch.setattr(etl, 'usar_deduplicacion', True)
+    monkeypatch.setattr(etl, 'usar_cache', False)
+    monkeypatch.setattr(etl, '_indice_eventos', None)
+    
+    enteros, con_vacio = libros
+    assert etl.procesar_archivo(str(enteros), engine, TABLA)['filas'] == 3
+    if indice_desde_bd:
+        monkeypatch.setattr(etl, '_indice_eventos', None)
+    resultado = etl.procesar_archivo(str(con_vacio), engine, TABLA)
+    
+    assert resultado['estado'] == 'éxito'
+    assert resultado['filas'] == 1
+    with engine.connect() as conn:
+        assert pd.read_sql(f"SELECT COUNT(*) AS n FROM {TABLA}", conn)['n'][0] == 4
@@ -0,0 +1,48 @@
+"""
+Esquema estrella: miembros de las dimensiones y su caché en proceso
+"""
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(etl, '_miembros_dimensiones', {})
+    return etl.crear_engine_sqlite(nombre_tabla=TABLA)
+
+def _resolver(engine, subestaciones):
+    df = pd.DataFrame({'SUBESTACION': subestaciones})
+    etl.resolver_dimensiones(engine, df)
+    return df['ID_SUBESTACION'].tolist()
+
+def _miembros(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(sa.text("SELECT VALOR, ID_SUBESTACION FROM Dim_Subestacion")).fetchall())
+
+def test_valor_agregado_por_otro_proceso_no_se_duplica(engine):
+    _resolver(engine, ['SE NORTE'])
+    # Otro proceso agrega SE SUR después de que esta corrida leyó la dimensión
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO Dim_Subestacion (VALOR) VALUES ('SE CENTRO'), ('SE SUR')"))
+    
+    claves = _resolver(engine, ['SE SUR', 'SE NORTE', 'SE ESTE', None])
+    
+    miembros = _miembros(engine)
+    assert claves == [miembros['SE SUR'], miembros['SE NORTE'], miembros['SE ESTE'], pd.NA]
+    assert len(miembros) == 4
+    assert etl._miembros_dimensiones['SUBESTACION'].items() <= miembros.items()
+
+def test_cada_corrida_vuelve_a_leer_las_dimensiones(engine):
+    _resolver(engine, ['SE NORTE'])
+    # La dimensión cambia fuera de esta corrida: SE NORTE tiene otra clave
+    with engine.begin() as conn:
+        conn.execute(sa.text("DELETE FROM Dim_Subestacion"))
+        conn.execute(sa.text("INSERT INTO Dim_Subestacion (ID_SUBESTACION, VALOR) VALUES (40, 'SE NORTE')"))
+    
+    etl.procesar_archivos([], engine, TABLA)
+    
+    assert _resolver(engine, ['SE NORTE']) == [40]
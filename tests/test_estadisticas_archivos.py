@@ -0,0 +1,88 @@
+"""
+Estadísticas por archivo: la tabla que mantiene el ETL coincide con Calidad_Transmision
+"""
+import logging
+import re
+import shutil
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+
+# Mismas columnas que Estadisticas_Archivos_Transmision, calculadas desde los eventos
+CONSULTA_EVENTOS = f"""
+    SELECT ARCHIVO_ORIGEN, COUNT(*) AS TOTAL_REGISTROS,
+           COUNT(FECHA_ACTUALIZACION) AS REGISTROS_ACTUALIZADOS,
+           MIN(FECHA_HORA_APERTURA) AS EVENTO_MAS_ANTIGUO, MAX(FECHA_HORA_APERTURA) AS EVENTO_MAS_RECIENTE,
+           ROUND(SUM(DURACION_INDISPONIBILIDAD_MINUTOS), 2) AS TOTAL_MINUTOS
+    FROM {TABLA}
+    WHERE ARCHIVO_ORIGEN IS NOT NULL
+    GROUP BY ARCHIVO_ORIGEN
+"""
+CONSULTA_ESTADISTICAS = f"""
+    SELECT ARCHIVO_ORIGEN, TOTAL_REGISTROS, REGISTROS_ACTUALIZADOS, EVENTO_MAS_ANTIGUO, EVENTO_MAS_RECIENTE,
+           ROUND(TOTAL_MINUTOS, 2) AS TOTAL_MINUTOS
+    FROM {etl.tabla_estadisticas_archivos}
+"""
+
+def _libro(ruta, eventos):
+    """Libro con la hoja FORMATO; eventos: lista de (día, elemento, minutos)"""
+    pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 1) + timedelta(days=dia) for dia, _, _ in eventos],
+        'CODIGO_ELEMENTO_AFECTADO': [elemento for _, elemento, _ in eventos],
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': [minutos for _, _, minutos in eventos],
+    }).to_excel(ruta, sheet_name='FORMATO', index=False)
+    return ruta
+
+def assert_estadisticas_consistentes(engine):
+    with engine.connect() as conn:
+        esperado = pd.read_sql(CONSULTA_EVENTOS, conn, parse_dates=['EVENTO_MAS_ANTIGUO', 'EVENTO_MAS_RECIENTE'])
+        estadisticas = pd.read_sql(CONSULTA_ESTADISTICAS, conn,
+                                   parse_dates=['EVENTO_MAS_ANTIGUO', 'EVENTO_MAS_RECIENTE'])
+    
+    pd.testing.assert_frame_equal(estadisticas.sort_values('ARCHIVO_ORIGEN').reset_index(drop=True),
+                                  esperado.sort_values('ARCHIVO_ORIGEN').reset_index(drop=True), check_dtype=False)
+
+def _reporte(engine, caplog):
+    """Filas (archivo, registros, horas) que muestra mostrar_estadisticas_por_archivo"""
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger=etl.logger.name):
+        etl.mostrar_estadisticas_por_archivo(engine)
+    filas = [re.match(r'(\S+)\s+(\d+)\s.*\s(\S+)$', registro.getMessage()) for registro in caplog.records]
+    return sorted(fila.groups() for fila in filas if fila and fila.group(1).endswith('.xlsx'))
+
+@pytest.mark.parametrize('pipeline', [False, True])
+def test_estadisticas_siguen_a_la_tabla_principal(tmp_path, etl_sqlite, monkeypatch, caplog, pipeline):
+    monkeypatch.setattr(etl, 'usar_pipeline', pipeline)
+    monkeypatch.setattr(etl, 'tamano_bloque_lectura', 2)
+    engine, cargar = etl_sqlite
+    enero = tmp_path / 'ENERO.xlsx'
+    febrero = _libro(tmp_path / 'FEBRERO.xlsx', [(40, 'L9', 15.5), (41, 'L9', None)])
+    
+    _libro(enero, [(0, 'L1', 10.25), (1, 'L2', 20.0), (2, 'L3', None), (3, 'L4', 5.0)])
+    cargar(enero, 'append')
+    cargar(febrero, 'append')
+    cargar(febrero, 'append')
+    assert_estadisticas_consistentes(engine)
+    
+    # Actualización incremental: L2 cambia, L3 desaparece y L5 es nuevo
+    _libro(enero, [(0, 'L1', 10.25), (1, 'L2', 90.0), (3, 'L4', 5.0), (9, 'L5', 1.0)])
+    resultado = cargar(enero, 'upsert')
+    assert resultado['actualizadas'] == 1
+    assert_estadisticas_consistentes(engine)
+    
+    # Reemplazo: todas las filas quedan marcadas como actualizadas
+    _libro(enero, [(5, 'L1', 3.0), (6, 'L7', 4.0)])
+    cargar(enero, 'replace')
+    assert_estadisticas_consistentes(engine)
+    
+    # El reporte final lee la tabla de estadísticas y coincide con agrupar la tabla principal
+    desde_estadisticas = _reporte(engine, caplog)
+    monkeypatch.setattr(etl, 'usar_estadisticas_archivos', False)
+    monkeypatch.setattr(etl, 'nombre_tabla_sql', TABLA)
+    assert desde_estadisticas == _reporte(engine, caplog)
+    assert desde_estadisticas == [('ENERO.xlsx', '2', '0.1'), ('FEBRERO.xlsx', '4', '0.5')]
@@ -0,0 +1,36 @@
+"""
+Importar el ETL no carga pandas, SQLAlchemy, pyodbc ni openpyxl
+
+Se mide en un intérprete nuevo: en el de pytest esos módulos ya están cargados.
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+MODULOS_PESADOS = ['pandas', 'numpy', 'sqlalchemy', 'pyodbc', 'openpyxl']
+PRESUPUESTO_SEGUNDOS = 0.5
+
+SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+import etl_calidad_transmision
+segundos = time.perf_counter() - inicio
+print(json.dumps({'segundos': segundos, 'cargados': [m for m in sys.argv[1:] if m in sys.modules]}))
+"""
+
+def _importar():
+    salida = subprocess.run(
+        [sys.executable, '-c', SCRIPT, *MODULOS_PESADOS],
+        capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parent.parent
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+def test_importar_no_carga_modulos_pesados():
+    assert _importar()['cargados'] == []
+
+def test_importar_dentro_del_presupuesto():
+    segundos = statistics.median(_importar()['segundos'] for _ in range(3))
+    assert segundos < PRESUPUESTO_SEGUNDOS, f"importar el ETL tarda {segundos:.3f} s"
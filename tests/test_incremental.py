@@ -0,0 +1,60 @@
+"""
+Comparación de huellas del modo incremental contra las filas ya cargadas
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+
+@pytest.fixture
+def df_huellas():
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, dia, 8) for dia in range(1, 6)],
+        'CODIGO_ELEMENTO_AFECTADO': [f'L{n}' for n in range(100, 105)],
+        'CODIGO_INTERRUPTOR': [1001, 'B-2', 1003, 'B-4', 1005],
+        'SUBESTACION': ['SE NORTE', 'SE SUR', 'SE NORTE', 'SE CENTRO', 'SE SUR'],
+    })
+    df = etl.limpiar_y_preparar_datos(df, 'ENERO.xlsx', detallado=False)
+    return etl.agregar_huellas_filas(df)
+
+def test_huellas_nulas_no_redondean_las_demas(df_huellas):
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    etl.cargar_dataframe(df_huellas, engine, TABLA, metodo='to_sql')
+    
+    with engine.begin() as conn:
+        # Una fila cargada antes del modo incremental (sin huellas) y otra sin HASH_CONTENIDO
+        conn.exec_driver_sql(
+            f"INSERT INTO {TABLA} (FECHA_HORA_APERTURA, ARCHIVO_ORIGEN) VALUES ('2023-12-31 00:00:00', 'ENERO.xlsx')"
+        )
+        conn.exec_driver_sql(
+            f"UPDATE {TABLA} SET HASH_CONTENIDO = NULL WHERE CLAVE_EVENTO = {int(df_huellas['CLAVE_EVENTO'].iloc[0])}"
+        )
+        # Difiere solo en el último bit: en float64 sería igual al hash del archivo
+        conn.exec_driver_sql(
+            f"UPDATE {TABLA} SET HASH_CONTENIDO = HASH_CONTENIDO + 1 "
+            f"WHERE CLAVE_EVENTO = {int(df_huellas['CLAVE_EVENTO'].iloc[1])}"
+        )
+    
+    cambios = etl.comparar_con_existentes(engine, df_huellas, TABLA, 'ENERO.xlsx')
+    
+    assert len(cambios['nuevas']) == 0
+    assert list(cambios['cambiadas']['CLAVE_EVENTO']) == list(df_huellas['CLAVE_EVENTO'].iloc[:2])
+    assert cambios['sin_cambios'] == len(df_huellas) - 2
+    assert len(cambios['ids_eliminar']) == 1
+
+def test_huellas_dependen_solo_de_los_datos():
+    # Valores fijos: si cambian, las huellas guardadas en la BD dejan de coincidir
+    import hashlib
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 5, 10, 30)],
+        'CODIGO_ELEMENTO_AFECTADO': ['L101'],
+        'CODIGO_INTERRUPTOR': [1234.0],
+    })
+    texto = 'L101\x1f2024-01-05 10:30:00\x1f1234'
+    esperado = int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+    
+    assert etl.clave_natural_eventos(df).tolist() == [esperado]
@@ -0,0 +1,94 @@
+"""
+Equivalencia de limpiar_y_preparar_datos con la versión original
+
+La versión vectorizada debe producir los mismos datos que la versión celda
+por celda (benchmark_etl_transmision.limpiar_y_preparar_datos_original):
+mismas filas, mismas columnas y mismos valores, con cualquier representación
+de nulo (None, NaN, NaT) considerada igual.
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+from benchmark_etl_transmision import generar_libro_formato, limpiar_y_preparar_datos_original
+
+def _valores(serie):
+    """Valores de una columna con todos los nulos como None"""
+    return [None if pd.isna(valor) else valor for valor in serie.tolist()]
+
+def assert_equivalentes(nuevo, original):
+    assert list(nuevo.columns) == list(original.columns)
+    assert list(nuevo.index) == list(original.index)
+    for col in original.columns:
+        assert _valores(nuevo[col]) == _valores(original[col]), col
+
+def _limpiar_ambas(df):
+    nuevo = etl.limpiar_y_preparar_datos(df.copy(), 'PRUEBA.xlsx')
+    original = limpiar_y_preparar_datos_original(df.copy(), 'PRUEBA.xlsx')
+    return nuevo, original
+
+@pytest.fixture
+def df_irregular():
+    """Hoja FORMATO con tipos mezclados, vacíos, fechas inválidas y encabezados no mapeados"""
+    return pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 5, 10, 30), 'sin fecha', None, '2024-02-01 08:00',
+                                datetime(2024, 3, 1), None, '31/02/2024'],
+        'FECHA_HORA_CIERRE': [datetime(2024, 1, 5, 11), None, None, 'N/D', datetime(2024, 3, 1, 2), None, None],
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': [30, 'N/D', None, '  ', 120.5, None, '15'],
+        'CARGA_MEGAS': [1.5, None, None, 2, '', None, 'x'],
+        'CODIGO_INTERRUPTOR': [1234, 'B-100', None, ' 52-1 ', 7, None, ''],
+        'SUBESTACION': ['  SE NORTE ', 'SE SUR', None, '', 'SE SUR', None, '   '],
+        'PROTECCION _OPERADA': ['87T', None, None, '21', None, None, '50/51'],
+        'CAUSA_EVENTO': ['VIENTO   ', 'VIENTO', None, 'MANIOBRA', None, None, 'VIENTO'],
+        'OBSERVACIONES_INTERNAS': ['REVISADO', None, 'solo esta', None, None, None, None],
+    })
+
+def test_equivalente_con_datos_irregulares(df_irregular):
+    nuevo, original = _limpiar_ambas(df_irregular)
+    assert_equivalentes(nuevo, original)
+    assert 'OBSERVACIONES_INTERNAS' not in nuevo.columns
+    assert 'PROTECCION_OPERADA' in nuevo.columns
+
+def test_equivalente_con_encabezados_ya_normalizados(df_irregular):
+    df = df_irregular.rename(columns={'DURACIÓN_INDISPONIBILIDAD_MINUTOS': 'DURACION_INDISPONIBILIDAD_MINUTOS'})
+    nuevo, original = _limpiar_ambas(df)
+    assert_equivalentes(nuevo, original)
+
+def test_equivalente_sin_columna_de_apertura(df_irregular):
+    nuevo, original = _limpiar_ambas(df_irregular.drop(columns=['FECHA_HORA_APERTURA']))
+    assert_equivalentes(nuevo, original)
+
+def test_equivalente_con_hoja_vacia(df_irregular):
+    nuevo, original = _limpiar_ambas(df_irregular.iloc[:0])
+    assert_equivalentes(nuevo, original)
+
+def test_equivalente_con_libro_sintetico(tmp_path):
+    ruta = generar_libro_formato(tmp_path / 'FORMATO_500.xlsx', 500, semilla=7)
+    df = etl.leer_hoja_formato(ruta)
+    nuevo, original = _limpiar_ambas(df)
+    assert_equivalentes(nuevo, original)
+
+def test_encabezados_repetidos_se_combinan():
+    # La versión original dejaba dos columnas PROTECCION_OPERADA, que luego
+    # fallaban al crear la tabla o al insertar; ahora se combinan en una
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 3)],
+        'PROTECCION _OPERADA': ['87T', None, '  '],
+        'PROTECCION_OPERADA': ['21', '50/51', '67N'],
+    })
+    limpio = etl.limpiar_y_preparar_datos(df, 'PRUEBA.xlsx')
+    
+    assert list(limpio.columns) == ['FECHA_HORA_APERTURA', 'PROTECCION_OPERADA', 'ARCHIVO_ORIGEN']
+    assert _valores(limpio['PROTECCION_OPERADA']) == ['87T', '50/51', '67N']
+
+def test_duracion_repetida_se_combina_despues_de_convertir():
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 1), datetime(2024, 1, 2)],
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': ['N/D', 45],
+        'DURACION_INDISPONIBILIDAD_MINUTOS': [30, 60],
+    })
+    limpio = etl.limpiar_y_preparar_datos(df, 'PRUEBA.xlsx')
+    
+    assert _valores(limpio['DURACION_INDISPONIBILIDAD_MINUTOS']) == [30, 45]
@@ -0,0 +1,63 @@
+"""
+Métricas por etapa: CPU, idas y vueltas a la BD y memoria pico con varios hilos
+"""
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+import etl_calidad_transmision as etl
+from benchmark_etl_transmision import generar_libro_formato
+
+TABLA = 'Calidad_Transmision'
+
+def _en_otro_hilo(trabajo):
+    """Inicia trabajo en un hilo y devuelve una función que espera a que termine"""
+    hilo = threading.Thread(target=trabajo)
+    hilo.start()
+    return hilo.join
+
+def test_etapa_no_suma_cpu_ni_idas_vuelta_de_otros_hilos():
+    metricas = {}
+    
+    def ocupado():
+        limite = time.thread_time() + 0.3
+        while time.thread_time() < limite:
+            pass
+        etl.contar_idas_vuelta_bd(5)
+    
+    with etl.medir_etapa(metricas, 'carga'):
+        esperar = _en_otro_hilo(ocupado)
+        esperar()
+        etl.contar_idas_vuelta_bd(2)
+    
+    assert metricas['carga']['cpu_segundos'] < 0.1
+    assert metricas['carga']['idas_vuelta_bd'] == 2
+    assert metricas['carga']['segundos'] >= 0.3
+
+@pytest.fixture
+def con_memoria(monkeypatch):
+    """ETL_MEDIR_MEMORIA activado; tracemalloc se detiene al terminar la prueba"""
+    monkeypatch.setattr(etl, 'medir_memoria', True)
+    yield
+    tracemalloc.stop()
+
+def test_pipeline_mide_cada_hilo_por_separado(tmp_path, monkeypatch, con_memoria):
+    monkeypatch.setattr(etl, 'tamano_bloque_lectura', 100)
+    engine = etl.instrumentar_engine(etl.crear_engine_sqlite(nombre_tabla=TABLA))
+    ruta = generar_libro_formato(tmp_path / 'FORMATO_500.xlsx', 500, semilla=5)
+    
+    metricas = {}
+    resultado = etl.cargar_archivo_por_bloques(str(ruta), engine, TABLA, 'replace', metricas=metricas)
+    
+    assert resultado['bloques'] == 5
+    # Lectura y limpieza no consultan la BD; la carga y el intercambio sí
+    assert metricas['lectura']['idas_vuelta_bd'] == 0
+    assert metricas['limpieza']['idas_vuelta_bd'] == 0
+    assert metricas['carga']['idas_vuelta_bd'] > 0
+    assert metricas['intercambio']['idas_vuelta_bd'] > 0
+    # Memoria pico: solo en las etapas que corren sin otros hilos
+    for etapa in ('lectura', 'limpieza', 'carga'):
+        assert metricas[etapa]['memoria_pico_mb'] is None, etapa
+    assert metricas['intercambio']['memoria_pico_mb'] is not None
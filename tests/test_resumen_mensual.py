@@ -0,0 +1,118 @@
+"""
+Resumen mensual: el resumen y los elementos distintos coinciden con la tabla principal
+"""
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import etl_calidad_transmision as etl
+from benchmark_etl_transmision import generar_libro_formato
+
+TABLA = 'Calidad_Transmision'
+
+# Mismo resultado que Resumen_Mensual_Transmision, calculado desde los eventos
+CONSULTA_EVENTOS = f"""
+    SELECT CAST(strftime('%Y', FECHA_HORA_APERTURA) AS INT) AS ANIO,
+           CAST(strftime('%m', FECHA_HORA_APERTURA) AS INT) AS MES,
+           SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD,
+           COUNT(*) AS TOTAL_EVENTOS,
+           COUNT(CASE WHEN LOWER(TIPO_INDISPONIBILIDAD) = 'forzada' THEN 1 END) AS EVENTOS_FORZADOS,
+           ROUND(SUM(DURACION_INDISPONIBILIDAD_MINUTOS), 2) AS TOTAL_MINUTOS,
+           COUNT(DURACION_INDISPONIBILIDAD_MINUTOS) AS EVENTOS_CON_DURACION,
+           MAX(DURACION_INDISPONIBILIDAD_MINUTOS) AS MAX_MINUTOS,
+           MAX(CARGA_MEGAS) AS MAX_CARGA_MW
+    FROM {TABLA}
+    WHERE FECHA_HORA_APERTURA IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6
+"""
+CONSULTA_RESUMEN = f"""
+    SELECT ANIO, MES, SUBESTACION, REGION, CAUSA_EVENTO, TIPO_INDISPONIBILIDAD,
+           TOTAL_EVENTOS, EVENTOS_FORZADOS, ROUND(TOTAL_MINUTOS, 2) AS TOTAL_MINUTOS,
+           EVENTOS_CON_DURACION, MAX_MINUTOS, MAX_CARGA_MW
+    FROM {etl.tabla_resumen_mensual}
+"""
+ELEMENTOS_EVENTOS = f"""
+    SELECT SUBESTACION, REGION, COUNT(DISTINCT CODIGO_ELEMENTO_AFECTADO) AS ELEMENTOS
+    FROM {TABLA}
+    WHERE FECHA_HORA_APERTURA IS NOT NULL
+    GROUP BY SUBESTACION, REGION
+"""
+ELEMENTOS_RESUMEN = f"""
+    SELECT SUBESTACION, REGION, COUNT(DISTINCT CODIGO_ELEMENTO_AFECTADO) AS ELEMENTOS
+    FROM {etl.tabla_elementos_mensual}
+    GROUP BY SUBESTACION, REGION
+"""
+
+def _ordenar(df):
+    return df.fillna('-').astype(str).sort_values(list(df.columns)).reset_index(drop=True)
+
+def assert_resumen_consistente(engine):
+    with engine.connect() as conn:
+        esperado = pd.read_sql(CONSULTA_EVENTOS, conn)
+        resumen = pd.read_sql(CONSULTA_RESUMEN, conn)
+        elementos_esperados = pd.read_sql(ELEMENTOS_EVENTOS, conn)
+        elementos = pd.read_sql(ELEMENTOS_RESUMEN, conn)
+    
+    pd.testing.assert_frame_equal(_ordenar(resumen), _ordenar(esperado))
+    pd.testing.assert_frame_equal(_ordenar(elementos), _ordenar(elementos_esperados))
+
+@pytest.mark.parametrize('pipeline', [False, True])
+def test_resumen_sigue_a_la_tabla_principal(tmp_path, etl_sqlite, monkeypatch, pipeline):
+    monkeypatch.setattr(etl, 'usar_pipeline', pipeline)
+    monkeypatch.setattr(etl, 'tamano_bloque_lectura', 100)
+    engine, cargar = etl_sqlite
+    enero = generar_libro_formato(tmp_path / 'ENERO.xlsx', 300, semilla=1)
+    febrero = generar_libro_formato(tmp_path / 'FEBRERO.xlsx', 200, semilla=2)
+    otro = generar_libro_formato(tmp_path / 'OTRO.xlsx', 250, semilla=3)
+    
+    cargar(enero, 'append')
+    assert_resumen_consistente(engine)
+    cargar(febrero, 'append')
+    cargar(enero, 'append')
+    assert_resumen_consistente(engine)
+    
+    # Reemplazo con otro contenido: cambian conteos y máximos de los mismos meses
+    shutil.copy(otro, enero)
+    cargar(enero, 'replace')
+    assert_resumen_consistente(engine)
+    
+    # Actualización incremental (sin pipeline): el resumen describe el archivo completo
+    shutil.copy(febrero, enero)
+    cargar(enero, 'upsert')
+    assert_resumen_consistente(engine)
+    
+    with engine.connect() as conn:
+        filas_resumen = pd.read_sql(f"SELECT COUNT(*) AS n FROM {etl.tabla_resumen_mensual}", conn)['n'][0]
+        eventos = pd.read_sql(f"SELECT COUNT(*) AS n FROM {TABLA}", conn)['n'][0]
+    assert filas_resumen < eventos
+
+def _eventos(archivo, mes, filas):
+    df = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, mes, 1 + dia, 8) for dia in range(filas)],
+        'DURACIÓN_INDISPONIBILIDAD_MINUTOS': [10.0 * (dia + 1) for dia in range(filas)],
+        'CODIGO_ELEMENTO_AFECTADO': [f'L{dia % 2}' for dia in range(filas)],
+        'SUBESTACION': 'SE NORTE',
+        'REGION': 'NORTE',
+        'CAUSA_EVENTO': 'VIENTO',
+        'TIPO_INDISPONIBILIDAD': 'Forzada',
+    })
+    return etl.limpiar_y_preparar_datos(df, archivo, detallado=False)
+
+def test_reemplazo_que_cambia_de_mes_recalcula_ambos_meses():
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    with engine.begin() as conn:
+        etl.aplicar_resumen_mensual(conn, etl.calcular_resumen_mensual(_eventos('A.xlsx', 1, 3)), 'A.xlsx')
+        etl.aplicar_resumen_mensual(conn, etl.calcular_resumen_mensual(_eventos('B.xlsx', 1, 2)), 'B.xlsx')
+        # A.xlsx corregido: sus eventos pasan a marzo
+        etl.aplicar_resumen_mensual(conn, etl.calcular_resumen_mensual(_eventos('A.xlsx', 3, 1)), 'A.xlsx')
+    
+    with engine.connect() as conn:
+        resumen = pd.read_sql(f"SELECT MES, TOTAL_EVENTOS, MAX_MINUTOS FROM {etl.tabla_resumen_mensual} ORDER BY MES",
+                              conn)
+        elementos = pd.read_sql(f"SELECT MES, COUNT(*) AS n FROM {etl.tabla_elementos_mensual} GROUP BY MES", conn)
+    
+    # Enero queda solo con B.xlsx: el máximo de A (30 min) ya no cuenta
+    assert resumen.values.tolist() == [[1, 2, 20.0], [3, 1, 10.0]]
+    assert elementos.values.tolist() == [[1, 2], [3, 1]]
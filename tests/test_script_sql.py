@@ -0,0 +1,47 @@
+"""
+create_tables_transmision.sql crea todo lo que usa el ETL
+
+Sin SQL Server disponible se revisa el script en sí: cada tabla que el ETL
+crea en SQLite existe en el script con las mismas columnas, cada
+procedimiento que el ETL ejecuta está definido y cada objeto dbo.* que el
+script referencia se crea en el mismo script.
+"""
+import re
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+
+import etl_calidad_transmision as etl
+
+RAIZ = Path(__file__).resolve().parent.parent
+SCRIPT = (RAIZ / 'create_tables_transmision.sql').read_text(encoding='utf-8')
+ETL = (RAIZ / 'etl_calidad_transmision.py').read_text(encoding='utf-8')
+
+CREADOS = set(re.findall(r'CREATE (?:TABLE|VIEW|PROCEDURE) dbo\.(\w+)', SCRIPT))
+
+def _columnas_script(tabla):
+    """Columnas del CREATE TABLE de una tabla en el script"""
+    cuerpo = re.search(rf'CREATE TABLE dbo\.{tabla} \((.*?)\n    \);', SCRIPT, re.S).group(1)
+    return {
+        nombre for nombre in re.findall(r'^\s+([A-Z][A-Z0-9_]*)\s+(?:AS\b|[A-Z]+)', cuerpo, re.M)
+        if nombre not in ('INDEX', 'CONSTRAINT')
+    }
+
+def _tablas_sqlite():
+    inspector = sa.inspect(etl.crear_engine_sqlite())
+    return {tabla: {col['name'] for col in inspector.get_columns(tabla)} for tabla in inspector.get_table_names()}
+
+@pytest.mark.parametrize('tabla, columnas', sorted(_tablas_sqlite().items()))
+def test_tablas_del_etl_existen_con_sus_columnas(tabla, columnas):
+    assert tabla in CREADOS
+    assert columnas <= _columnas_script(tabla)
+
+def test_procedimientos_del_etl_estan_definidos():
+    ejecutados = set(re.findall(r'EXEC (sp_\w+)', ETL))
+    assert ejecutados
+    assert ejecutados <= CREADOS
+
+def test_objetos_referenciados_por_el_script_se_crean():
+    referenciados = set(re.findall(r'dbo\.(\w+)', SCRIPT))
+    assert referenciados <= CREADOS
@@ -0,0 +1,60 @@
+"""
+Verificación previa en lote: qué archivos ya están cargados, en una sola consulta
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+import etl_calidad_transmision as etl
+
+TABLA = 'Calidad_Transmision'
+
+@pytest.fixture
+def engine():
+    engine = etl.crear_engine_sqlite(nombre_tabla=TABLA)
+    eventos = pd.DataFrame({
+        'FECHA_HORA_APERTURA': [datetime(2024, 1, 3), datetime(2024, 1, 9), datetime(2024, 2, 1)],
+        'CODIGO_ELEMENTO_AFECTADO': ['L1', 'L2', 'L3'],
+        'ARCHIVO_ORIGEN': ['ENERO.xlsx', 'ENERO.xlsx', 'FEBRERO.xlsx'],
+    })
+    etl.cargar_dataframe(eventos, engine, TABLA, metodo='to_sql')
+    return engine
+
+def _verificar(engine, nombres):
+    """verificar_archivos_cargados y las sentencias que envió a la BD"""
+    sentencias = []
+    
+    def registrar(conn, cursor, sentencia, *args):
+        sentencias.append(sentencia)
+    
+    sa.event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        return etl.verificar_archivos_cargados(engine, nombres, TABLA), sentencias
+    finally:
+        sa.event.remove(engine, 'before_cursor_execute', registrar)
+
+@pytest.mark.parametrize('nombres, cargados', [
+    (['ENERO.xlsx', 'FEBRERO.xlsx'], {'ENERO.xlsx': 2, 'FEBRERO.xlsx': 1}),
+    (['MARZO.xlsx', 'ABRIL.xlsx'], {}),
+    (['MARZO.xlsx', 'ENERO.xlsx', 'ENERO.xlsx', "O'HIGGINS.xlsx"], {'ENERO.xlsx': 2}),
+])
+def test_estado_de_cada_archivo_en_una_consulta(engine, nombres, cargados):
+    estados, sentencias = _verificar(engine, nombres)
+    
+    assert len(sentencias) == 1
+    assert list(estados) == list(dict.fromkeys(nombres))
+    assert {nombre: info['total_registros'] for nombre, info in estados.items() if info['existe']} == cargados
+    assert all(estados[nombre] == {'existe': False} for nombre in estados if nombre not in cargados)
+
+def test_rango_de_eventos_y_fechas_de_carga(engine):
+    estados, _ = _verificar(engine, ['ENERO.xlsx'])
+    
+    info = estados['ENERO.xlsx']
+    assert pd.Timestamp(info['evento_mas_antiguo']) == datetime(2024, 1, 3)
+    assert pd.Timestamp(info['evento_mas_reciente']) == datetime(2024, 1, 9)
+    assert info['primera_carga'] is not None and info['ultima_actualizacion'] is None
+
+def test_lista_vacia_no_consulta(engine):
+    assert _verificar(engine, []) == ({}, [])
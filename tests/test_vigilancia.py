@@ -0,0 +1,63 @@
+"""
+Modo vigilancia: estabilidad de los archivos, reintentos y métricas por tanda
+"""
+import json
+
+import pytest
+
+import etl_calidad_transmision as etl
+
+@pytest.fixture
+def vigilancia(tmp_path, monkeypatch):
+    """Carpeta vigilada y registro de las tandas que recibe procesar_archivos"""
+    carpeta = tmp_path / 'entrada'
+    carpeta.mkdir()
+    tandas = []
+    errores = {}  # nombre -> resultado de error que devuelve procesar_archivos
+    
+    def procesar_archivos(archivos, engine, nombre_tabla, workers=1, manifiesto=None):
+        nombres = [archivo.name for archivo in archivos]
+        tandas.append(nombres)
+        return [errores.get(nombre, {'archivo': nombre, 'estado': 'éxito', 'filas': 1}) for nombre in nombres]
+    
+    monkeypatch.setattr(etl, 'procesar_archivos', procesar_archivos)
+    monkeypatch.setattr(etl, 'mostrar_resumen_final', lambda resultados: 0)
+    monkeypatch.setattr(etl, 'archivo_metricas', tmp_path / 'etl_metricas.json')
+    monkeypatch.setattr(etl, 'modo_interactivo', False)
+    return carpeta, tandas, errores
+
+def _vigilar(carpeta, ciclos):
+    etl.vigilar_carpeta(carpeta, engine=None, nombre_tabla='Calidad_Transmision', manifiesto={},
+                        intervalo=0, estabilidad=0, ciclos=ciclos)
+
+def test_archivo_nuevo_espera_dos_revisiones_iguales(vigilancia):
+    carpeta, tandas, _ = vigilancia
+    (carpeta / 'ENERO.xlsx').write_bytes(b'contenido')
+    
+    _vigilar(carpeta, ciclos=1)
+    assert tandas == []
+    
+    _vigilar(carpeta, ciclos=3)
+    assert tandas == [['ENERO.xlsx']]
+
+def test_error_de_base_de_datos_se_reintenta_y_de_contenido_no(vigilancia):
+    carpeta, tandas, errores = vigilancia
+    (carpeta / 'CAIDA.xlsx').write_bytes(b'a')
+    (carpeta / 'SIN_FORMATO.xlsx').write_bytes(b'b')
+    errores['CAIDA.xlsx'] = {'archivo': 'CAIDA.xlsx', 'estado': 'error', 'mensaje': 'timeout'}
+    errores['SIN_FORMATO.xlsx'] = {'archivo': 'SIN_FORMATO.xlsx', 'estado': 'error',
+                                   'mensaje': "Hoja 'FORMATO' no encontrada", 'error_contenido': True}
+    
+    _vigilar(carpeta, ciclos=4)
+    
+    assert tandas[0] == ['CAIDA.xlsx', 'SIN_FORMATO.xlsx']
+    assert tandas[1:] == [['CAIDA.xlsx'], ['CAIDA.xlsx']]
+
+def test_metricas_de_cada_tanda_se_exportan(vigilancia, tmp_path):
+    carpeta, tandas, _ = vigilancia
+    (carpeta / 'ENERO.xlsx').write_bytes(b'contenido')
+    
+    _vigilar(carpeta, ciclos=2)
+    
+    exportado = json.loads((tmp_path / 'etl_metricas_0001.json').read_text(encoding='utf-8'))
+    assert [archivo['archivo'] for archivo in exportado['archivos']] == ['ENERO.xlsx']